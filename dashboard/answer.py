@@ -0,0 +1,178 @@
+import logging
+import re
+from django.conf import settings
+from ollama import AsyncClient, ChatResponse
+from .weaviate_module.chunking import count_tokens, get_encoding
+
+logger = logging.getLogger(__name__)
+
+ANSWER_SYSTEM_PROMPT = (
+    'You answer questions about tender documents using only the numbered passages you are given. '
+    'Cite every passage you rely on as [1], [2] and so on. '
+    'If the passages do not contain the answer, say that the documents do not say.'
+)
+
+ANSWER_PROMPT = """Passages:
+{context}
+
+Question: {question}"""
+
+_CITATION_RE = re.compile(r"\[(\d+)\]")
+
+
+def _answer_model():
+    return getattr(settings, 'ANSWER_MODEL', getattr(settings, 'SUMMARY_MODEL', 'dolphin-phi'))
+
+
+def _merge_overlap(first, second, min_overlap=16):
+    """Join two consecutive chunks, dropping the text the splitter repeated at the boundary"""
+    probe = second[:min_overlap]
+    # The earliest match is the longest overlap
+    position = first.find(probe, max(0, len(first) - len(second))) if probe else -1
+    while position != -1:
+        if second.startswith(first[position:]):
+            return first + second[len(first) - position:]
+        position = first.find(probe, position + 1)
+    return f"{first}\n{second}"
+
+
+def _passage(hit, chunks):
+    text = hit.get('text') or ''
+    return {
+        'text': text,
+        'chunks': chunks,
+        'score': hit.get('score') or 0,
+        'best_offset': 0,
+        'tokens': count_tokens(text),
+        'document_id': hit.get('document_id'),
+        'file_name': hit.get('file_name'),
+        'title': hit.get('title'),
+    }
+
+
+def merge_passages(hits, max_tokens=None):
+    """Collapse retrieved chunks into passages, best score first.
+
+    Adjacent chunks of the same document are joined without their overlap,
+    up to `max_tokens` per passage, and chunks whose text repeats an earlier
+    passage are dropped. Hits without a chunk index stay separate passages.
+    Each passage records where its best-scoring chunk starts (`best_offset`).
+    """
+    if max_tokens is None:
+        max_tokens = getattr(settings, 'ANSWER_PASSAGE_TOKENS', 1000)
+    by_document, passages = {}, []
+    for hit in hits:
+        index = hit.get('chunk_index')
+        if index is None:
+            passages.append(_passage(hit, []))
+            continue
+        key = hit.get('document_id') or hit.get('file_name')
+        by_document.setdefault(key, {})[index] = hit
+
+    for chunks in by_document.values():
+        current = None
+        for index in sorted(chunks):
+            hit = chunks[index]
+            text = hit.get('text') or ''
+            tokens = count_tokens(text)
+            if (current is not None and index == current['chunks'][-1] + 1
+                    and current['tokens'] + tokens <= max_tokens):
+                current['text'] = _merge_overlap(current['text'], text)
+                current['chunks'].append(index)
+                current['tokens'] += tokens
+                score = hit.get('score') or 0
+                if score > current['score']:
+                    current['score'] = score
+                    current['best_offset'] = len(current['text']) - len(text)
+                continue
+            current = _passage(hit, [index])
+            passages.append(current)
+
+    seen, unique = set(), []
+    for passage in sorted(passages, key=lambda passage: passage['score'], reverse=True):
+        fingerprint = " ".join(passage['text'].lower().split())
+        if fingerprint and fingerprint not in seen:
+            seen.add(fingerprint)
+            unique.append(passage)
+    return unique
+
+
+def _truncate_around_best(passage, limit):
+    """At most `limit` tokens of the passage, keeping its best chunk and what precedes it"""
+    encoding = get_encoding()
+    head = encoding.encode(passage['text'][:passage['best_offset']], disallowed_special=())
+    tail = encoding.encode(passage['text'][passage['best_offset']:], disallowed_special=())[:limit]
+    tokens = head[max(0, len(head) - (limit - len(tail))):] + tail if len(tail) < limit else tail
+    return {**passage, 'text': encoding.decode(tokens)}, len(tokens)
+
+
+def pack_context(passages, budget=None):
+    """Greedily keep the highest-scoring passages that fit in `budget` tokens.
+
+    A passage that does not fit is skipped in favour of smaller, lower
+    ranked ones. If not even the top passage fits, it is sent alone,
+    truncated to a window that starts with its best-scoring chunk.
+    """
+    if budget is None:
+        budget = getattr(settings, 'ANSWER_CONTEXT_TOKENS', 3000)
+    selected, used = [], 0
+    for passage in passages:
+        tokens = count_tokens(passage['text']) + 8  # "[n] file name" header
+        if used + tokens <= budget:
+            selected.append(passage)
+            used += tokens
+    if passages and not selected:
+        passage, tokens = _truncate_around_best(passages[0], budget - 8)
+        return [passage], tokens + 8
+    return selected, used
+
+
+def build_prompt(question, passages):
+    context = "\n\n".join(
+        f"[{number}] {passage['title'] or passage['file_name']}\n{passage['text']}"
+        for number, passage in enumerate(passages, start=1)
+    )
+    return ANSWER_PROMPT.format(context=context, question=question)
+
+
+def citations_for(answer, passages):
+    """The passages the answer cites, or every passage used if it cites none"""
+    cited = sorted({int(number) for number in _CITATION_RE.findall(answer) if 0 < int(number) <= len(passages)})
+    numbers = cited or range(1, len(passages) + 1)
+    return [
+        {
+            'ref': number,
+            'document_id': passages[number - 1]['document_id'],
+            'title': passages[number - 1]['title'],
+            'file_name': passages[number - 1]['file_name'],
+            'chunks': passages[number - 1]['chunks'],
+        }
+        for number in numbers
+    ]
+
+
+async def answer_question(question, hits):
+    """Answer from retrieved chunk hits; returns the answer, its citations and the context size.
+
+    Uses the async Ollama client bounded by OLLAMA_TIMEOUT; cancelling the
+    calling task (e.g. the client disconnecting) aborts the request.
+    """
+    passages, context_tokens = pack_context(merge_passages(hits))
+    if not passages:
+        return {'answer': "No indexed documents match this question.", 'citations': [], 'context_tokens': 0}
+
+    async with AsyncClient(timeout=getattr(settings, 'OLLAMA_TIMEOUT', 120)) as client:
+        response: ChatResponse = await client.chat(
+            model=_answer_model(),
+            messages=[
+                {'role': 'system', 'content': ANSWER_SYSTEM_PROMPT},
+                {'role': 'user', 'content': build_prompt(question, passages)},
+            ],
+        )
+    answer = response.message.content
+    logger.info(f"Answered from {len(passages)} passages ({context_tokens} context tokens)")
+    return {
+        'answer': answer,
+        'citations': citations_for(answer, passages),
+        'context_tokens': context_tokens,
+    }
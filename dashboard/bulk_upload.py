@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+import zipfile
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from .models import Document
+from .uploadhandlers import uploaded_file_sha256
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = ('.pdf',)
+
+
+class HashingReader:
+    """File-like wrapper that hashes bytes as storage reads them"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.sha256.update(data)
+        return data
+
+    def seek(self, offset, whence=0):
+        # Storage rewinds before its first read; only that rewind is supported
+        if offset != 0 or whence != 0 or self.raw.tell() != 0:
+            raise OSError("HashingReader only supports seeking to the start before reading")
+        return 0
+
+    def tell(self):
+        return self.raw.tell()
+
+    def close(self):
+        self.raw.close()
+
+
+def _zip_members(archive):
+    """PDF members of a ZIP archive, skipping directories and hidden files"""
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or not name or name.startswith('.'):
+            continue
+        if name.lower().endswith(ALLOWED_EXTENSIONS):
+            yield info, name
+
+
+def save_new_document(document):
+    """Save a new Document with its file_sha256 set.
+
+    Returns None, or the owner's existing copy if a concurrent upload of the
+    same bytes got there first; this copy's stored file is then deleted.
+    """
+    try:
+        with transaction.atomic():
+            document.save()
+    except IntegrityError:
+        document.file.delete(save=False)
+        return Document.objects.get(uploaded_by=document.uploaded_by_id, file_sha256=document.file_sha256)
+    return None
+
+
+def _store(user, content, name, sha256=None):
+    """Save one file as a Document unless the user has already stored its bytes.
+
+    Returns (document, duplicate_of).
+    """
+    if sha256:
+        existing = Document.objects.filter(uploaded_by=user, file_sha256=sha256).first()
+        if existing:
+            return None, existing
+
+    document = Document(uploaded_by=user)
+    document.file.save(name, content, save=False)
+
+    if sha256 is None:
+        sha256 = content.file.sha256.hexdigest()
+        existing = Document.objects.filter(uploaded_by=user, file_sha256=sha256).first()
+        if existing:
+            document.file.delete(save=False)
+            return None, existing
+
+    document.file_sha256 = sha256
+    existing = save_new_document(document)
+    if existing:
+        return None, existing
+    return document, None
+
+
+def ingest_uploads(files, user):
+    """Store uploaded PDFs and the PDFs inside uploaded ZIP archives.
+
+    ZIP members are decompressed straight into storage, chunk by chunk, and
+    hashed on the way, so archives are never held in memory. zipfile never
+    returns more than a member's declared size, so members are checked
+    against BULK_UPLOAD_MAX_MEMBER_SIZE, and their running total against
+    BULK_UPLOAD_MAX_EXTRACTED_SIZE, before anything is written. Returns
+    (created documents, list of (name, existing duplicate document), names
+    skipped for size).
+    """
+    max_files = getattr(settings, 'BULK_UPLOAD_MAX_FILES', 200)
+    max_member_size = getattr(settings, 'BULK_UPLOAD_MAX_MEMBER_SIZE', 100 * 1024 * 1024)
+    extraction_budget = getattr(settings, 'BULK_UPLOAD_MAX_EXTRACTED_SIZE', 1024 * 1024 * 1024)
+    created, duplicates, too_large = [], [], []
+
+    def add(document, duplicate_of, name):
+        if document is not None:
+            created.append(document)
+        else:
+            duplicates.append((name, duplicate_of))
+
+    for uploaded in files:
+        if len(created) + len(duplicates) >= max_files:
+            logger.warning(f"Bulk upload limit of {max_files} files reached")
+            break
+
+        if uploaded.name.lower().endswith('.zip'):
+            with zipfile.ZipFile(uploaded) as archive:
+                for info, name in _zip_members(archive):
+                    if len(created) + len(duplicates) >= max_files:
+                        break
+                    if info.file_size > min(max_member_size, extraction_budget):
+                        logger.warning(f"Skipping {info.filename} in {uploaded.name}: {info.file_size} bytes uncompressed")
+                        too_large.append(name)
+                        continue
+                    extraction_budget -= info.file_size
+                    with archive.open(info) as member:
+                        add(*_store(user, File(HashingReader(member), name=name), name), name)
+        elif uploaded.name.lower().endswith(ALLOWED_EXTENSIONS):
+            add(*_store(user, uploaded, uploaded.name, uploaded_file_sha256(uploaded)), uploaded.name)
+
+    return created, duplicates, too_large
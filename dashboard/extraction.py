@@ -0,0 +1,226 @@
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExtractionResult:
+    pages: list = field(default_factory=list)
+    page_timings: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def text(self):
+        return "\n".join(self.pages) + "\n" if self.pages else ""
+
+    def slowest_pages(self, count=3):
+        """(1-based page number, seconds) of the slowest pages, slowest first"""
+        ranked = sorted(enumerate(self.page_timings, start=1), key=lambda item: item[1], reverse=True)
+        return ranked[:count]
+
+    def timing_summary(self):
+        if not self.page_timings:
+            return "no pages"
+        mean = sum(self.page_timings) / len(self.page_timings)
+        slowest = ", ".join(f"p{number} {seconds:.2f}s" for number, seconds in self.slowest_pages())
+        return f"mean {mean:.3f}s/page, slowest {slowest}"
+
+
+def _extract_page_range(file_path, start, stop):
+    """Extract pages [start, stop) in a pool worker, returning (index, text, seconds)"""
+    import PyPDF2
+
+    results = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for index in range(start, stop):
+            began = time.perf_counter()
+            text = pdf_reader.pages[index].extract_text() or ""
+            results.append((index, text, time.perf_counter() - began))
+    return results
+
+
+def _page_ranges(page_count, workers):
+    """Split page_count pages into at most `workers` contiguous ranges"""
+    min_pages = getattr(settings, 'PDF_EXTRACTION_MIN_PAGES_PER_WORKER', 8)
+    workers = max(1, min(workers, page_count // max(min_pages, 1) or 1))
+    size, remainder = divmod(page_count, workers)
+    ranges = []
+    start = 0
+    for n in range(workers):
+        stop = start + size + (1 if n < remainder else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_pages(file_path, workers=None):
+    """Extract the text layer of every page, spreading page ranges across a process pool"""
+    import PyPDF2
+
+    began = time.perf_counter()
+    with open(file_path, 'rb') as file:
+        page_count = len(PyPDF2.PdfReader(file).pages)
+
+    if workers is None:
+        workers = getattr(settings, 'PDF_EXTRACTION_WORKERS', None) or os.cpu_count() or 1
+    ranges = _page_ranges(page_count, workers)
+
+    if len(ranges) == 1:
+        page_results = _extract_page_range(file_path, 0, page_count)
+    else:
+        page_results = []
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [pool.submit(_extract_page_range, file_path, start, stop) for start, stop in ranges]
+            for future in futures:
+                page_results.extend(future.result())
+
+    page_results.sort(key=lambda item: item[0])
+    result = ExtractionResult(
+        pages=[text for _, text, _ in page_results],
+        page_timings=[seconds for _, _, seconds in page_results],
+        elapsed=time.perf_counter() - began,
+    )
+    logger.info(
+        f"Extracted {page_count} pages from {os.path.basename(file_path)} "
+        f"with {len(ranges)} worker(s) in {result.elapsed:.2f}s ({result.timing_summary()})"
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        for number, seconds in enumerate(result.page_timings, start=1):
+            logger.debug(f"{os.path.basename(file_path)} page {number}: {seconds:.3f}s")
+    return result
+
+
+def page_needs_ocr(text):
+    """True when a page's text layer is empty or too garbled to be useful"""
+    stripped = "".join(text.split())
+    alnum = sum(1 for char in stripped if char.isalnum())
+    if alnum < getattr(settings, 'OCR_MIN_PAGE_CHARS', 20):
+        return True
+    return alnum / len(stripped) < 0.5
+
+
+def _ocr_windows(page_indexes, window):
+    """Group sorted page indexes into runs of consecutive pages no longer than `window`"""
+    runs = []
+    for index in page_indexes:
+        if runs and index == runs[-1][-1] + 1 and len(runs[-1]) < window:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+    return runs
+
+
+def ocr_pages(file_path, page_indexes):
+    """OCR the given zero-based pages, rasterising a small window at a time.
+
+    Only `OCR_PAGE_WINDOW` pages are held in memory as images at once, so peak
+    memory no longer grows with the length of a scanned document.
+    """
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    dpi = getattr(settings, 'OCR_DPI', 200)
+    thread_count = getattr(settings, 'OCR_THREAD_COUNT', 1)
+    window = max(1, getattr(settings, 'OCR_PAGE_WINDOW', 4))
+
+    texts = {}
+    for run in _ocr_windows(sorted(page_indexes), window):
+        images = convert_from_path(
+            file_path,
+            dpi=dpi,
+            first_page=run[0] + 1,
+            last_page=run[-1] + 1,
+            thread_count=thread_count,
+        )
+        for index, image in zip(run, images):
+            texts[index] = pytesseract.image_to_string(image)
+            image.close()
+        del images
+    return texts
+
+
+def extract_text_from_pdf(file_path):
+    try:
+        pages = extract_pages(file_path).pages
+    except Exception as e:
+        logger.warning(f"Text layer extraction failed for {file_path}: {e}")
+        pages = None
+
+    try:
+        if pages is None:
+            from pdf2image import pdfinfo_from_path
+            pages = [""] * int(pdfinfo_from_path(file_path)["Pages"])
+
+        scanned = [index for index, text in enumerate(pages) if page_needs_ocr(text)]
+        if scanned:
+            logger.info(f"OCR fallback for {len(scanned)} of {len(pages)} pages of {file_path}")
+            for index, text in ocr_pages(file_path, scanned).items():
+                if text.strip():
+                    pages[index] = text
+    except Exception as e:
+        if pages is None or not any(text.strip() for text in pages):
+            raise Exception(f"Could not extract text: {str(e)}")
+        logger.warning(f"OCR fallback failed for {file_path}, keeping text layer: {e}")
+
+    return "\n".join(pages) + "\n" if pages else ""
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_document_text(document):
+    """A document's text if it has already been extracted (by any copy of the file), else None; never extracts or writes"""
+    from .models import ExtractedText
+
+    if document.extracted_text_id:
+        return document.extracted_text.text
+    if not document.file_sha256:
+        return None
+    entry = ExtractedText.objects.filter(sha256=document.file_sha256).first()
+    return entry.text if entry is not None else None
+
+
+def get_document_text(document):
+    """Return a document's text, extracting it only once per distinct file content"""
+    from .models import ExtractedText
+
+    if document.extracted_text_id:
+        return document.extracted_text.text
+
+    sha256 = document.file_sha256 or file_sha256(document.file.path)
+    entry = ExtractedText.objects.filter(sha256=sha256).first()
+    if entry is None:
+        text = extract_text_from_pdf(document.file.path)
+        entry, _ = ExtractedText.objects.get_or_create(
+            sha256=sha256,
+            defaults={'compressed_text': ExtractedText.compress(text), 'char_count': len(text)},
+        )
+
+    document.extracted_text = entry
+    if document.file_sha256:
+        document.save(update_fields=['extracted_text'])
+        return entry.text
+
+    document.file_sha256 = sha256
+    try:
+        with transaction.atomic():
+            document.save(update_fields=['extracted_text', 'file_sha256'])
+    except IntegrityError:
+        # Uploaded before hashes were recorded, and the owner has another copy
+        document.file_sha256 = ''
+        document.save(update_fields=['extracted_text'])
+    return entry.text
@@ -5,3 +5,23 @@ class DocumentForm(forms.ModelForm):
     class Meta:
         model = Document
         fields = ('file',)
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput(attrs={'accept': '.pdf,.zip'}))
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(d, initial) for d in data]
+        return [single_file_clean(data, initial)]
+
+
+class BulkUploadForm(forms.Form):
+    files = MultipleFileField(help_text='PDF files and/or ZIP archives of PDFs')
@@ -0,0 +1,222 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Document, ProcessingJob
+from .processing import process_document, PermanentProcessingError
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgress:
+    """Writes stage and streaming summary progress onto a job, throttling database writes"""
+
+    def __init__(self, job, min_interval=None):
+        self.job = job
+        self.min_interval = min_interval if min_interval is not None else getattr(settings, 'PROGRESS_SAVE_INTERVAL', 0.5)
+        self._last_save = 0.0
+
+    def __call__(self, stage=None, detail=None, partial=None):
+        force = False
+        if stage is not None and stage != self.job.stage:
+            self.job.stage = stage
+            self.job.progress_detail = ''
+            force = True
+        if detail is not None:
+            self.job.progress_detail = detail[:255]
+        if partial is not None:
+            self.job.partial_summary = partial
+
+        now = time.monotonic()
+        if force or now - self._last_save >= self.min_interval:
+            self.job.save(update_fields=['stage', 'progress_detail', 'partial_summary', 'updated_at'])
+            self._last_save = now
+
+
+class JobHeartbeat:
+    """Refreshes the leases of a worker's claimed jobs from a background thread.
+
+    OCR and summarisation can run for longer than the lease timeout without
+    reporting progress; without a heartbeat another worker would reclaim the
+    job and run it a second time. Jobs waiting their turn in a claimed batch
+    are kept alive too. A job that has been running for longer than
+    DOCUMENT_JOB_MAX_RUNTIME is no longer renewed, so if its worker is stuck
+    the lease expires and the job is retried (or failed) elsewhere.
+    """
+
+    def __init__(self, jobs, interval=None, max_runtime=None):
+        self.interval = interval if interval is not None else getattr(settings, 'DOCUMENT_JOB_HEARTBEAT_INTERVAL', 60)
+        self.max_runtime = max_runtime if max_runtime is not None else getattr(settings, 'DOCUMENT_JOB_MAX_RUNTIME', 7200)
+        self._deadlines = {job.pk: None for job in jobs}  # None until the job starts running
+        self._worker_id = jobs[0].locked_by if jobs else ''
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'job-heartbeat-{self._worker_id}', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def started(self, job):
+        with self._lock:
+            self._deadlines[job.pk] = time.monotonic() + self.max_runtime
+
+    def finished(self, job):
+        with self._lock:
+            self._deadlines.pop(job.pk, None)
+
+    def beat(self):
+        """Extend the leases still held by this worker; returns the ids renewed"""
+        now = time.monotonic()
+        with self._lock:
+            for pk, deadline in list(self._deadlines.items()):
+                if deadline is not None and now > deadline:
+                    logger.warning(f"Job {pk} ran for longer than {self.max_runtime}s; no longer renewing its lease")
+                    del self._deadlines[pk]
+            pks = list(self._deadlines)
+        if not pks:
+            return []
+        held = ProcessingJob.objects.filter(pk__in=pks, status='running', locked_by=self._worker_id)
+        renewed = list(held.values_list('pk', flat=True))
+        ProcessingJob.objects.filter(pk__in=renewed).update(locked_at=timezone.now())
+        with self._lock:
+            for pk in set(pks) - set(renewed):
+                logger.warning(f"Job {pk} lost its lease to another worker")
+                self._deadlines.pop(pk, None)
+        return renewed
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    self.beat()
+                except Exception as e:
+                    logger.warning(f"Heartbeat for worker {self._worker_id} failed: {e}")
+        finally:
+            connection.close()
+
+
+def enqueue_document(document):
+    """Queue a document for background processing and return the job"""
+    with transaction.atomic():
+        document.status = 'processing'
+        document.save(update_fields=['status'])
+        return ProcessingJob.objects.create(
+            document=document,
+            max_attempts=getattr(settings, 'DOCUMENT_JOB_MAX_ATTEMPTS', 3),
+        )
+
+
+def enqueue_documents(documents):
+    """Queue several documents at once, returning their jobs"""
+    documents = list(documents)
+    max_attempts = getattr(settings, 'DOCUMENT_JOB_MAX_ATTEMPTS', 3)
+    with transaction.atomic():
+        Document.objects.filter(pk__in=[document.pk for document in documents]).update(status='processing')
+        return ProcessingJob.objects.bulk_create([
+            ProcessingJob(document=document, max_attempts=max_attempts) for document in documents
+        ])
+
+
+def claim_jobs(worker_id, limit=1):
+    """Atomically claim up to `limit` runnable jobs for this worker.
+
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED so any number of
+    workers, on any number of hosts, can poll the same table without
+    blocking on or double-claiming each other's jobs. Jobs whose lease has
+    expired (the worker died mid-run) become claimable again, unless that
+    was their last attempt: those are marked failed, so a document that
+    crashes its worker is not retried forever.
+    """
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=getattr(settings, 'DOCUMENT_JOB_LEASE_TIMEOUT', 1800))
+
+    with transaction.atomic():
+        exhausted = list(
+            ProcessingJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='running', locked_at__lt=lease_expired, attempts__gte=F('max_attempts'))
+        )
+        if exhausted:
+            for job in exhausted:
+                logger.warning(f"Job {job.pk} for document {job.document_id} failed: worker lost after {job.attempts} attempt(s)")
+            ProcessingJob.objects.filter(pk__in=[job.pk for job in exhausted]).update(
+                status='failed', locked_by='', locked_at=None, finished_at=now,
+                last_error='Worker stopped responding on the final attempt',
+            )
+            Document.objects.filter(pk__in=[job.document_id for job in exhausted]).update(status='failed')
+
+        jobs = list(
+            ProcessingJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status='queued', run_after__lte=now) |
+                Q(status='running', locked_at__lt=lease_expired, attempts__lt=F('max_attempts'))
+            )
+            .order_by('run_after', 'id')[:limit]
+        )
+        for job in jobs:
+            job.status = 'running'
+            job.locked_by = worker_id
+            job.locked_at = now
+            job.attempts += 1
+            job.save(update_fields=['status', 'locked_by', 'locked_at', 'attempts'])
+    return jobs
+
+
+def retry_delay(attempts):
+    """Exponential backoff in seconds for the given attempt number"""
+    base = getattr(settings, 'DOCUMENT_JOB_RETRY_BACKOFF', 30)
+    cap = getattr(settings, 'DOCUMENT_JOB_RETRY_BACKOFF_MAX', 3600)
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+def run_job(job, heartbeat=None):
+    """Run a claimed job and record its outcome.
+
+    `heartbeat` is the JobHeartbeat covering the batch the job was claimed
+    in; without one the job gets its own.
+    """
+    if heartbeat is None:
+        with JobHeartbeat([job]) as heartbeat:
+            return run_job(job, heartbeat)
+
+    document = job.document
+    heartbeat.started(job)
+    try:
+        process_document(document, progress=JobProgress(job))
+    except Exception as e:
+        heartbeat.finished(job)
+        job.last_error = str(e)
+        job.locked_by = ''
+        job.locked_at = None
+        if isinstance(e, PermanentProcessingError) or job.attempts >= job.max_attempts:
+            logger.warning(f"Job {job.pk} for document {document.pk} failed: {e}")
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+            document.status = 'failed'
+            document.save(update_fields=['status'])
+        else:
+            delay = retry_delay(job.attempts)
+            logger.info(f"Job {job.pk} attempt {job.attempts} failed, retrying in {delay}s: {e}")
+            job.status = 'queued'
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+        job.save()
+        return False
+
+    heartbeat.finished(job)
+    job.status = 'succeeded'
+    job.stage = 'done'
+    job.progress_detail = ''
+    job.last_error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'stage', 'progress_detail', 'last_error', 'finished_at', 'updated_at'])
+    return True
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.weaviate_module.client import get_weaviate_client
+from dashboard.weaviate_module.schema import MIGRATIONS, COLLECTIONS, applied_versions, migrate
+
+
+class Command(BaseCommand):
+    help = 'Apply pending Weaviate schema migrations, optionally rebuilding collections behind their alias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', action='store_true', help='Show applied and pending migrations and exit')
+        parser.add_argument('--reindex', action='append', default=[], choices=sorted(COLLECTIONS),
+                            help='Rebuild a collection from its declared config (repeatable)')
+        parser.add_argument('--keep-old', action='store_true',
+                            help='Keep the previous physical collection after a reindex')
+
+    def handle(self, *args, **options):
+        client = get_weaviate_client()
+        if client is None:
+            raise CommandError('Weaviate is not reachable; check WEAVIATE_HOST and WEAVIATE_PORT')
+
+        if options['list']:
+            done = applied_versions(client)
+            for migration in MIGRATIONS:
+                mark = 'X' if migration.version in done else ' '
+                self.stdout.write(f"[{mark}] {migration.version:04d}_{migration.name}")
+            return
+
+        try:
+            applied = migrate(
+                client, reindex=options['reindex'], keep_old=options['keep_old'],
+                report=lambda message: self.stdout.write(f'  {message}'),
+            )
+        except Exception as e:
+            raise CommandError(f'Weaviate migration failed: {e}')
+        if applied or options['reindex']:
+            self.stdout.write(self.style.SUCCESS(f'Applied {len(applied)} migration(s)'))
+        else:
+            self.stdout.write('No migrations to apply')
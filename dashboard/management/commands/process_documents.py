@@ -0,0 +1,100 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from dashboard.jobs import JobHeartbeat, claim_jobs, run_job
+from dashboard.utils.model_registry import warm_up_on_startup
+from dashboard.weaviate_module.schema import migrate_on_startup
+
+logger = logging.getLogger(__name__)
+
+MAX_ERROR_BACKOFF = 60
+
+
+def worker_loop(worker_id, stop_event, batch_size, poll_interval, once):
+    """Claim and run jobs until stopped (or the queue is empty with --once).
+
+    Database errors (a restart, a dropped connection) are logged and retried
+    with backoff rather than ending the worker; a claimed job left running
+    is picked up again once its lease expires.
+    """
+    errors = 0
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            jobs = claim_jobs(worker_id, limit=batch_size)
+            if jobs:
+                # One heartbeat for the batch, so jobs waiting their turn keep their leases
+                with JobHeartbeat(jobs) as heartbeat:
+                    for job in jobs:
+                        run_job(job, heartbeat)
+        except Exception:
+            errors += 1
+            delay = min(MAX_ERROR_BACKOFF, poll_interval * 2 ** min(errors, 10))
+            logger.exception(f"Worker {worker_id} error, retrying in {delay:.0f}s")
+            connections.close_all()
+            stop_event.wait(delay)
+            continue
+        errors = 0
+        if not jobs:
+            if once:
+                break
+            stop_event.wait(poll_interval)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run background workers that process queued documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            default=getattr(settings, 'DOCUMENT_WORKER_PROCESSES', 2),
+                            help='Number of worker processes to start on this host')
+        parser.add_argument('--batch-size', type=int, default=1,
+                            help='Jobs to claim per poll')
+        parser.add_argument('--poll-interval', type=float,
+                            default=getattr(settings, 'DOCUMENT_WORKER_POLL_INTERVAL', 2),
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is drained')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        host = socket.gethostname()
+        ctx = multiprocessing.get_context('fork')
+        stop_event = ctx.Event()
+
+        def request_stop(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        migrate_on_startup()
+        # Loaded before forking so the workers share the model weights
+        warm_up_on_startup()
+
+        # Children must open their own database connections
+        connections.close_all()
+
+        processes = []
+        for n in range(workers):
+            worker_id = f'{host}:{os.getpid()}:{n}'
+            process = ctx.Process(
+                target=worker_loop,
+                args=(worker_id, stop_event, options['batch_size'], options['poll_interval'], options['once']),
+                name=f'document-worker-{n}',
+            )
+            process.start()
+            processes.append(process)
+
+        self.stdout.write(f'Started {workers} document worker(s) on {host}')
+
+        for process in processes:
+            process.join()
+
+        self.stdout.write(self.style.SUCCESS('Document workers stopped'))
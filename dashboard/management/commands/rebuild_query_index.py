@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from dashboard.utils.similarity import QuestionSimilarity, question_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the persisted semantic cache index from every QueryCache row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=['auto', 'exact', 'ivf'],
+                            help='Override QUERY_INDEX_BACKEND for this build')
+
+    def handle(self, *args, **options):
+        if options['backend']:
+            settings.QUERY_INDEX_BACKEND = options['backend']
+        index = question_index.rebuild(QuestionSimilarity())
+        if index is None:
+            self.stdout.write('No cached questions; removed any saved index')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {index.kind} index of {len(index)} question(s) at {question_index.path}'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_extractedtext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingjob',
+            name='partial_summary',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='processingjob',
+            name='progress_detail',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='processingjob',
+            name='stage',
+            field=models.CharField(choices=[('queued', 'Queued'), ('extracting', 'Extracting text'), ('chunking', 'Chunking'), ('summarising', 'Summarising'), ('indexing', 'Indexing'), ('done', 'Done')], default='queued', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='processingjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
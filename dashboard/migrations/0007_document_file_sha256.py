@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_processingjob_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='file_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
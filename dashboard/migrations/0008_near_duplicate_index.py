@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_document_file_sha256'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='dashboard.document')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DocumentLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='dashboard.document')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='lsh_band_bucket_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_near_duplicate_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('extracted', 'Text extracted'), ('chunked', 'Chunked'), ('summarised', 'Summarised'), ('embedded', 'Embedded'), ('indexed', 'Indexed')], max_length=20)),
+                ('output', models.JSONField(blank=True, default=dict)),
+                ('completed_at', models.DateTimeField(auto_now=True)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='dashboard.document')),
+            ],
+            options={
+                'ordering': ['completed_at'],
+                'unique_together': {('document', 'stage')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_processingcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingcheckpoint',
+            name='stage',
+            field=models.CharField(choices=[('extracted', 'Text extracted'), ('chunked', 'Chunked'), ('summarised', 'Summarised'), ('structured', 'Tender fields extracted'), ('embedded', 'Embedded'), ('indexed', 'Indexed')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='TenderDetails',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tender_number', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('title', models.CharField(blank=True, max_length=500)),
+                ('procuring_entity', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('category', models.CharField(blank=True, choices=[('ICT', 'ICT'), ('Construction', 'Construction'), ('Consultancy', 'Consultancy'), ('Goods', 'Goods'), ('Services', 'Services'), ('Other', 'Other')], db_index=True, max_length=20)),
+                ('closing_date', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('site_visit_date', models.DateTimeField(blank=True, null=True)),
+                ('raw', models.JSONField(blank=True, default=dict)),
+                ('extracted_at', models.DateTimeField(auto_now=True)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tender', to='dashboard.document')),
+            ],
+            options={
+                'verbose_name_plural': 'Tender details',
+                'indexes': [models.Index(fields=['category', 'closing_date'], name='tender_category_closing_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_tenderdetails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='querycache',
+            name='embedding',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_querycache_embedding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorpusGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('query', models.TextField()),
+                ('params', models.JSONField(default=dict)),
+                ('results', models.JSONField()),
+                ('generation', models.PositiveBigIntegerField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='searchlog',
+            name='from_cache',
+            field=models.BooleanField(default=False),
+        ),
+    ]
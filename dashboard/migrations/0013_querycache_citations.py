@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0012_search_result_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='querycache',
+            name='citations',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
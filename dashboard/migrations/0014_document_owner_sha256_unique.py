@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def clear_duplicate_hashes(apps, schema_editor):
+    """Keep the hash on each owner's oldest copy of a file so the constraint can be added"""
+    Document = apps.get_model('dashboard', 'Document')
+    seen = set()
+    duplicates = []
+    for pk, owner, sha256 in (
+        Document.objects.exclude(file_sha256='').order_by('pk').values_list('pk', 'uploaded_by', 'file_sha256')
+    ):
+        if (owner, sha256) in seen:
+            duplicates.append(pk)
+        seen.add((owner, sha256))
+    Document.objects.filter(pk__in=duplicates).update(file_sha256='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_querycache_citations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_hashes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='document',
+            constraint=models.UniqueConstraint(condition=models.Q(('file_sha256', ''), _negated=True), fields=('uploaded_by', 'file_sha256'), name='document_owner_sha256_unique'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def count_chunks(apps, schema_editor):
+    """Replace the chunk texts stored in 'chunked' checkpoints with their count"""
+    ProcessingCheckpoint = apps.get_model('dashboard', 'ProcessingCheckpoint')
+    for checkpoint in ProcessingCheckpoint.objects.filter(stage='chunked').iterator():
+        chunks = checkpoint.output.get('chunks')
+        if isinstance(chunks, list):
+            checkpoint.output = {'chunks': len(chunks)}
+            checkpoint.save(update_fields=['output'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0014_document_owner_sha256_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_chunks, migrations.RunPython.noop),
+    ]
@@ -1,17 +1,39 @@
+import zlib
 from django.db import models
 from users.models import CustomUser
 from cryptography.fernet import Fernet
 from django.conf import settings
+from django.utils import timezone
 
 class QueryCache(models.Model):
     question = models.TextField()
     response = models.TextField()
+    embedding = models.BinaryField(blank=True, null=True, editable=False)  # float32 question embedding
+    citations = models.JSONField(default=list, blank=True)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
 
+class ExtractedText(models.Model):
+    """Extracted text shared by every document with the same file content"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    compressed_text = models.BinaryField()
+    char_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def text(self):
+        return zlib.decompress(bytes(self.compressed_text)).decode('utf-8')
+
+    @staticmethod
+    def compress(text):
+        return zlib.compress(text.encode('utf-8'), 6)
+
+    def __str__(self):
+        return self.sha256
+
 class Document(models.Model):
     STATUS_CHOICES = (
         ('uploaded', 'Uploaded'),
@@ -22,22 +44,113 @@ class Document(models.Model):
 
     uploaded_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     file = models.FileField(upload_to='documents/')
+    file_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploaded')
     summarized_file = models.FileField(upload_to='summaries/', blank=True, null=True)
+    extracted_text = models.ForeignKey(ExtractedText, on_delete=models.SET_NULL, blank=True, null=True, related_name='documents')
+
+    class Meta:
+        constraints = [
+            # Backstop for the duplicate check at upload, which concurrent uploads can both pass
+            models.UniqueConstraint(
+                fields=['uploaded_by', 'file_sha256'],
+                condition=~models.Q(file_sha256=''),
+                name='document_owner_sha256_unique',
+            ),
+        ]
 
     def __str__(self):
         return self.file.name
 
+class TenderDetails(models.Model):
+    """Structured tender fields extracted from a processed document"""
+    CATEGORY_CHOICES = (
+        ('ICT', 'ICT'),
+        ('Construction', 'Construction'),
+        ('Consultancy', 'Consultancy'),
+        ('Goods', 'Goods'),
+        ('Services', 'Services'),
+        ('Other', 'Other'),
+    )
+
+    document = models.OneToOneField(Document, on_delete=models.CASCADE, related_name='tender')
+    tender_number = models.CharField(max_length=100, blank=True, db_index=True)
+    title = models.CharField(max_length=500, blank=True)
+    procuring_entity = models.CharField(max_length=255, blank=True, db_index=True)
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, blank=True, db_index=True)
+    closing_date = models.DateTimeField(blank=True, null=True, db_index=True)
+    site_visit_date = models.DateTimeField(blank=True, null=True)
+    raw = models.JSONField(default=dict, blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Tender details"
+        indexes = [
+            models.Index(fields=['category', 'closing_date'], name='tender_category_closing_idx'),
+        ]
+
+    def __str__(self):
+        return self.tender_number or self.title or str(self.document)
+
+class DocumentFingerprint(models.Model):
+    """MinHash signature of a document's extracted text, for near-duplicate detection"""
+    document = models.OneToOneField(Document, on_delete=models.CASCADE, related_name='fingerprint')
+    signature = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class DocumentLSHBucket(models.Model):
+    """One LSH band of a document's signature; documents sharing a bucket are near-duplicate candidates"""
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='lsh_band_bucket_idx'),
+        ]
+
 class SearchLog(models.Model):
+    """Audit log of every search a user runs"""
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     query = models.TextField()
     results = models.JSONField()
+    from_cache = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+
     class Meta:
         ordering = ['-created_at']
 
+class CorpusGeneration(models.Model):
+    """Single-row counter bumped whenever the searchable corpus changes"""
+    value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.pk = 1
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def current(cls):
+        obj, created = cls.objects.get_or_create(pk=1)
+        return obj.value
+
+    @classmethod
+    def bump(cls):
+        cls.objects.get_or_create(pk=1)
+        cls.objects.filter(pk=1).update(value=models.F('value') + 1, updated_at=timezone.now())
+
+class SearchResultCache(models.Model):
+    """Search results shared across users, keyed by normalised query and parameters"""
+    key = models.CharField(max_length=64, unique=True)
+    query = models.TextField()
+    params = models.JSONField(default=dict)
+    results = models.JSONField()
+    generation = models.PositiveBigIntegerField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
 class UserAPIKey(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
@@ -58,4 +171,69 @@ class UserAPIKey(models.Model):
         return None
     
     class Meta:
-        unique_together = ['user', 'name']
\ No newline at end of file
+        unique_together = ['user', 'name']
+
+
+class ProcessingCheckpoint(models.Model):
+    """Output of a completed processing stage, so a retry can resume after it"""
+    STAGE_CHOICES = (
+        ('extracted', 'Text extracted'),
+        ('chunked', 'Chunked'),
+        ('summarised', 'Summarised'),
+        ('structured', 'Tender fields extracted'),
+        ('embedded', 'Embedded'),
+        ('indexed', 'Indexed'),
+    )
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='checkpoints')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES)
+    output = models.JSONField(default=dict, blank=True)
+    completed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['completed_at']
+        unique_together = ['document', 'stage']
+
+    def __str__(self):
+        return f'{self.document} {self.stage}'
+
+class ProcessingJob(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    STAGE_CHOICES = (
+        ('queued', 'Queued'),
+        ('extracting', 'Extracting text'),
+        ('chunking', 'Chunking'),
+        ('summarising', 'Summarising'),
+        ('indexing', 'Indexing'),
+        ('done', 'Done'),
+    )
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='queued')
+    progress_detail = models.CharField(max_length=255, blank=True)
+    partial_summary = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'Job #{self.pk} ({self.status}) for {self.document}'
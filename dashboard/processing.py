@@ -0,0 +1,142 @@
+import logging
+from .extraction import get_document_text
+from .models import ProcessingCheckpoint, TenderDetails
+from .weaviate_module.chunking import chunk_text
+from .weaviate_module.summarize import summarize_text
+from .weaviate_module.utils import (
+    content_hash_for, find_by_content_hash, write_summary_file, upsert_document, insert_chunks
+)
+from .tender_fields import extract_tender_fields, save_tender_details
+from .search_cache import invalidate_search_results
+from .vector_store import get_vector_store
+from .utils.near_duplicates import minhash_signature, store_fingerprint, find_near_duplicate
+
+logger = logging.getLogger(__name__)
+
+STAGES = [stage for stage, _ in ProcessingCheckpoint.STAGE_CHOICES]
+
+
+class ProcessingError(Exception):
+    """Processing failed but may succeed if retried"""
+
+
+class PermanentProcessingError(ProcessingError):
+    """Processing failed and retrying will not help"""
+
+
+def _save_checkpoint(document, stage, output):
+    ProcessingCheckpoint.objects.update_or_create(document=document, stage=stage, defaults={'output': output})
+    return output
+
+
+def stage_states(document):
+    """(stage, label, checkpoint or None) for every stage, in pipeline order"""
+    done = {checkpoint.stage: checkpoint for checkpoint in document.checkpoints.all()}
+    return [(stage, label, done.get(stage)) for stage, label in ProcessingCheckpoint.STAGE_CHOICES]
+
+
+def indexed_content_hash(document):
+    """Hash of the document's text, which keys its objects in the vector store; None if never extracted"""
+    checkpoint = document.checkpoints.filter(stage='extracted').first()
+    if checkpoint is not None:
+        return checkpoint.output.get('content_hash')
+    if document.extracted_text_id:
+        return content_hash_for(document.extracted_text.text)
+    return None
+
+
+def remove_unused_index_entry(content_hash):
+    """Delete a text from the vector store once no document has it; call after deleting a document"""
+    if ProcessingCheckpoint.objects.filter(stage='extracted', output__content_hash=content_hash).exists():
+        return False
+    deleted = get_vector_store().delete_document(content_hash)
+    # Searches run since the delete bumped the generation may have cached the removed hits
+    invalidate_search_results()
+    return deleted
+
+
+def chunk_metadata(document):
+    """Filterable properties copied onto each of the document's chunks"""
+    tender = TenderDetails.objects.filter(document=document).first()
+    return {
+        'document_id': document.pk,
+        'uploaded_at': document.uploaded_at,
+        'category': tender.category if tender else None,
+        'procuring_entity': tender.procuring_entity if tender else None,
+        'closing_date': tender.closing_date if tender else None,
+    }
+
+
+def process_document(document, progress=None):
+    """Extract, chunk, summarise, structure and index a document, raising ProcessingError on failure.
+
+    Each stage's output is checkpointed, so a retry after a failure resumes
+    from the first stage that has not completed yet. `progress` is an
+    optional callable taking `stage`, `detail` and `partial` keyword
+    arguments; see jobs.JobProgress.
+    """
+    report = progress or (lambda **kwargs: None)
+    done = {checkpoint.stage: checkpoint.output for checkpoint in document.checkpoints.all()}
+    if done:
+        logger.info(f"Resuming document {document.pk} after stages: {', '.join(done)}")
+
+    report(stage='extracting')
+    text_content = get_document_text(document)
+    if not text_content.strip():
+        raise PermanentProcessingError("No text could be extracted from the document")
+    content_hash = content_hash_for(text_content)
+
+    if 'extracted' not in done:
+        done['extracted'] = _save_checkpoint(document, 'extracted', {
+            'characters': len(text_content),
+            'content_hash': content_hash,
+        })
+
+    if 'summarised' not in done:
+        signature = minhash_signature(text_content)
+        store_fingerprint(document, signature)
+        duplicate, similarity = find_near_duplicate(signature, exclude_document=document)
+        if duplicate is not None:
+            raise PermanentProcessingError(
+                f'Near-duplicate of "{duplicate.file.name}" ({similarity:.0%} similar); summarisation skipped.'
+            )
+        if find_by_content_hash(content_hash) is not None:
+            raise PermanentProcessingError("A similar file has already been uploaded.")
+
+    report(stage='chunking')
+    # Only the count is checkpointed: chunking is cheap and deterministic, and
+    # the text itself is already cached (compressed) in ExtractedText
+    pieces = chunk_text(text_content) if 'indexed' not in done else None
+    if 'chunked' not in done:
+        done['chunked'] = _save_checkpoint(document, 'chunked', {'chunks': len(pieces)})
+
+    report(stage='summarising')
+    if 'summarised' not in done:
+        summary = summarize_text(text_content, progress=progress)
+        done['summarised'] = _save_checkpoint(document, 'summarised', {
+            'summary': summary,
+            'summary_filename': write_summary_file(document.file.name, summary),
+        })
+    summary = done['summarised']['summary']
+
+    if 'structured' not in done:
+        report(detail="Extracting tender fields")
+        raw_fields = extract_tender_fields(text_content, summary)
+        save_tender_details(document, raw_fields)
+        done['structured'] = _save_checkpoint(document, 'structured', raw_fields)
+
+    report(stage='indexing', detail=f"Indexing {done['chunked']['chunks']} chunks")
+    if 'embedded' not in done:
+        document_uuid = upsert_document(document.file.name, text_content, content_hash, summary)
+        done['embedded'] = _save_checkpoint(document, 'embedded', {'uuid': str(document_uuid)})
+
+    if 'indexed' not in done:
+        count = insert_chunks(
+            done['embedded']['uuid'], document.file.name, content_hash, pieces, chunk_metadata(document)
+        )
+        done['indexed'] = _save_checkpoint(document, 'indexed', {'chunks': count})
+
+    document.summarized_file.name = f"summaries/{done['summarised']['summary_filename']}"
+    document.status = 'processed'
+    document.save(update_fields=['summarized_file', 'status'])
+    invalidate_search_results()
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from .models import CorpusGeneration, SearchResultCache
+
+
+def normalise_query(query):
+    """Case-, width- and whitespace-insensitive form of a search query"""
+    query = unicodedata.normalize('NFKC', query).casefold()
+    query = re.sub(r'\s+', ' ', query).strip()
+    return query.strip(' ?!.,;:')
+
+
+def cache_key(query, params=None):
+    payload = json.dumps([normalise_query(query), params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, 'SEARCH_CACHE_TTL', 3600))
+
+
+async def acurrent_generation():
+    """Async CorpusGeneration.current()"""
+    generation, _ = await CorpusGeneration.objects.aget_or_create(pk=1)
+    return generation.value
+
+
+async def aget_cached_results(query, params=None):
+    """Results cached for this query and parameters, or None when missing, expired or stale"""
+    entry = await SearchResultCache.objects.filter(
+        key=cache_key(query, params),
+        generation=await acurrent_generation(),
+        created_at__gte=timezone.now() - _ttl(),
+    ).only('pk', 'results').afirst()
+    if entry is None:
+        return None
+    await SearchResultCache.objects.filter(pk=entry.pk).aupdate(hits=F('hits') + 1, last_used_at=timezone.now())
+    return entry.results
+
+
+async def astore_results(query, params, results, generation):
+    """Cache results computed against corpus `generation`.
+
+    The generation must be read before querying the backend: if a document
+    is indexed while the search runs, the results are stored under the old
+    generation and are never served.
+    """
+    now = timezone.now()
+    try:
+        await SearchResultCache.objects.aupdate_or_create(
+            key=cache_key(query, params),
+            defaults={
+                'query': normalise_query(query),
+                'params': params or {},
+                'results': results,
+                'generation': generation,
+                'created_at': now,
+                'last_used_at': now,
+                'hits': 0,
+            },
+        )
+    except IntegrityError:
+        # Another request stored the same key concurrently; its results are as good as ours
+        pass
+    if _eviction_due():
+        await sync_to_async(evict_results)()
+
+
+_next_eviction = 0.0
+
+
+def _eviction_due():
+    """True at most once per SEARCH_CACHE_EVICT_INTERVAL seconds in this process"""
+    global _next_eviction
+    now = time.monotonic()
+    if now < _next_eviction:
+        return False
+    _next_eviction = now + getattr(settings, 'SEARCH_CACHE_EVICT_INTERVAL', 60)
+    return True
+
+
+def evict_results():
+    """Drop expired and stale entries, then the least recently used beyond SEARCH_CACHE_MAX_ENTRIES"""
+    SearchResultCache.objects.filter(created_at__lt=timezone.now() - _ttl()).delete()
+    SearchResultCache.objects.exclude(generation=CorpusGeneration.current()).delete()
+
+    max_entries = getattr(settings, 'SEARCH_CACHE_MAX_ENTRIES', 1000)
+    cutoff = (
+        SearchResultCache.objects.order_by('-last_used_at')
+        .values_list('last_used_at', flat=True)[max_entries:max_entries + 1]
+        .first()
+    )
+    if cutoff is not None:
+        SearchResultCache.objects.filter(last_used_at__lte=cutoff).delete()
+
+
+def invalidate_search_results():
+    """Bump the corpus generation so every cached result set becomes stale"""
+    CorpusGeneration.bump()
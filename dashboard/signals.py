@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import Document, ExtractedText, QueryCache
+from .search_cache import invalidate_search_results
+
+
+@receiver(post_delete, sender=Document)
+def evict_unused_extracted_text(sender, instance, **kwargs):
+    """Drop cached text once the last document using it is gone"""
+    if instance.extracted_text_id and not Document.objects.filter(extracted_text_id=instance.extracted_text_id).exists():
+        ExtractedText.objects.filter(pk=instance.extracted_text_id).delete()
+
+
+@receiver(post_delete, sender=Document)
+def invalidate_search_results_on_delete(sender, instance, **kwargs):
+    invalidate_search_results()
+
+
+@receiver(post_delete, sender=QueryCache)
+def remove_from_question_index(sender, instance, **kwargs):
+    from .utils.similarity import question_index
+
+    question_index.remove(instance.pk)
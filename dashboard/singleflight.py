@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+import weakref
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls so only one of them reaches the backend.
+
+    Within a process, callers with the same key share one asyncio task. A
+    caller being cancelled (its client disconnected) does not cancel the
+    shared task for the others. With `lock` enabled, a lock in the Django
+    cache backend extends this across processes: callers that lose the lock
+    poll `fetch_cached` for the winner's result instead of calling the
+    backend themselves.
+    """
+
+    def __init__(self, name, lock=False, lock_timeout=30, poll_interval=0.1):
+        self.name = name
+        self.lock = lock
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._inflight = weakref.WeakKeyDictionary()  # event loop -> {key: task}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, fn, fetch_cached=None):
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(self._run(key, fn, fetch_cached))
+            inflight[key] = task
+            task.add_done_callback(lambda done: inflight.pop(key, None) if inflight.get(key) is done else None)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    async def _run(self, key, fn, fetch_cached):
+        if not self.lock or fetch_cached is None:
+            return await fn()
+
+        lock_key = f"singleflight:{self.name}:{key}"
+        acquired = await cache.aadd(lock_key, 1, timeout=self.lock_timeout)
+        if not acquired:
+            result = await self._wait_for_leader(lock_key, fetch_cached)
+            if result is not None:
+                return result
+            # The other process failed or is too slow; do the work ourselves
+            logger.info(f"Single-flight leader for {self.name} did not finish; calling backend")
+        try:
+            return await fn()
+        finally:
+            if acquired:
+                await cache.adelete(lock_key)
+
+    async def _wait_for_leader(self, lock_key, fetch_cached):
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            result = await fetch_cached()
+            if result is not None:
+                return result
+            if not await cache.aget(lock_key):
+                # Lock released without a stored result; one last look then give up
+                return await fetch_cached()
+        return None
+
+
+search_flight = SingleFlight(
+    'search',
+    lock=getattr(settings, 'SEARCH_SINGLE_FLIGHT_LOCK', False),
+    lock_timeout=getattr(settings, 'SEARCH_SINGLE_FLIGHT_LOCK_TIMEOUT', 30),
+    poll_interval=getattr(settings, 'SEARCH_SINGLE_FLIGHT_POLL_INTERVAL', 0.1),
+)
@@ -0,0 +1,148 @@
+import json
+import logging
+import re
+from datetime import datetime, time
+from django.conf import settings
+from django.utils import timezone
+from ollama import ChatResponse
+from .weaviate_module.chunking import get_encoding
+from .weaviate_module.summarize import ollama_client
+
+logger = logging.getLogger(__name__)
+
+FIELDS_PROMPT = """Extract the following fields from this tender document and reply with a single JSON object using exactly these keys:
+"tender_number", "title", "procuring_entity", "category", "closing_date", "site_visit_date".
+"category" must be one of: ICT, Construction, Consultancy, Goods, Services, Other.
+Dates must be written as YYYY-MM-DD HH:MM when the time is known, otherwise YYYY-MM-DD.
+Use null for anything the document does not state.
+
+Summary:
+{summary}
+
+Document start:
+{text}"""
+
+CATEGORY_KEYWORDS = (
+    ('ICT', ('ict', 'software', 'computer', 'network', 'information technology', 'hardware')),
+    ('Construction', ('construction', 'works', 'building', 'civil', 'road', 'rehabilitation')),
+    ('Consultancy', ('consultancy', 'consulting', 'consultant', 'advisory', 'study')),
+    ('Goods', ('goods', 'supply', 'supplies', 'delivery', 'equipment', 'procurement of')),
+    ('Services', ('services', 'service', 'maintenance', 'cleaning', 'security', 'catering')),
+)
+
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y %H:%M', '%d-%m-%Y %H:%M', '%d.%m.%Y %H:%M',
+    '%d %B %Y %I:%M %p', '%d %B %Y %I.%M %p', '%d %B %Y %H:%M', '%d %B %Y %H.%M',
+    '%d %b %Y %I:%M %p', '%d %b %Y %H:%M',
+    '%B %d %Y %I:%M %p', '%B %d %Y %H:%M', '%b %d %Y %I:%M %p',
+)
+
+DATE_ONLY_FORMATS = (
+    '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',
+    '%d %B %Y', '%d %b %Y', '%B %d %Y', '%b %d %Y',
+)
+
+_WEEKDAYS = r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b'
+
+
+def _clean(value, max_length):
+    if value is None:
+        return ''
+    value = re.sub(r'\s+', ' ', str(value)).strip(' .,;:')
+    if value.lower() in ('null', 'none', 'n/a', 'not stated', 'not specified', 'unknown'):
+        return ''
+    return value[:max_length]
+
+
+def normalise_category(value):
+    """Map free-text categories onto CATEGORY_CHOICES"""
+    from .models import TenderDetails
+
+    text = _clean(value, 255).lower()
+    if not text:
+        return ''
+    for category, _ in TenderDetails.CATEGORY_CHOICES:
+        if text == category.lower():
+            return category
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return category
+    return 'Other'
+
+
+def parse_date(value):
+    """Parse the date formats tenders and the model commonly use into an aware datetime.
+
+    Dates without a time are taken as the end of that day, so a tender is
+    never treated as closed before its closing date is over.
+    """
+    text = _clean(value, 255)
+    if not text:
+        return None
+    text = re.sub(r'(\d)(st|nd|rd|th)\b', r'\1', text, flags=re.IGNORECASE)
+    text = re.sub(_WEEKDAYS, ' ', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b(at|on|by|before|hrs|hours|eat)\b', ' ', text, flags=re.IGNORECASE)
+    text = re.sub(r'[,]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    parsed = None
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+            break
+        except ValueError:
+            continue
+    else:
+        for fmt in DATE_ONLY_FORMATS:
+            try:
+                parsed = datetime.combine(datetime.strptime(text, fmt).date(), time(23, 59))
+                break
+            except ValueError:
+                continue
+
+    if parsed is None:
+        logger.debug(f"Could not parse tender date: {value!r}")
+        return None
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def normalise_tender_fields(raw):
+    """Validate the model's JSON into values that fit TenderDetails"""
+    if not isinstance(raw, dict):
+        raw = {}
+    return {
+        'tender_number': _clean(raw.get('tender_number'), 100),
+        'title': _clean(raw.get('title'), 500),
+        'procuring_entity': _clean(raw.get('procuring_entity'), 255),
+        'category': normalise_category(raw.get('category')),
+        'closing_date': parse_date(raw.get('closing_date')),
+        'site_visit_date': parse_date(raw.get('site_visit_date')),
+    }
+
+
+def extract_tender_fields(text_content, summary):
+    """Ask the model for the structured tender fields, returning its raw JSON object"""
+    head_tokens = getattr(settings, 'TENDER_FIELDS_CONTEXT_TOKENS', 1500)
+    encoding = get_encoding()
+    head = encoding.decode(encoding.encode(text_content, disallowed_special=())[:head_tokens])
+
+    response: ChatResponse = ollama_client().chat(
+        model=getattr(settings, 'TENDER_FIELDS_MODEL', getattr(settings, 'SUMMARY_MODEL', 'dolphin-phi')),
+        messages=[{'role': 'user', 'content': FIELDS_PROMPT.format(summary=summary, text=head)}],
+        format='json',
+    )
+    try:
+        raw = json.loads(response.message.content)
+    except (TypeError, ValueError):
+        logger.warning("Tender field extraction did not return valid JSON")
+        raw = {}
+    return raw if isinstance(raw, dict) else {}
+
+
+def save_tender_details(document, raw):
+    from .models import TenderDetails
+
+    fields = normalise_tender_fields(raw)
+    details, _ = TenderDetails.objects.update_or_create(document=document, defaults={**fields, 'raw': raw})
+    return details
@@ -1,3 +1,1044 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
 
-# Create your tests here.
+import numpy as np
+import PyPDF2
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, transaction
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .answer import _merge_overlap, citations_for, merge_passages, pack_context
+from .bulk_upload import HashingReader, ingest_uploads
+from .extraction import ExtractionResult, _page_ranges, extract_pages, get_document_text, page_needs_ocr
+from .jobs import JobHeartbeat, claim_jobs, run_job
+from .models import Document, ExtractedText, ProcessingCheckpoint, ProcessingJob, SearchResultCache
+from .processing import PermanentProcessingError, process_document
+from .search_cache import (
+    acurrent_generation, aget_cached_results, astore_results, cache_key, invalidate_search_results, normalise_query,
+)
+from .singleflight import SingleFlight
+from .tender_fields import normalise_category, normalise_tender_fields, parse_date
+from .utils.model_registry import ModelRegistry, _BatchingEncoder
+from .utils.near_duplicates import estimated_similarity, find_near_duplicate, minhash_signature, store_fingerprint
+from .utils.vector_index import IVFIndex, load_index, save_index
+from .vector_store.base import SearchFilter, entity_terms
+from .vector_store.embedded import EmbeddedStore, _sql_filter
+from .vector_store.weaviate_store import to_weaviate_filter
+from .views import search_filters, search_params, weaviate_search_filter
+from .weaviate_module.client import CHUNK_COLLECTION, DOCUMENT_COLLECTION
+from .weaviate_module.schema import MIGRATION_COLLECTION, collection_config, migrate
+from .weaviate_module.summarize import ollama_client
+from .weaviate_module.utils import highlight_snippet
+
+
+def make_user(username='owner'):
+    return get_user_model().objects.create_user(username=username, password='x')
+
+
+def make_document(user, name='a.pdf', **fields):
+    return Document.objects.create(uploaded_by=user, file=f'documents/{name}', **fields)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.document = make_document(make_user(), status='processing')
+
+    def job(self, **fields):
+        return ProcessingJob.objects.create(document=self.document, **fields)
+
+    def test_claimed_job_is_not_claimed_again(self):
+        job = self.job()
+        self.assertEqual([claimed.pk for claimed in claim_jobs('worker-1')], [job.pk])
+        self.assertEqual(claim_jobs('worker-2'), [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), ('running', 'worker-1', 1))
+
+    def test_job_waits_for_run_after(self):
+        self.job(run_after=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(claim_jobs('worker-1'), [])
+
+    @override_settings(DOCUMENT_JOB_LEASE_TIMEOUT=60)
+    def test_expired_lease_is_reclaimed(self):
+        job = self.job(status='running', attempts=1, locked_by='dead', locked_at=timezone.now() - timedelta(minutes=5))
+        self.job(status='running', attempts=1, locked_by='alive', locked_at=timezone.now())
+        self.assertEqual([claimed.pk for claimed in claim_jobs('worker-1', limit=5)], [job.pk])
+        job.refresh_from_db()
+        self.assertEqual((job.locked_by, job.attempts), ('worker-1', 2))
+
+    @override_settings(DOCUMENT_JOB_LEASE_TIMEOUT=60)
+    def test_expired_lease_on_last_attempt_fails_the_job(self):
+        job = self.job(status='running', attempts=3, max_attempts=3, locked_by='dead',
+                       locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(claim_jobs('worker-1'), [])
+        job.refresh_from_db()
+        self.document.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, self.document.status), ('failed', '', 'failed'))
+
+    def test_heartbeat_extends_the_lease_of_its_own_job_only(self):
+        self.job()
+        job = claim_jobs('worker-1')[0]
+        ProcessingJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(JobHeartbeat([job]).beat(), [job.pk])
+        job.refresh_from_db()
+        self.assertGreater(job.locked_at, timezone.now() - timedelta(minutes=1))
+
+        ProcessingJob.objects.filter(pk=job.pk).update(locked_by='worker-2')
+        self.assertEqual(JobHeartbeat([job]).beat(), [])
+
+    def test_heartbeat_renews_jobs_waiting_in_the_claimed_batch(self):
+        self.job()
+        self.job()
+        running, waiting = claim_jobs('worker-1', limit=2)
+        heartbeat = JobHeartbeat([running, waiting])
+        heartbeat.started(running)
+        ProcessingJob.objects.update(locked_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(sorted(heartbeat.beat()), sorted([running.pk, waiting.pk]))
+
+        heartbeat.finished(running)
+        self.assertEqual(heartbeat.beat(), [waiting.pk])
+
+    def test_heartbeat_stops_renewing_after_the_maximum_runtime(self):
+        self.job()
+        job = claim_jobs('worker-1')[0]
+        heartbeat = JobHeartbeat([job], max_runtime=60)
+        heartbeat.started(job)
+        with mock.patch('dashboard.jobs.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(heartbeat.beat(), [])
+
+    @override_settings(OLLAMA_TIMEOUT=5)
+    def test_model_calls_are_bounded_by_the_ollama_timeout(self):
+        self.assertEqual(ollama_client()._client.timeout.read, 5)
+
+    @override_settings(DOCUMENT_JOB_RETRY_BACKOFF=30)
+    def test_failed_attempt_is_retried_with_backoff(self):
+        self.job(max_attempts=3)
+        job = claim_jobs('worker-1')[0]
+        with mock.patch('dashboard.jobs.process_document', side_effect=RuntimeError('ollama down')):
+            self.assertFalse(run_job(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error, job.locked_by), ('queued', 'ollama down', ''))
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=20))
+
+    def test_permanent_error_fails_without_retry(self):
+        self.job(max_attempts=3)
+        job = claim_jobs('worker-1')[0]
+        with mock.patch('dashboard.jobs.process_document', side_effect=PermanentProcessingError('empty')):
+            run_job(job)
+        job.refresh_from_db()
+        self.document.refresh_from_db()
+        self.assertEqual((job.status, self.document.status), ('failed', 'failed'))
+
+
+class PageRangeTests(SimpleTestCase):
+    @override_settings(PDF_EXTRACTION_MIN_PAGES_PER_WORKER=8)
+    def test_ranges_are_contiguous_and_cover_every_page(self):
+        for page_count, workers in ((100, 4), (33, 4), (9, 16), (8, 2), (1, 4)):
+            ranges = _page_ranges(page_count, workers)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], page_count)
+            self.assertTrue(all(stop == start for (_, stop), (start, _) in zip(ranges, ranges[1:])))
+            self.assertLessEqual(max(stop - start for start, stop in ranges) - min(stop - start for start, stop in ranges), 1)
+
+    @override_settings(PDF_EXTRACTION_MIN_PAGES_PER_WORKER=8)
+    def test_small_documents_are_not_split(self):
+        self.assertEqual(_page_ranges(10, 4), [(0, 10)])
+        self.assertEqual(len(_page_ranges(32, 8)), 4)
+
+    def test_slowest_pages_are_reported(self):
+        result = ExtractionResult(pages=['a', 'b', 'c', 'd'], page_timings=[0.1, 0.9, 0.05, 0.4])
+        self.assertEqual(result.slowest_pages(2), [(2, 0.9), (4, 0.4)])
+        self.assertEqual(result.timing_summary(), "mean 0.363s/page, slowest p2 0.90s, p4 0.40s, p1 0.10s")
+
+    def test_extraction_logs_page_timings(self):
+        writer = PyPDF2.PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(width=200, height=200)
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as pdf:
+            writer.write(pdf)
+            pdf.flush()
+            with self.assertLogs('dashboard.extraction', 'DEBUG') as logs:
+                result = extract_pages(pdf.name, workers=1)
+        self.assertEqual(len(result.page_timings), 3)
+        self.assertIn('slowest p', logs.output[0])
+        self.assertEqual(sum(' page ' in line for line in logs.output), 3)
+
+
+class PageNeedsOcrTests(SimpleTestCase):
+    @override_settings(OCR_MIN_PAGE_CHARS=20)
+    def test_empty_short_and_garbled_pages_need_ocr(self):
+        self.assertTrue(page_needs_ocr(''))
+        self.assertTrue(page_needs_ocr('  \n Page 3 \n'))
+        self.assertTrue(page_needs_ocr('ÿ' * 5 + '%$#@!^&*(){}[]' * 10 + 'abc' * 10))
+
+    @override_settings(OCR_MIN_PAGE_CHARS=20)
+    def test_real_text_does_not(self):
+        self.assertFalse(page_needs_ocr('Tender No. KeRRA/008/2026: Routine maintenance of gravel roads.'))
+
+
+class DuplicateUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def upload(self, user, content, name='tender.pdf'):
+        self.client.force_login(user)
+        return self.client.post(reverse('upload_file'), {'file': SimpleUploadedFile(name, content)})
+
+    def staff(self, username):
+        user = make_user(username)
+        user.is_staff = True
+        user.save()
+        return user
+
+    def test_upload_rejects_a_copy_from_the_same_owner_only(self):
+        owner, other = self.staff('owner'), self.staff('other')
+        self.upload(owner, b'%PDF tender')
+        self.upload(owner, b'%PDF tender', 'copy.pdf')
+        self.upload(other, b'%PDF tender', 'copy.pdf')
+        self.assertEqual(
+            sorted(Document.objects.values_list('uploaded_by__username', flat=True)), ['other', 'owner']
+        )
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=10)
+    def test_large_uploads_are_hashed_once(self):
+        content = b'%PDF ' + b'x' * 5000
+        hashed = []
+
+        class CountingSha256:
+            def __init__(self):
+                self.digest = hashlib.sha256()
+
+            def update(self, chunk):
+                hashed.append(len(chunk))
+                self.digest.update(chunk)
+
+            def hexdigest(self):
+                return self.digest.hexdigest()
+
+        with mock.patch('dashboard.uploadhandlers.hashlib', SimpleNamespace(sha256=CountingSha256)):
+            self.upload(self.staff('owner'), content)
+        self.assertEqual(sum(hashed), len(content))
+        self.assertEqual(Document.objects.get().file_sha256, hashlib.sha256(content).hexdigest())
+
+    def test_owner_cannot_store_the_same_file_twice(self):
+        user = make_user()
+        make_document(user, 'a.pdf', file_sha256='f' * 64)
+        make_document(make_user('other'), 'a.pdf', file_sha256='f' * 64)
+        make_document(user, 'legacy.pdf')
+        make_document(user, 'legacy-copy.pdf')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            make_document(user, 'b.pdf', file_sha256='f' * 64)
+
+
+WORDS = (
+    "tender supply delivery installation county roads authority ministry health works goods services "
+    "contract bidder evaluation criteria closing date site visit bond security documents submission "
+    "laptops printers gravel drainage culverts bridge water pipeline school hospital equipment training"
+).split()
+
+
+def words(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return " ".join(WORDS[i] for i in rng.integers(0, len(WORDS), size=count))
+
+
+@override_settings(MINHASH_PERMUTATIONS=128, MINHASH_BANDS=16, NEAR_DUPLICATE_THRESHOLD=0.85)
+class NearDuplicateTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.text = words(600)
+
+    def fingerprint(self, text, name, status='processed'):
+        document = make_document(self.user, name, status=status)
+        store_fingerprint(document, minhash_signature(text))
+        return document
+
+    def test_signature_is_deterministic(self):
+        signature = minhash_signature(self.text)
+        self.assertEqual(signature.dtype, np.uint32)
+        self.assertEqual(len(signature), 128)
+        self.assertTrue(np.array_equal(signature, minhash_signature(self.text.upper())))
+
+    def test_lightly_edited_copy_is_a_near_duplicate(self):
+        original = self.fingerprint(self.text, 'original.pdf')
+        edited = self.text.split()
+        edited[300] = 'amended'
+        signature = minhash_signature(" ".join(edited))
+        self.assertGreaterEqual(estimated_similarity(signature, minhash_signature(self.text)), 0.85)
+        duplicate, similarity = find_near_duplicate(signature)
+        self.assertEqual(duplicate, original)
+        self.assertGreaterEqual(similarity, 0.85)
+
+    def test_different_document_is_not(self):
+        self.fingerprint(self.text, 'original.pdf')
+        duplicate, similarity = find_near_duplicate(minhash_signature(words(600, seed=1)))
+        self.assertIsNone(duplicate)
+        self.assertLess(similarity, 0.85)
+
+    def test_threshold_and_status_are_respected(self):
+        edited = self.text.split()
+        edited[::30] = ['amended'] * len(edited[::30])
+        revision = self.fingerprint(" ".join(edited), 'revision.pdf')
+        self.fingerprint(self.text, 'unprocessed.pdf', status='processing')
+        signature = minhash_signature(self.text)
+        duplicate, similarity = find_near_duplicate(signature)
+        self.assertIsNone(duplicate)
+        self.assertTrue(0.6 < similarity < 0.85)
+        self.assertEqual(find_near_duplicate(signature, threshold=0.6)[0], revision)
+
+    def test_document_is_not_its_own_duplicate(self):
+        document = self.fingerprint(self.text, 'original.pdf')
+        self.assertIsNone(find_near_duplicate(minhash_signature(self.text), exclude_document=document)[0])
+
+
+class CheckpointResumeTests(TestCase):
+    def setUp(self):
+        self.document = make_document(make_user(), status='processing')
+        text = words(200)
+        self.patches = {
+            name: mock.patch(f'dashboard.processing.{name}', **kwargs).start()
+            for name, kwargs in {
+                'get_document_text': {'return_value': text},
+                'find_by_content_hash': {'return_value': None},
+                'chunk_text': {'return_value': ['first chunk', 'second chunk']},
+                'summarize_text': {'return_value': 'A summary'},
+                'write_summary_file': {'return_value': 'a.pdf_ai_summarized.json'},
+                'extract_tender_fields': {'return_value': {'title': 'Roads'}},
+                'upsert_document': {'return_value': 'b4d6f3a0-0000-5000-8000-000000000000'},
+                'insert_chunks': {'side_effect': RuntimeError('Weaviate down')},
+            }.items()
+        }
+        self.addCleanup(mock.patch.stopall)
+
+    def test_retry_resumes_after_the_last_completed_stage(self):
+        with self.assertRaises(RuntimeError):
+            process_document(self.document)
+        self.assertEqual(
+            set(self.document.checkpoints.values_list('stage', flat=True)),
+            {'extracted', 'chunked', 'summarised', 'structured', 'embedded'},
+        )
+
+        self.patches['insert_chunks'].side_effect = None
+        self.patches['insert_chunks'].return_value = 2
+        process_document(self.document)
+
+        for name in ('summarize_text', 'extract_tender_fields', 'upsert_document'):
+            self.assertEqual(self.patches[name].call_count, 1, name)
+        self.assertEqual(self.patches['insert_chunks'].call_count, 2)
+        # Chunks are recomputed on resume rather than stored in the checkpoint
+        self.assertEqual(self.patches['chunk_text'].call_count, 2)
+        self.assertEqual(self.patches['insert_chunks'].call_args.args[3], ['first chunk', 'second chunk'])
+        self.assertEqual(
+            ProcessingCheckpoint.objects.get(document=self.document, stage='chunked').output, {'chunks': 2}
+        )
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, 'processed')
+        self.assertEqual(self.document.summarized_file.name, 'summaries/a.pdf_ai_summarized.json')
+        self.assertEqual(
+            ProcessingCheckpoint.objects.get(document=self.document, stage='indexed').output, {'chunks': 2}
+        )
+
+
+class VectorIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(400, 16)).astype(np.float32)
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def test_ivf_index_survives_save_and_load(self):
+        index = IVFIndex.train(self.vectors, nlist=16, nprobe=16)
+        index.add(np.arange(1, 401), self.vectors)
+        index.remove(7)
+        path = os.path.join(self.directory, 'index', 'questions.npz')
+        save_index(index, path, last_pk=400)
+
+        loaded, last_pk = load_index(path)
+        self.assertIsInstance(loaded, IVFIndex)
+        self.assertEqual((len(loaded), last_pk, loaded.nprobe), (399, 400, 16))
+        self.assertEqual(loaded.search(self.vectors[41]), index.search(self.vectors[41]))
+        self.assertNotEqual(loaded.search(self.vectors[6])[0], 7)
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['questions.npz'])
+
+    def test_missing_or_corrupt_file_loads_as_empty(self):
+        path = os.path.join(self.directory, 'questions.npz')
+        self.assertEqual(load_index(path), (None, 0))
+        with open(path, 'wb') as handle:
+            handle.write(b'not an npz file')
+        self.assertEqual(load_index(path), (None, 0))
+
+
+class SearchCacheTests(TestCase):
+    def test_equivalent_queries_share_a_key(self):
+        self.assertEqual(normalise_query('  Road　MAINTENANCE   tenders?? '), 'road maintenance tenders')
+        self.assertEqual(cache_key('Road maintenance', {'limit': 10}), cache_key('road  MAINTENANCE?', {'limit': 10}))
+        self.assertNotEqual(cache_key('road maintenance', {'limit': 10}), cache_key('road maintenance', {'limit': 20}))
+        self.assertEqual(cache_key('q', {'a': 1, 'b': 2}), cache_key('q', {'b': 2, 'a': 1}))
+
+    async def test_results_are_invalidated_by_a_new_generation(self):
+        await astore_results('roads', {}, [{'document_id': 1}], await acurrent_generation())
+        self.assertEqual(await aget_cached_results('Roads?', {}), [{'document_id': 1}])
+        await sync_to_async(invalidate_search_results)()
+        self.assertIsNone(await aget_cached_results('roads', {}))
+
+    async def test_results_computed_against_an_old_generation_are_never_served(self):
+        generation = await acurrent_generation()
+        await sync_to_async(invalidate_search_results)()  # a document was indexed while the search ran
+        await astore_results('roads', {}, [{'document_id': 1}], generation)
+        self.assertIsNone(await aget_cached_results('roads', {}))
+
+    @override_settings(SEARCH_CACHE_TTL=60)
+    async def test_expired_results_are_not_served(self):
+        await astore_results('roads', {}, [], await acurrent_generation())
+        await SearchResultCache.objects.aupdate(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertIsNone(await aget_cached_results('roads', {}))
+
+    async def test_a_hit_is_counted(self):
+        await astore_results('roads', {}, [], await acurrent_generation())
+        await aget_cached_results('roads', {})
+        self.assertEqual(await SearchResultCache.objects.values_list('hits', flat=True).aget(), 1)
+
+
+class SearchFilterTests(SimpleTestCase):
+    def test_search_filters_parse_form_data(self):
+        data = QueryDict(mutable=True)
+        data.setlist('document', ['3,1', '2', ''])
+        data.update({'uploaded_from': '2026-01-01', 'category': 'ICT', 'entity': '  Ministry of Health ', 'closing': 'open'})
+        self.assertEqual(search_filters(data), {
+            'document_ids': [1, 2, 3],
+            'uploaded_from': '2026-01-01',
+            'category': 'ICT',
+            'entity': 'Ministry of Health',
+            'closing': 'open',
+        })
+        self.assertEqual(search_filters({'document': 5}), {'document_ids': [5]})
+
+    def test_invalid_filters_raise_value_error(self):
+        for data in ({'document': 'x'}, {'uploaded_from': '01/02/2026'}, {'category': 'Weapons'}, {'closing': 'soon'}):
+            with self.assertRaises(ValueError, msg=data):
+                search_filters(data)
+
+    def test_search_params_reject_non_finite_alpha(self):
+        self.assertEqual(search_params({'alpha': '2', 'limit': '500', 'offset': '-1'})['alpha'], 1.0)
+        for alpha in ('nan', 'inf', '-Infinity'):
+            with self.assertRaises(ValueError):
+                search_params({'alpha': alpha})
+
+    def test_filters_become_a_search_filter(self):
+        search_filter = weaviate_search_filter({'document_ids': [2, 1], 'uploaded_to': '2026-03-01', 'entity': 'KeRRA'})
+        self.assertEqual(search_filter.document_ids, (2, 1))
+        self.assertEqual(timezone.localtime(search_filter.uploaded_before).date().isoformat(), '2026-03-02')
+        self.assertEqual(search_filter.entity, 'KeRRA')
+        self.assertIsNone(weaviate_search_filter({}))
+
+    def test_filters_are_pushed_down_to_each_backend(self):
+        search_filter = SearchFilter(document_ids=(1, 2), category='ICT', entity='Ministry of e-Health')
+        where, params = _sql_filter(search_filter)
+        self.assertIn('chunks.document_id IN (?, ?)', where)
+        self.assertEqual(params, [1, 2, 'ICT', '%ministry%', '%of%', '%e%', '%health%'])
+        self.assertIsNotNone(to_weaviate_filter(search_filter))
+        self.assertIsNone(to_weaviate_filter(None))
+        self.assertIsNone(to_weaviate_filter(SearchFilter(entity='--')))
+
+    def test_entity_terms(self):
+        self.assertEqual(entity_terms('  Kenya Rural-Roads  Authority '), ['kenya', 'rural', 'roads', 'authority'])
+        self.assertEqual(entity_terms(None), [])
+
+
+class WordEncoding:
+    """Stand-in for tiktoken: one token per whitespace-separated word"""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split(' ') if text else []
+
+    def decode(self, tokens):
+        return ' '.join(tokens)
+
+
+def count_words(text):
+    return len(WordEncoding().encode(text))
+
+
+@mock.patch('dashboard.answer.get_encoding', WordEncoding)
+@mock.patch('dashboard.answer.count_tokens', count_words)
+class AnswerContextTests(SimpleTestCase):
+    def hit(self, index, text, score, document_id=1):
+        return {'document_id': document_id, 'chunk_index': index, 'text': text, 'score': score,
+                'file_name': f'{document_id}.pdf', 'title': f'Tender {document_id}'}
+
+    def test_merge_overlap_drops_the_repeated_boundary(self):
+        first = 'The bidder shall submit a bid security of KES 200,000 with the tender documents'
+        second = 'a bid security of KES 200,000 with the tender documents before the closing date'
+        self.assertEqual(_merge_overlap(first, second), first + ' before the closing date')
+        self.assertEqual(_merge_overlap('no shared text here', 'entirely different words'),
+                         'no shared text here\nentirely different words')
+
+    def test_adjacent_chunks_merge_up_to_the_passage_cap(self):
+        hits = [self.hit(index, words(10, seed=index), score) for index, score in enumerate((0.1, 0.9, 0.2))]
+        merged = merge_passages(hits, max_tokens=100)
+        self.assertEqual([passage['chunks'] for passage in merged], [[0, 1, 2]])
+        self.assertEqual(merged[0]['score'], 0.9)
+        self.assertTrue(merged[0]['text'][merged[0]['best_offset']:].startswith(hits[1]['text']))
+        self.assertEqual([passage['chunks'] for passage in merge_passages(hits, max_tokens=20)], [[0, 1], [2]])
+
+    def test_hits_without_a_chunk_index_are_kept_apart(self):
+        hits = [{'document_id': 1, 'text': 'first', 'score': 0.5}, {'document_id': 1, 'text': 'second', 'score': 0.4}]
+        self.assertEqual([passage['text'] for passage in merge_passages(hits)], ['first', 'second'])
+
+    def test_pack_context_skips_what_does_not_fit(self):
+        passages = merge_passages([
+            self.hit(0, words(30, seed=1), 0.9, document_id=1),
+            self.hit(0, words(5, seed=2), 0.5, document_id=2),
+            self.hit(0, words(5, seed=3), 0.4, document_id=3),
+        ])
+        selected, used = pack_context(passages, budget=30)
+        self.assertEqual([passage['document_id'] for passage in selected], [2, 3])
+        self.assertEqual(used, 26)
+
+    def test_oversized_top_passage_is_truncated_around_its_best_chunk(self):
+        hits = [self.hit(index, words(10, seed=index), score) for index, score in enumerate((0.1, 0.9, 0.2))]
+        selected, used = pack_context(merge_passages(hits), budget=23)
+        self.assertEqual(len(selected), 1)
+        self.assertEqual(used, 23)
+        self.assertTrue(selected[0]['text'].startswith(hits[1]['text']))
+
+    def test_citations_follow_the_answer(self):
+        passages = [{'document_id': n, 'title': f'T{n}', 'file_name': f'{n}.pdf', 'chunks': [n]} for n in (1, 2, 3)]
+        self.assertEqual([c['ref'] for c in citations_for('See [3] and [1], not [7].', passages)], [1, 3])
+        self.assertEqual([c['document_id'] for c in citations_for('No citations.', passages)], [1, 2, 3])
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_identical_calls_share_one_backend_call(self):
+        flight = SingleFlight('test')
+        calls = []
+
+        async def backend():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ['result']
+
+        async def main():
+            return await asyncio.gather(*(flight.do('key', backend) for _ in range(5)), flight.do('other', backend))
+
+        results = asyncio.run(main())
+        self.assertEqual(results, [['result']] * 6)
+        self.assertEqual((len(calls), flight.calls, flight.shared), (2, 2, 4))
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        flight = SingleFlight('test')
+
+        async def backend():
+            await asyncio.sleep(0.02)
+            return 'done'
+
+        async def main():
+            first = asyncio.ensure_future(flight.do('key', backend))
+            second = asyncio.ensure_future(flight.do('key', backend))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), 'done')
+
+
+def fake_encode(store, texts):
+    """Hashed bag of words, so related texts have similar unit vectors"""
+    vectors = []
+    for text in texts:
+        vector = np.zeros(64, dtype=np.float32)
+        for word in re.findall(r'\w+', text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+        norm = np.linalg.norm(vector)
+        vectors.append(vector / norm if norm else vector)
+    return np.array(vectors)
+
+
+class EmbeddedStoreTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(EmbeddedStore, '_encode', fake_encode)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = EmbeddedStore(self.directory)
+        self.uploaded = timezone.now().replace(microsecond=0)
+        self.store.upsert_document('0b5c2f0e-0000-5000-8000-000000000001', {
+            'file_name': 'roads.pdf', 'time_created': self.uploaded, 'content_hash': 'h1',
+            'summary': 'Gravel roads', 'text_content': 'full text',
+        })
+        self.store.insert_chunks('0b5c2f0e-0000-5000-8000-000000000001', 'h1', [
+            {'text': 'construction of gravel roads', 'chunk_index': 0, 'file_name': 'roads.pdf', 'content_hash': 'h1',
+             'document_id': 1, 'category': 'Construction', 'procuring_entity': 'Kenya Rural Roads Authority'},
+            {'text': 'drainage culverts and bridges', 'chunk_index': 1, 'file_name': 'roads.pdf', 'content_hash': 'h1',
+             'document_id': 1, 'category': 'Construction', 'procuring_entity': 'Kenya Rural Roads Authority'},
+        ])
+        self.store.insert_chunks('0b5c2f0e-0000-5000-8000-000000000002', 'h2', [
+            {'text': 'supply of laptops for schools', 'chunk_index': 0, 'file_name': 'ict.pdf', 'content_hash': 'h2',
+             'document_id': 2, 'category': 'ICT'},
+        ])
+
+    def test_document_round_trip(self):
+        document = self.store.find_document(content_hash='h1')
+        self.assertEqual(document['file_name'], 'roads.pdf')
+        self.assertEqual(document['time_created'], self.uploaded)
+        self.assertEqual(self.store.find_document(file_name='roads.pdf')['content_hash'], 'h1')
+        self.assertIsNone(self.store.find_document(content_hash='missing'))
+
+    def test_searches_find_the_matching_chunk(self):
+        self.assertEqual(self.store.bm25('culverts')[0]['chunk_index'], 1)
+        self.assertEqual(self.store.near_vector(fake_encode(self.store, ['laptops schools'])[0])[0]['document_id'], 2)
+        hits = self.store.hybrid('gravel roads', limit=3)
+        self.assertEqual((hits[0]['file_name'], hits[0]['chunk_index']), ('roads.pdf', 0))
+
+    def test_filters_apply_inside_the_search(self):
+        self.assertEqual({hit['document_id'] for hit in self.store.hybrid('supply', filters=SearchFilter(category='Construction'))}, {1})
+        self.assertEqual(len(self.store.hybrid('roads', filters=SearchFilter(entity='rural road'))), 2)
+        self.assertEqual(self.store.hybrid('roads', filters=SearchFilter(entity='urban roads')), [])
+
+    def test_delete_removes_document_and_chunks(self):
+        self.assertTrue(self.store.delete_document('h1'))
+        self.assertIsNone(self.store.find_document(content_hash='h1'))
+        self.assertEqual({hit['document_id'] for hit in self.store.hybrid('roads')}, {2})
+
+
+class ProgressStreamTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.document = make_document(self.user, status='processed')
+        ProcessingJob.objects.create(document=self.document, status='succeeded')
+        self.url = reverse('job_events', args=[self.document.pk])
+
+    def test_wsgi_stream_is_a_sync_iterator(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertFalse(response.is_async)
+        messages = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(messages[0], "retry: 2000\n\n")
+        self.assertIn('"status": "succeeded"', messages[1])
+        self.assertEqual(messages[-1], "event: done\ndata: {}\n\n")
+
+    async def test_asgi_stream_is_an_async_iterator(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.is_async)
+        messages = [chunk.decode() async for chunk in response.streaming_content]
+        self.assertEqual(messages[-1], "event: done\ndata: {}\n\n")
+
+
+class FakeModel:
+    """Records each forward pass; a text's vector is [its length, 1]"""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, normalize_embeddings=True, convert_to_numpy=True):
+        self.batches.append(list(texts))
+        return np.array([[len(text), 1] for text in texts], dtype=np.float64)
+
+
+class BatchingEncoderTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_forward_pass(self):
+        model = FakeModel()
+        encoder = _BatchingEncoder(model, max_batch=8, max_wait=5)
+        texts = ['a' * (n + 1) for n in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda text: encoder.encode([text]), texts))
+
+        self.assertEqual(len(model.batches), 1)
+        self.assertEqual(sorted(model.batches[0]), texts)
+        self.assertEqual([result.tolist() for result in results], [[[len(text), 1]] for text in texts])
+        self.assertEqual((encoder.calls, encoder.forward_passes, encoder.encoded_texts), (8, 1, 8))
+
+    def test_model_errors_reach_every_caller_in_the_batch(self):
+        model = mock.Mock()
+        model.encode.side_effect = RuntimeError('out of memory')
+        encoder = _BatchingEncoder(model, max_batch=1, max_wait=0)
+        with self.assertRaisesMessage(RuntimeError, 'out of memory'):
+            encoder.encode(['text'])
+
+    def test_registry_encodes_float32_and_rebuilds_its_thread_after_a_fork(self):
+        registry = ModelRegistry()
+        registry._models['fake'] = FakeModel()
+        registry._metrics['fake'] = {}
+        vectors = registry.encode(['abc'], name='fake')
+        self.assertEqual((vectors.dtype, vectors.tolist()), (np.float32, [[3, 1]]))
+        self.assertEqual(registry.metrics()['models']['fake']['forward_passes'], 1)
+
+        with mock.patch('dashboard.utils.model_registry.os.getpid', return_value=registry._pid + 1):
+            self.assertEqual(registry.metrics()['models']['fake']['forward_passes'], 0)
+            self.assertIn('fake', registry._models)
+
+
+class FakeCollection:
+    """In-memory stand-in for a Weaviate collection, covering what the schema migrations use"""
+
+    def __init__(self, server, name, config):
+        self.server = server
+        self.name = name
+        self.references = {ref.name: ref.target_collection for ref in config.get('references') or []}
+        self.properties = config.get('properties') or []
+        self.objects = {}
+        self.batch = self
+        self.failed_objects = []
+        self.data = SimpleNamespace(insert=self.add_object)
+        self.config = SimpleNamespace(get=self._config, add_property=self.properties.append)
+
+    def _config(self):
+        return SimpleNamespace(properties=[
+            SimpleNamespace(name=prop.name, index_range_filters=bool(prop.indexRangeFilters), tokenization=prop.tokenization)
+            for prop in self.properties
+        ])
+
+    def dynamic(self):
+        return contextlib.nullcontext(self)
+
+    def add_object(self, properties, uuid=None, vector=None, references=None):
+        uuid = uuid or uuid4()
+        self.objects[uuid] = SimpleNamespace(
+            uuid=uuid, properties=dict(properties), vector=vector, references=references or {},
+            metadata=SimpleNamespace(creation_time=datetime.now(dt_timezone.utc)),
+        )
+        return uuid
+
+    def iterator(self, return_references=None, **kwargs):
+        for obj in list(self.objects.values()):
+            yield SimpleNamespace(
+                uuid=obj.uuid, properties=obj.properties, vector=obj.vector, metadata=obj.metadata,
+                references={
+                    name: SimpleNamespace(objects=[SimpleNamespace(uuid=linked) for linked in uuids])
+                    for name, uuids in obj.references.items()
+                } if return_references else None,
+            )
+        if self.server.during_copy is not None:
+            write, self.server.during_copy = self.server.during_copy, None
+            write()
+
+
+class FakeWeaviate:
+    def __init__(self, version='1.32.0'):
+        self.version = version
+        self.physical = {}
+        self.aliases = {}
+        self.during_copy = None
+        self.collections = SimpleNamespace(
+            exists=self.physical.__contains__, create=self._create, delete=self.physical.pop, get=self._get,
+        )
+        self.alias = SimpleNamespace(get=self._get_alias, create=self._create_alias, update=self._update_alias)
+
+    def get_meta(self):
+        return {'version': self.version}
+
+    def _create(self, name, **config):
+        if name in self.physical or name in self.aliases:
+            raise ValueError(f'{name} exists')
+        self.physical[name] = FakeCollection(self, name, config)
+
+    def _get(self, name):
+        return self.physical[self.aliases.get(name, name)]
+
+    def _get_alias(self, alias_name):
+        return SimpleNamespace(collection=self.aliases[alias_name]) if alias_name in self.aliases else None
+
+    def _create_alias(self, alias_name, target_collection):
+        if alias_name in self.physical or alias_name in self.aliases:
+            raise ValueError(f'{alias_name} exists')
+        self.aliases[alias_name] = target_collection
+
+    def _update_alias(self, alias_name, new_target_collection):
+        self.aliases[alias_name] = new_target_collection
+
+
+class WeaviateMigrationTests(SimpleTestCase):
+    def setUp(self):
+        self.client = FakeWeaviate()
+
+    def add_tender(self, text='closing date'):
+        document = self.client.collections.get(DOCUMENT_COLLECTION).data.insert({'file_name': 'a.pdf'})
+        self.client.collections.get(CHUNK_COLLECTION).data.insert(
+            {'text': text}, references={'document': [document]}
+        )
+        return document
+
+    def test_fresh_instance_gets_aliased_collections(self):
+        self.assertEqual(migrate(self.client), [1, 2])
+        self.assertEqual(self.client.aliases, {
+            DOCUMENT_COLLECTION: f'{DOCUMENT_COLLECTION}_v1', CHUNK_COLLECTION: f'{CHUNK_COLLECTION}_v1',
+        })
+        self.assertEqual(self.client.collections.get(CHUNK_COLLECTION).references, {'document': f'{DOCUMENT_COLLECTION}_v1'})
+        self.assertEqual(migrate(self.client), [])
+
+    def test_reindexing_documents_rebuilds_the_chunks_that_refer_to_them(self):
+        migrate(self.client)
+        document = self.add_tender()
+        migrate(self.client, reindex=[DOCUMENT_COLLECTION])
+
+        self.assertEqual(self.client.aliases, {
+            DOCUMENT_COLLECTION: f'{DOCUMENT_COLLECTION}_v3', CHUNK_COLLECTION: f'{CHUNK_COLLECTION}_v3',
+        })
+        self.assertEqual(sorted(self.client.physical), sorted([
+            MIGRATION_COLLECTION, f'{DOCUMENT_COLLECTION}_v3', f'{CHUNK_COLLECTION}_v3',
+        ]))
+        chunks = self.client.collections.get(CHUNK_COLLECTION)
+        self.assertEqual(chunks.references, {'document': f'{DOCUMENT_COLLECTION}_v3'})
+        [chunk] = chunks.objects.values()
+        self.assertEqual(chunk.references, {'document': [document]})
+        self.assertIn(document, self.client.collections.get(DOCUMENT_COLLECTION).objects)
+
+    def test_first_reindex_of_a_plain_collection_keeps_writes_made_during_the_copy(self):
+        for name in (DOCUMENT_COLLECTION, CHUNK_COLLECTION):
+            self.client.collections.create(name=name, **collection_config(name, self.client))
+        migrate(self.client)
+        self.add_tender('before')
+        self.client.during_copy = lambda: self.add_tender('during')
+        with self.assertLogs('dashboard.weaviate_module.schema', 'WARNING'):
+            migrate(self.client, reindex=[CHUNK_COLLECTION])
+
+        self.assertEqual(self.client.aliases, {CHUNK_COLLECTION: f'{CHUNK_COLLECTION}_v3'})
+        texts = sorted(obj.properties['text'] for obj in self.client.collections.get(CHUNK_COLLECTION).objects.values())
+        self.assertEqual(texts, ['before', 'during'])
+
+    def test_reindex_needs_aliases(self):
+        self.client.version = '1.31.2'
+        migrate(self.client)
+        with self.assertRaisesMessage(RuntimeError, 'needs Weaviate 1.32+'):
+            migrate(self.client, reindex=[CHUNK_COLLECTION])
+
+
+class DeleteDocumentTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.store = mock.Mock()
+        patcher = mock.patch('dashboard.processing.get_vector_store', return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def extracted(self, document, content_hash='abc'):
+        ProcessingCheckpoint.objects.create(document=document, stage='extracted', output={'content_hash': content_hash})
+        return document
+
+    def test_deleting_the_last_copy_removes_it_from_the_vector_store(self):
+        document = self.extracted(make_document(self.user, status='processed'))
+        self.client.post(reverse('delete_document', args=[document.pk]))
+        self.assertFalse(Document.objects.exists())
+        self.store.delete_document.assert_called_once_with('abc')
+
+    def test_text_still_used_by_another_document_stays_indexed(self):
+        document = self.extracted(make_document(self.user, 'a.pdf'))
+        self.extracted(make_document(make_user('other'), 'b.pdf'))
+        self.client.post(reverse('delete_document', args=[document.pk]))
+        self.store.delete_document.assert_not_called()
+
+
+class ExtractedTextCacheTests(TestCase):
+    def setUp(self):
+        self.documents = [
+            make_document(make_user(name), f'{name}.pdf', file_sha256='f' * 64) for name in ('first', 'second')
+        ]
+
+    @mock.patch('dashboard.extraction.extract_text_from_pdf', return_value='closing date 30 June')
+    def test_text_is_extracted_once_per_file_content_and_stored_compressed(self, extract):
+        self.assertEqual([get_document_text(document) for document in self.documents], ['closing date 30 June'] * 2)
+        extract.assert_called_once()
+        entry = ExtractedText.objects.get()
+        self.assertEqual(entry.documents.count(), 2)
+        self.assertNotIn(b'closing date', bytes(entry.compressed_text))
+
+    @mock.patch('dashboard.extraction.extract_text_from_pdf', return_value='text')
+    def test_text_is_evicted_with_the_last_document_using_it(self, extract):
+        for document in self.documents:
+            get_document_text(document)
+        self.documents[0].delete()
+        self.assertTrue(ExtractedText.objects.exists())
+        self.documents[1].delete()
+        self.assertFalse(ExtractedText.objects.exists())
+
+    def test_content_view_shows_cached_text_without_writing_or_queueing(self):
+        ExtractedText.objects.create(sha256='f' * 64, compressed_text=ExtractedText.compress('bid bond'), char_count=8)
+        first, second = self.documents
+        second.file_sha256 = 'e' * 64
+        second.save()
+
+        self.client.force_login(first.uploaded_by)
+        self.assertContains(self.client.get(reverse('view_document_content', args=[first.pk])), 'bid bond')
+        self.assertContains(
+            self.client.get(reverse('view_document_content', args=[second.pk])), 'Text has not been extracted yet'
+        )
+        self.assertFalse(ProcessingJob.objects.exists())
+        self.assertEqual(
+            list(Document.objects.order_by('pk').values_list('status', 'extracted_text')),
+            [('uploaded', None), ('uploaded', None)],
+        )
+
+
+def zip_upload(members, name='tenders.zip'):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for member, content in members.items():
+            archive.writestr(member, content)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class BulkUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.user = make_user()
+
+    def test_hashing_reader_hashes_what_storage_reads(self):
+        reader = HashingReader(io.BytesIO(b'%PDF-1.4 tender'))
+        reader.seek(0)
+        self.assertEqual(reader.read(4) + reader.read(), b'%PDF-1.4 tender')
+        self.assertEqual(reader.sha256.hexdigest(), hashlib.sha256(b'%PDF-1.4 tender').hexdigest())
+        with self.assertRaises(OSError):
+            reader.seek(0)
+
+    def test_pdfs_are_extracted_from_archives(self):
+        upload = zip_upload({
+            'roads.pdf': b'%PDF roads', 'nested/Water.PDF': b'%PDF water', 'nested/': b'',
+            '.hidden.pdf': b'%PDF hidden', 'notes.txt': b'notes',
+        })
+        created, duplicates, too_large = ingest_uploads([upload], self.user)
+        self.assertEqual((duplicates, too_large), ([], []))
+        stored = {os.path.basename(document.file.name): document for document in created}
+        self.assertEqual(sorted(stored), ['Water.PDF', 'roads.pdf'])
+        with stored['roads.pdf'].file.open('rb') as file:
+            self.assertEqual(file.read(), b'%PDF roads')
+        self.assertEqual(stored['roads.pdf'].file_sha256, hashlib.sha256(b'%PDF roads').hexdigest())
+
+    def test_files_already_uploaded_are_skipped(self):
+        ingest_uploads([SimpleUploadedFile('roads.pdf', b'%PDF roads')], self.user)
+        created, duplicates, _ = ingest_uploads([zip_upload({'copy.pdf': b'%PDF roads', 'new.pdf': b'%PDF new'})], self.user)
+        self.assertEqual([os.path.basename(document.file.name) for document in created], ['new.pdf'])
+        self.assertEqual([name for name, _ in duplicates], ['copy.pdf'])
+        self.assertEqual(Document.objects.count(), 2)
+
+    @override_settings(BULK_UPLOAD_MAX_MEMBER_SIZE=1000, BULK_UPLOAD_MAX_EXTRACTED_SIZE=1500)
+    def test_members_are_limited_by_uncompressed_size(self):
+        upload = zip_upload({
+            'bomb.pdf': b'0' * 5000, 'first.pdf': b'1' * 900, 'second.pdf': b'2' * 900, 'small.pdf': b'3' * 500,
+        })
+        with self.assertLogs('dashboard.bulk_upload', 'WARNING'):
+            created, _, too_large = ingest_uploads([upload], self.user)
+        self.assertEqual(sorted(os.path.basename(document.file.name) for document in created), ['first.pdf', 'small.pdf'])
+        self.assertEqual(too_large, ['bomb.pdf', 'second.pdf'])
+
+
+class TenderFieldTests(SimpleTestCase):
+    def test_dates_in_every_supported_format(self):
+        at = lambda *args: timezone.make_aware(datetime(*args))
+        cases = [
+            ('2025-03-14 10:00', at(2025, 3, 14, 10, 0)),
+            ('2025-03-14T10:30:00', at(2025, 3, 14, 10, 30)),
+            ('2025-03-14T10:30', at(2025, 3, 14, 10, 30)),
+            ('2025-03-14 10:30:15', at(2025, 3, 14, 10, 30, 15)),
+            ('14/03/2025 10:00', at(2025, 3, 14, 10, 0)),
+            ('14-03-2025 10:00', at(2025, 3, 14, 10, 0)),
+            ('14.03.2025 10:00', at(2025, 3, 14, 10, 0)),
+            ('14th March 2025 at 10:00 AM', at(2025, 3, 14, 10, 0)),
+            ('Friday, 14th March, 2025 at 2.30 PM', at(2025, 3, 14, 14, 30)),
+            ('14 March 2025 at 14:00 hrs', at(2025, 3, 14, 14, 0)),
+            ('14 March 2025 14.00', at(2025, 3, 14, 14, 0)),
+            ('14 Mar 2025 10:00 am', at(2025, 3, 14, 10, 0)),
+            ('14 Mar 2025 10:00', at(2025, 3, 14, 10, 0)),
+            ('March 14, 2025 10:00 AM', at(2025, 3, 14, 10, 0)),
+            ('March 14 2025 10:00', at(2025, 3, 14, 10, 0)),
+            ('Mar 14, 2025 10:00 AM', at(2025, 3, 14, 10, 0)),
+            ('before 14/03/2025 at 10:00 EAT', at(2025, 3, 14, 10, 0)),
+            # Without a time, a date means the end of that day
+            ('2025-03-14', at(2025, 3, 14, 23, 59)),
+            ('14/03/2025', at(2025, 3, 14, 23, 59)),
+            ('14-03-2025', at(2025, 3, 14, 23, 59)),
+            ('14.03.2025', at(2025, 3, 14, 23, 59)),
+            ('14th March 2025', at(2025, 3, 14, 23, 59)),
+            ('14 Mar 2025', at(2025, 3, 14, 23, 59)),
+            ('March 14, 2025', at(2025, 3, 14, 23, 59)),
+            ('Mar 14 2025', at(2025, 3, 14, 23, 59)),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(parse_date(value), expected)
+
+    def test_unparseable_and_empty_dates(self):
+        for value in (None, '', '   ', 'null', 'Not stated', 'N/A', 'next Tuesday', '31/02/2025', 'March 2025'):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_date(value))
+
+    def test_categories(self):
+        cases = [
+            ('ICT', 'ICT'),
+            ('construction', 'Construction'),
+            (' Goods. ', 'Goods'),
+            ('Supply of computer hardware', 'ICT'),
+            ('Road rehabilitation works', 'Construction'),
+            ('Consulting services for a feasibility study', 'Consultancy'),
+            ('Supply and delivery of furniture', 'Goods'),
+            ('Office cleaning', 'Services'),
+            ('Lease of land', 'Other'),
+            (None, ''),
+            ('null', ''),
+            ('unknown', ''),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(normalise_category(value), expected)
+
+    def test_model_output_is_normalised_to_field_sizes(self):
+        fields = normalise_tender_fields({
+            'tender_number': '  KeRRA/008/2025. ', 'title': 'x' * 600, 'procuring_entity': None,
+            'category': 'works', 'closing_date': '2025-03-14', 'site_visit_date': 'TBA',
+        })
+        self.assertEqual(fields['tender_number'], 'KeRRA/008/2025')
+        self.assertEqual(len(fields['title']), 500)
+        self.assertEqual((fields['procuring_entity'], fields['category'], fields['site_visit_date']), ('', 'Construction', None))
+        self.assertEqual(normalise_tender_fields(['not', 'a', 'dict'])['title'], '')
+
+
+class HighlightSnippetTests(SimpleTestCase):
+    def test_tender_text_is_escaped_before_terms_are_marked(self):
+        text = 'Supply of <script>alert("x")</script> laptops & printers for <b>Roads</b>'
+        snippet = highlight_snippet(text, 'laptops roads')
+        self.assertEqual(
+            snippet,
+            'Supply of &lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; <mark>laptops</mark> &amp; printers '
+            'for &lt;b&gt;<mark>Roads</mark>&lt;/b&gt;',
+        )
+
+    def test_markup_in_the_query_is_not_injected(self):
+        snippet = highlight_snippet('bid <img src=x onerror=alert(1)> bond', '<img src=x onerror=alert(1)>')
+        self.assertNotIn('<img', snippet)
+        self.assertIn('<mark>img</mark>', snippet)
+
+    def test_window_is_centred_on_the_first_match(self):
+        snippet = highlight_snippet(words(200) + ' bitumen ' + words(200, seed=1), 'bitumen', width=60)
+        self.assertTrue(snippet.startswith('… ') and snippet.endswith(' …'))
+        self.assertIn('<mark>bitumen</mark>', snippet)
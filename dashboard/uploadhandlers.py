@@ -0,0 +1,42 @@
+import hashlib
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class HashingUploadMixin:
+    """Computes the SHA-256 of an upload as its chunks arrive and attaches it as `file.sha256`"""
+
+    def new_file(self, *args, **kwargs):
+        self.sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        passed_on = super().receive_data_chunk(raw_data, start)
+        if passed_on is None:
+            # Only the handler that keeps the chunk hashes it; an inactive one passes it on
+            self.sha256.update(raw_data)
+        return passed_on
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self.sha256.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def uploaded_file_sha256(uploaded):
+    """SHA-256 recorded by the hashing upload handlers, or computed from the file's chunks"""
+    sha256 = getattr(uploaded, 'sha256', None)
+    if sha256:
+        return sha256
+    digest = hashlib.sha256()
+    for chunk in uploaded.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
@@ -5,24 +5,32 @@ from .views import (
     search_documents, search_logs_view, manage_api_keys, delete_document_view,
     document_management_view, bulk_download_documents, get_summary_view,
     admin_weaviate_view, delete_weaviate_entry, view_weaviate_summary,
-    view_document_content
+    view_document_content, job_status_view, job_events_view,
+    bulk_upload_view, model_metrics_view, vector_store_metrics_view
 )
+from .views.search import search_query
 
 urlpatterns = [
     path('', dashboard_view, name='dashboard'),
     path('upload/', upload_file_view, name='upload_file'),
+    path('upload/bulk/', bulk_upload_view, name='bulk_upload'),
     path('documents/', document_management_view, name='document_management'),
     path('documents/bulk-download/', bulk_download_documents, name='bulk_download_documents'),
     path('document/<int:document_id>/', document_detail_view, name='document_detail'),
     path('document/<int:document_id>/process/', process_document_view, name='process_document'),
+    path('document/<int:document_id>/job/', job_status_view, name='job_status'),
+    path('document/<int:document_id>/events/', job_events_view, name='job_events'),
     path('document/<int:document_id>/view/', view_document_file, name='view_document'),
     path('document/<int:document_id>/content/', view_document_content, name='view_document_content'),
     path('document/<int:document_id>/summary/', get_summary_view, name='view_summary'),
     path('document/<int:document_id>/delete/', delete_document_view, name='delete_document'),
     path('search/', search_documents, name='search_documents'),
+    path('ask/', search_query, name='search_query'),
     path('search-logs/', search_logs_view, name='search_logs'),
     path('api-keys/', manage_api_keys, name='manage_api_keys'),
     path('admin/weaviate/', admin_weaviate_view, name='admin_weaviate'),
+    path('admin/models/metrics/', model_metrics_view, name='model_metrics'),
+    path('admin/weaviate/metrics/', vector_store_metrics_view, name='vector_store_metrics'),
     path('admin/weaviate/delete/<str:content_hash>/', delete_weaviate_entry, name='delete_weaviate_entry'),
     path('admin/weaviate/view/<str:content_hash>/', view_weaviate_summary, name='view_weaviate_summary'),
 ]
\ No newline at end of file
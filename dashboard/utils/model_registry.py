@@ -0,0 +1,175 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes():
+    """Current resident set size of this process, or 0 where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _BatchingEncoder:
+    """Collects concurrent encode() calls and runs them through the model in one forward pass"""
+
+    def __init__(self, model, max_batch, max_wait):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.calls = 0
+        self.forward_passes = 0
+        self.encoded_texts = 0
+        self.thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+        self.thread.start()
+
+    def encode(self, texts):
+        future = Future()
+        self.requests.put((list(texts), future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = self.model.encode(
+                    texts, normalize_embeddings=True, convert_to_numpy=True
+                ).astype(np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.calls += len(batch)
+            self.forward_passes += 1
+            self.encoded_texts += len(texts)
+            start = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[start:start + len(item_texts)])
+                start += len(item_texts)
+
+
+class ModelRegistry:
+    """Loads each embedding model once per process and shares it between threads.
+
+    Encoding goes through a per-model batching thread, so concurrent requests
+    share forward passes. State is rebuilt after a fork (e.g. gunicorn
+    --preload), because the batching thread does not survive it.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._models = {}
+        self._encoders = {}
+        self._metrics = {}
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            models, metrics = self._models, self._metrics
+            self._reset()
+            # Model weights are inherited copy-on-write; only the threads need recreating
+            self._models, self._metrics = models, metrics
+
+    def get(self, name=None):
+        name = name or getattr(settings, 'EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+        self._check_fork()
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+
+                rss_before = _rss_bytes()
+                began = time.perf_counter()
+                model = SentenceTransformer(name)
+                load_seconds = time.perf_counter() - began
+                self._metrics[name] = {
+                    'load_seconds': round(load_seconds, 3),
+                    'parameter_bytes': sum(p.numel() * p.element_size() for p in model.parameters()),
+                    'rss_delta_bytes': max(_rss_bytes() - rss_before, 0),
+                    'loaded_at': time.time(),
+                }
+                self._models[name] = model
+                logger.info(f"Loaded embedding model {name} in {load_seconds:.2f}s")
+        return model
+
+    def encode(self, texts, name=None):
+        """L2-normalised float32 embeddings for texts, batched with concurrent callers"""
+        name = name or getattr(settings, 'EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+        model = self.get(name)
+        encoder = self._encoders.get(name)
+        if encoder is None:
+            with self._lock:
+                encoder = self._encoders.get(name)
+                if encoder is None:
+                    encoder = _BatchingEncoder(
+                        model,
+                        max_batch=getattr(settings, 'EMBEDDING_BATCH_MAX_SIZE', 32),
+                        max_wait=getattr(settings, 'EMBEDDING_BATCH_MAX_WAIT_MS', 5) / 1000,
+                    )
+                    self._encoders[name] = encoder
+        return encoder.encode(texts)
+
+    def warm_up(self, names=None):
+        for name in names or [getattr(settings, 'EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')]:
+            self.encode(["warm up"], name)
+
+    def metrics(self):
+        self._check_fork()
+        result = {}
+        for name, metrics in self._metrics.items():
+            encoder = self._encoders.get(name)
+            result[name] = {
+                **metrics,
+                'encode_calls': encoder.calls if encoder else 0,
+                'forward_passes': encoder.forward_passes if encoder else 0,
+                'encoded_texts': encoder.encoded_texts if encoder else 0,
+            }
+        return {'pid': self._pid, 'rss_bytes': _rss_bytes(), 'models': result}
+
+
+registry = ModelRegistry()
+
+
+def warm_up_on_startup():
+    """Load the default model when EMBEDDING_MODELS_EAGER_LOAD is set.
+
+    Called by the ASGI entry point and by process_documents before it forks,
+    so the workers share the weights; other manage.py commands never load it.
+    """
+    if getattr(settings, 'EMBEDDING_MODELS_EAGER_LOAD', False):
+        registry.warm_up()
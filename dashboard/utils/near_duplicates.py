@@ -0,0 +1,113 @@
+import hashlib
+import operator
+import re
+import zlib
+from functools import reduce
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+# Universal hashing h(x) = (a * x + b) mod p over 32-bit shingle hashes.
+# With a, b, x < 2**32 the products fit in uint64 without overflow.
+_PRIME = np.uint64(4294967291)
+_SEED = 1729
+_WORD_RE = re.compile(r"\w+")
+
+
+def _num_perm():
+    return getattr(settings, 'MINHASH_PERMUTATIONS', 128)
+
+
+def _num_bands():
+    return getattr(settings, 'MINHASH_BANDS', 16)
+
+
+def _permutations(num_perm):
+    rng = np.random.default_rng(_SEED)
+    a = rng.integers(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingles(text, size=5):
+    """Hashed word n-grams of the normalised text"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    return np.unique(np.fromiter(
+        (zlib.crc32(" ".join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)),
+        dtype=np.uint64,
+    ))
+
+
+def minhash_signature(text, block=8192):
+    """MinHash signature (uint32 array of MINHASH_PERMUTATIONS values) of the text"""
+    a, b = _permutations(_num_perm())
+    values = shingles(text)
+    signature = np.full(len(a), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(values), block):
+        hashed = (values[start:start + block, None] * a + b) % _PRIME
+        np.minimum(signature, hashed.min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+
+def band_buckets(signature):
+    """One 63-bit bucket id per LSH band of the signature"""
+    bands = _num_bands()
+    rows = len(signature) // bands
+    buckets = []
+    for band in range(bands):
+        digest = hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'big') >> 1))
+    return buckets
+
+
+def estimated_similarity(signature, other):
+    return float(np.mean(signature == other))
+
+
+def store_fingerprint(document, signature):
+    """Persist a document's signature and its LSH band buckets"""
+    from ..models import DocumentFingerprint, DocumentLSHBucket
+
+    with transaction.atomic():
+        DocumentFingerprint.objects.update_or_create(
+            document=document,
+            defaults={'signature': signature.astype(np.uint32).tobytes()},
+        )
+        DocumentLSHBucket.objects.filter(document=document).delete()
+        DocumentLSHBucket.objects.bulk_create([
+            DocumentLSHBucket(document=document, band=band, bucket=bucket)
+            for band, bucket in band_buckets(signature)
+        ])
+
+
+def find_near_duplicate(signature, exclude_document=None, threshold=None):
+    """Return (document, similarity) for the closest processed near-duplicate, or (None, 0.0).
+
+    Candidates come from the indexed (band, bucket) table, so only documents
+    sharing at least one LSH band are ever compared.
+    """
+    from ..models import DocumentFingerprint, DocumentLSHBucket
+
+    if threshold is None:
+        threshold = getattr(settings, 'NEAR_DUPLICATE_THRESHOLD', 0.85)
+
+    band_filter = reduce(operator.or_, (Q(band=band, bucket=bucket) for band, bucket in band_buckets(signature)))
+    candidates = DocumentLSHBucket.objects.filter(band_filter, document__status='processed')
+    if exclude_document is not None:
+        candidates = candidates.exclude(document=exclude_document)
+
+    best, best_similarity = None, 0.0
+    fingerprints = DocumentFingerprint.objects.filter(
+        document_id__in=candidates.values('document_id')
+    ).select_related('document')
+    for fingerprint in fingerprints:
+        similarity = estimated_similarity(signature, np.frombuffer(bytes(fingerprint.signature), dtype=np.uint32))
+        if similarity > best_similarity:
+            best, best_similarity = fingerprint.document, similarity
+
+    if best is not None and best_similarity >= threshold:
+        return best, best_similarity
+    return None, best_similarity
@@ -1,28 +1,193 @@
-from sentence_transformers import SentenceTransformer
+import logging
+import os
+import threading
+from django.conf import settings
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from .model_registry import registry
+from .vector_index import ExactIndex, IVFIndex, load_index, write_state
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_to_bytes(embedding):
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def embedding_from_bytes(data):
+    return np.frombuffer(bytes(data), dtype=np.float32)
+
+
+class QuestionEmbeddingIndex:
+    """Vector index over QueryCache question embeddings, kept in step with the table.
+
+    Rows are L2-normalised float32 vectors, so inner product is cosine
+    similarity. Small caches are scanned exactly; once the cache outgrows
+    QUERY_INDEX_ANN_MIN_SIZE the rows are moved into an IVF index. The index
+    is persisted to QUERY_INDEX_PATH and, after loading, only rows newer than
+    the saved primary key are fetched from the database.
+
+    `_lock` guards the in-memory index and is only held for in-memory work;
+    loading, fetching new rows and writing the file happen under
+    `_sync_lock`, so lookups are not blocked by the database or the disk.
+    """
+
+    def __init__(self, path=None):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._path = path
+        self._index = None
+        self._loaded = False
+        self._last_pk = 0
+        self._unsaved = 0
+
+    @property
+    def path(self):
+        return self._path or str(getattr(settings, 'QUERY_INDEX_PATH'))
+
+    def _backend(self, size):
+        backend = getattr(settings, 'QUERY_INDEX_BACKEND', 'auto')
+        if backend == 'auto':
+            return 'ivf' if size >= getattr(settings, 'QUERY_INDEX_ANN_MIN_SIZE', 5000) else 'exact'
+        return backend
+
+    def _build(self, pks, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._backend(len(pks)) == 'ivf':
+            nlist = getattr(settings, 'QUERY_INDEX_IVF_NLIST', None) or int(4 * np.sqrt(len(pks)))
+            index = IVFIndex.train(vectors, nlist, nprobe=getattr(settings, 'QUERY_INDEX_IVF_NPROBE', 8))
+        else:
+            index = ExactIndex(vectors.shape[1])
+        index.add(pks, vectors)
+        return index
+
+    def _append(self, pks, vectors):
+        """Add rows under `_lock`; returns whether the index is due to be saved"""
+        self._last_pk = max(self._last_pk, int(max(pks)))
+        self._unsaved += len(pks)
+        if self._index is None:
+            self._index = self._build(pks, vectors)
+        else:
+            self._index.add(pks, vectors)
+            if self._index.kind == 'exact' and self._backend(len(self._index)) == 'ivf':
+                # Outgrew the exact scan: train IVF on everything held so far
+                self._index = self._build(*self._index.all_rows())
+                return True
+        return self._unsaved >= getattr(settings, 'QUERY_INDEX_SAVE_EVERY', 200)
+
+    def _save(self):
+        """Persist a copy of the index, taken under `_lock` and written outside it"""
+        with self._lock:
+            if self._index is None:
+                return
+            kind, last_pk, pending = self._index.kind, self._last_pk, self._unsaved
+            state = {key: np.copy(value) for key, value in self._index.state().items()}
+        try:
+            write_state(self.path, kind, last_pk, state)
+        except OSError as e:
+            logger.warning(f"Could not persist question index to {self.path}: {e}")
+            return
+        with self._lock:
+            self._unsaved = max(0, self._unsaved - pending)
+
+    @staticmethod
+    def _rows(similarity, pk_after=0):
+        """(pks, vectors) for rows after pk_after, embedding any that were stored without a vector"""
+        from ..models import QueryCache
+
+        rows = list(
+            QueryCache.objects.filter(pk__gt=pk_after)
+            .order_by('pk')
+            .values_list('pk', 'question', 'embedding')
+        )
+        missing = [(pk, question) for pk, question, embedding in rows if embedding is None]
+        computed = {}
+        if missing:
+            vectors = similarity.encode([question for _, question in missing])
+            computed = dict(zip((pk for pk, _ in missing), vectors))
+            QueryCache.objects.bulk_update(
+                [QueryCache(pk=pk, embedding=embedding_to_bytes(vector)) for pk, vector in computed.items()],
+                ['embedding'],
+            )
+
+        pks = [pk for pk, _, _ in rows]
+        vectors = [computed[pk] if embedding is None else embedding_from_bytes(embedding) for pk, _, embedding in rows]
+        return pks, vectors
+
+    def _sync(self, similarity):
+        """Load the saved index and add rows newer than the last one seen.
+
+        Once loaded, a lookup that finds another thread already syncing
+        searches what is there rather than waiting for it.
+        """
+        if not self._sync_lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if not self._loaded:
+                index, last_pk = load_index(self.path)
+                with self._lock:
+                    self._index, self._last_pk, self._loaded = index, last_pk, True
+            pks, vectors = self._rows(similarity, self._last_pk)
+            if pks:
+                with self._lock:
+                    due = self._append(pks, vectors)
+                if due:
+                    self._save()
+        finally:
+            self._sync_lock.release()
+
+    def rebuild(self, similarity):
+        """Rebuild from every QueryCache row, retraining the IVF centroids, and persist it"""
+        with self._sync_lock:
+            pks, vectors = self._rows(similarity)
+            index = self._build(pks, vectors) if pks else None
+            with self._lock:
+                self._index = index
+                self._last_pk = max(pks, default=0)
+                self._unsaved = 0
+                self._loaded = True
+            if index is not None:
+                self._save()
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+        return index
+
+    def remove(self, pk):
+        with self._lock:
+            if self._index is not None and self._index.remove(pk):
+                self._unsaved += 1
+
+    def search(self, embedding, similarity, threshold=0.8):
+        """Return (pk, score) of the most similar stored question, or (None, best score)"""
+        self._sync(similarity)
+        with self._lock:
+            if self._index is None or not len(self._index):
+                return None, 0
+            pk, score = self._index.search(embedding)
+            if pk is not None and score >= threshold:
+                return pk, score
+            return None, score
+
+
+question_index = QuestionEmbeddingIndex()
+
 
 class QuestionSimilarity:
-    def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')  # Free, lightweight model
-    
+    def __init__(self, model_name=None):
+        # Shared per-process model (all-MiniLM-L6-v2 by default); construction is cheap
+        self.model_name = model_name
+
+    def encode(self, texts):
+        """L2-normalised float32 embeddings, so a dot product is the cosine similarity"""
+        return registry.encode(texts, self.model_name)
+
     def get_similarity(self, question1, question2, threshold=0.8):
-        embeddings = self.model.encode([question1, question2])
+        embeddings = self.encode([question1, question2])
         similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
         return similarity >= threshold, similarity
-    
-    def find_similar_question(self, new_question, stored_questions, threshold=0.8):
-        if not stored_questions:
-            return None, 0
-        
-        new_embedding = self.model.encode([new_question])
-        stored_embeddings = self.model.encode(stored_questions)
-        
-        similarities = cosine_similarity(new_embedding, stored_embeddings)[0]
-        max_similarity = np.max(similarities)
-        
-        if max_similarity >= threshold:
-            best_match_idx = np.argmax(similarities)
-            return best_match_idx, max_similarity
-        
-        return None, max_similarity
+
+    def find_similar_question(self, new_question, threshold=0.8):
+        """Return (QueryCache pk or None, similarity, embedding of new_question)"""
+        new_embedding = self.encode([new_question])[0]
+        pk, similarity = question_index.search(new_embedding, self, threshold)
+        return pk, similarity, new_embedding
@@ -0,0 +1,193 @@
+import logging
+import os
+import tempfile
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _Rows:
+    """Growable (ids, float32 matrix) pair with amortised O(1) append and swap-remove"""
+
+    def __init__(self, dim, capacity=64):
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.size = 0
+
+    def append(self, ids, vectors):
+        needed = self.size + len(ids)
+        if needed > len(self.ids):
+            capacity = max(needed, 2 * len(self.ids))
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_ids[:self.size] = self.ids[:self.size]
+            grown_vectors = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown_vectors[:self.size] = self.vectors[:self.size]
+            self.ids, self.vectors = grown_ids, grown_vectors
+        self.ids[self.size:needed] = ids
+        self.vectors[self.size:needed] = vectors
+        self.size = needed
+
+    def remove(self, pk):
+        positions = np.flatnonzero(self.ids[:self.size] == pk)
+        if not len(positions):
+            return False
+        position, last = positions[0], self.size - 1
+        self.ids[position] = self.ids[last]
+        self.vectors[position] = self.vectors[last]
+        self.size = last
+        return True
+
+    def search(self, vector):
+        if self.size == 0:
+            return None, -1.0
+        scores = self.vectors[:self.size] @ vector
+        best = int(np.argmax(scores))
+        return int(self.ids[best]), float(scores[best])
+
+
+class ExactIndex:
+    """Brute-force inner-product search over every vector"""
+
+    kind = 'exact'
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.rows = _Rows(dim)
+
+    def __len__(self):
+        return self.rows.size
+
+    def add(self, ids, vectors):
+        self.rows.append(ids, np.asarray(vectors, dtype=np.float32))
+
+    def remove(self, pk):
+        return self.rows.remove(pk)
+
+    def search(self, vector):
+        return self.rows.search(np.asarray(vector, dtype=np.float32))
+
+    def all_rows(self):
+        return self.rows.ids[:self.rows.size], self.rows.vectors[:self.rows.size]
+
+    def state(self):
+        ids, vectors = self.all_rows()
+        return {'ids': ids, 'vectors': vectors}
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls(state['vectors'].shape[1])
+        index.add(state['ids'], state['vectors'])
+        return index
+
+
+class IVFIndex:
+    """Inverted-file index: vectors are bucketed by nearest k-means centroid and a
+    query scans only the `nprobe` closest buckets."""
+
+    kind = 'ivf'
+
+    def __init__(self, centroids, nprobe=8):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        self.lists = [_Rows(self.centroids.shape[1], capacity=16) for _ in range(len(self.centroids))]
+        self.assignment = {}
+
+    def __len__(self):
+        return len(self.assignment)
+
+    @classmethod
+    def train(cls, vectors, nlist, nprobe=8, iterations=10, sample=50000, seed=0):
+        """Spherical k-means over (a sample of) the vectors"""
+        rng = np.random.default_rng(seed)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) > sample:
+            vectors = vectors[rng.choice(len(vectors), sample, replace=False)]
+        nlist = max(1, min(nlist, len(vectors)))
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assigned = np.argmax(vectors @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = vectors[assigned == cluster]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[cluster] = centroid / norm if norm else centroid
+        return cls(centroids, nprobe)
+
+    def add(self, ids, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        assigned = np.argmax(vectors @ self.centroids.T, axis=1)
+        for cluster in np.unique(assigned):
+            mask = assigned == cluster
+            cluster_ids = np.asarray(ids)[mask]
+            self.lists[cluster].append(cluster_ids, vectors[mask])
+            for pk in cluster_ids:
+                self.assignment[int(pk)] = int(cluster)
+
+    def remove(self, pk):
+        cluster = self.assignment.pop(int(pk), None)
+        return cluster is not None and self.lists[cluster].remove(pk)
+
+    def search(self, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ vector), nprobe - 1)[:nprobe]
+        best_pk, best_score = None, -1.0
+        for cluster in probes:
+            pk, score = self.lists[cluster].search(vector)
+            if pk is not None and score > best_score:
+                best_pk, best_score = pk, score
+        return best_pk, best_score
+
+    def all_rows(self):
+        ids = np.concatenate([rows.ids[:rows.size] for rows in self.lists])
+        vectors = np.concatenate([rows.vectors[:rows.size] for rows in self.lists])
+        return ids, vectors
+
+    def state(self):
+        ids, vectors = self.all_rows()
+        return {'ids': ids, 'vectors': vectors, 'centroids': self.centroids, 'nprobe': np.array(self.nprobe)}
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls(state['centroids'], int(state['nprobe']))
+        index.add(state['ids'], state['vectors'])
+        return index
+
+
+INDEX_TYPES = {index_type.kind: index_type for index_type in (ExactIndex, IVFIndex)}
+
+
+def save_index(index, path, last_pk):
+    """Write the index atomically as a .npz file"""
+    write_state(path, index.kind, last_pk, index.state())
+
+
+def write_state(path, kind, last_pk, state):
+    """Write an index state through a uniquely named temporary file, then rename it into place"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            np.savez(tmp, kind=np.array(kind), last_pk=np.array(last_pk), **state)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_index(path):
+    """Return (index, last_pk) from a saved file, or (None, 0) if missing or unreadable"""
+    if not os.path.exists(path):
+        return None, 0
+    try:
+        with np.load(path) as data:
+            state = {key: data[key] for key in data.files}
+        index = INDEX_TYPES[str(state.pop('kind'))].from_state(state)
+        return index, int(state.pop('last_pk'))
+    except Exception as e:
+        logger.warning(f"Could not load vector index from {path}: {e}")
+        return None, 0
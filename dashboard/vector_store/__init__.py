@@ -0,0 +1,26 @@
+import threading
+from django.conf import settings
+from .base import VectorStore, VectorStoreError, SearchFilter, entity_terms, DOCUMENT_PROPERTIES, CHUNK_PROPERTIES
+
+BACKENDS = {
+    'weaviate': 'dashboard.vector_store.weaviate_store.WeaviateStore',
+    'embedded': 'dashboard.vector_store.embedded.EmbeddedStore',
+}
+
+_store = None
+_lock = threading.Lock()
+
+
+def get_vector_store():
+    """The process-wide store for settings.VECTOR_STORE_BACKEND ('weaviate' or 'embedded')"""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                from django.utils.module_loading import import_string
+
+                backend = getattr(settings, 'VECTOR_STORE_BACKEND', 'weaviate')
+                if backend not in BACKENDS:
+                    raise VectorStoreError(f"Unknown VECTOR_STORE_BACKEND {backend!r}; expected one of {sorted(BACKENDS)}")
+                _store = import_string(BACKENDS[backend])()
+    return _store
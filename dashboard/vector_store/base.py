@@ -0,0 +1,185 @@
+import functools
+import inspect
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from asgiref.sync import sync_to_async
+
+DOCUMENT_PROPERTIES = ["file_name", "time_created", "content_hash", "summary", "text_content"]
+CHUNK_PROPERTIES = [
+    "text", "chunk_index", "file_name", "content_hash",
+    "document_id", "uploaded_at", "category", "procuring_entity", "closing_date",
+]
+
+
+OPERATIONS = (
+    "find_document", "list_documents", "upsert_document", "insert_chunks", "delete_document",
+    "near_vector", "bm25", "hybrid", "afind_document", "ahybrid",
+)
+
+
+class VectorStoreError(Exception):
+    """The backend is unavailable or rejected an operation"""
+
+
+class OperationMetrics:
+    """Call counts, errors and latency percentiles per store operation, for this process"""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._window = window
+        self._operations = {}
+
+    def record(self, operation, seconds, failed):
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = {
+                    'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                    'recent': deque(maxlen=self._window),
+                }
+            stats['calls'] += 1
+            stats['errors'] += failed
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['recent'].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for operation, stats in self._operations.items():
+                recent = sorted(stats['recent'])
+                result[operation] = {
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'mean_ms': round(1000 * stats['total_seconds'] / stats['calls'], 2),
+                    'p50_ms': round(1000 * recent[len(recent) // 2], 2),
+                    'p95_ms': round(1000 * recent[min(len(recent) - 1, int(len(recent) * 0.95))], 2),
+                    'max_ms': round(1000 * stats['max_seconds'], 2),
+                }
+            return result
+
+
+_metrics_lock = threading.Lock()
+
+
+def _timed(method):
+    operation = method.__name__
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            began, failed = time.perf_counter(), True
+            try:
+                result = await method(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self.metrics.record(operation, time.perf_counter() - began, failed)
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            began, failed = time.perf_counter(), True
+            try:
+                result = method(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self.metrics.record(operation, time.perf_counter() - began, failed)
+    wrapper._timed = True
+    return wrapper
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """Backend-neutral restrictions on chunk properties; every given field must match"""
+    document_ids: tuple = ()
+    uploaded_from: object = None
+    uploaded_before: object = None
+    category: str = ''
+    entity: str = ''
+    closing_from: object = None
+    closing_before: object = None
+
+    def __bool__(self):
+        return any(getattr(self, field.name) for field in fields(self))
+
+    @property
+    def entity_terms(self):
+        return entity_terms(self.entity)
+
+
+def entity_terms(entity):
+    """Lower-cased words of an entity filter.
+
+    Every backend (and the document list) matches an entity when each of
+    these words occurs somewhere in procuring_entity, ignoring case: a word
+    may be part of a longer one ("health" matches "Healthcare") and the words
+    may come in any order.
+    """
+    return re.findall(r"\w+", (entity or "").lower())
+
+
+class VectorStore:
+    """Storage operations the pipeline and views need from a search backend.
+
+    Documents are the per-file parents (summary, full text); chunks are the
+    searchable pieces, each carrying the filterable properties in
+    CHUNK_PROPERTIES. Search methods return a list of property dicts with a
+    `score` key, best first. Every operation a backend defines is timed
+    into `metrics`.
+    """
+
+    name = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for operation in OPERATIONS:
+            method = cls.__dict__.get(operation)
+            if method is not None and not getattr(method, '_timed', False):
+                setattr(cls, operation, _timed(method))
+
+    @property
+    def metrics(self):
+        metrics = self.__dict__.get('_metrics')
+        if metrics is None:
+            with _metrics_lock:
+                metrics = self.__dict__.setdefault('_metrics', OperationMetrics())
+        return metrics
+
+    def find_document(self, content_hash=None, file_name=None, properties=None):
+        """Properties of the document with this content hash or file name, or None"""
+        raise NotImplementedError
+
+    def list_documents(self, limit=100, properties=None):
+        raise NotImplementedError
+
+    def upsert_document(self, document_uuid, properties):
+        """Insert the document under document_uuid, replacing any earlier object"""
+        raise NotImplementedError
+
+    def insert_chunks(self, document_uuid, content_hash, chunks):
+        """Batch-insert chunk property dicts for a document, replacing its earlier chunks"""
+        raise NotImplementedError
+
+    def delete_document(self, content_hash):
+        """Delete a document and its chunks; returns whether the document existed"""
+        raise NotImplementedError
+
+    def near_vector(self, vector, limit=10, filters=None, properties=None):
+        raise NotImplementedError
+
+    def bm25(self, query, limit=10, offset=0, filters=None, properties=None):
+        raise NotImplementedError
+
+    def hybrid(self, query, alpha=0.5, limit=10, offset=0, filters=None, properties=None):
+        """Keyword and vector search fused by relative score; alpha 0 is pure BM25, 1 pure vector"""
+        raise NotImplementedError
+
+    async def afind_document(self, content_hash=None, file_name=None, properties=None):
+        return await sync_to_async(self.find_document, thread_sensitive=False)(content_hash, file_name, properties)
+
+    async def ahybrid(self, query, alpha=0.5, limit=10, offset=0, filters=None, properties=None):
+        return await sync_to_async(self.hybrid, thread_sensitive=False)(query, alpha, limit, offset, filters, properties)
@@ -0,0 +1,333 @@
+import os
+import re
+import sqlite3
+import threading
+import logging
+from datetime import date, datetime, time, timezone
+import numpy as np
+from django.conf import settings
+from .base import VectorStore, VectorStoreError, DOCUMENT_PROPERTIES, CHUNK_PROPERTIES
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS documents (
+    uuid TEXT PRIMARY KEY,
+    content_hash TEXT UNIQUE,
+    file_name TEXT,
+    time_created TEXT,
+    summary TEXT,
+    text_content TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_file_name ON documents (file_name);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    document_uuid TEXT,
+    content_hash TEXT,
+    chunk_index INTEGER,
+    text TEXT,
+    file_name TEXT,
+    document_id INTEGER,
+    uploaded_at TEXT,
+    category TEXT,
+    procuring_entity TEXT,
+    closing_date TEXT
+);
+CREATE INDEX IF NOT EXISTS chunks_content_hash ON chunks (content_hash);
+CREATE INDEX IF NOT EXISTS chunks_document_id ON chunks (document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5 (
+    text, file_name, content='chunks', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS chunks_fts_insert AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts (rowid, text, file_name) VALUES (new.id, new.text, new.file_name);
+END;
+CREATE TRIGGER IF NOT EXISTS chunks_fts_delete AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, text, file_name) VALUES ('delete', old.id, old.text, old.file_name);
+END;
+"""
+
+_DATE_COLUMNS = {"time_created", "uploaded_at", "closing_date"}
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _to_text(value):
+    """Dates are stored as naive UTC ISO strings so they compare correctly as text"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec='seconds')
+    if isinstance(value, date):
+        return datetime.combine(value, time.min).isoformat(timespec='seconds')
+    return value
+
+
+def _from_text(name, value):
+    if name in _DATE_COLUMNS and value:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    return value
+
+
+def _columns(properties, allowed):
+    unknown = set(properties) - set(allowed)
+    if unknown:
+        raise VectorStoreError(f"Unknown properties: {', '.join(sorted(unknown))}")
+    return list(properties)
+
+
+def _match_expression(query):
+    """Any query word, quoted so FTS5 operators in user input are taken literally"""
+    return " OR ".join(f'"{token}"' for token in dict.fromkeys(_TOKEN_RE.findall(query.lower())))
+
+
+def _sql_filter(search_filter):
+    """WHERE clause on the chunks table with the same semantics as the Weaviate filter"""
+    clauses, params = [], []
+    if not search_filter:
+        return "1", params
+    if search_filter.document_ids:
+        clauses.append(f"chunks.document_id IN ({', '.join('?' * len(search_filter.document_ids))})")
+        params.extend(search_filter.document_ids)
+    for column, operator, value in (
+        ("uploaded_at", ">=", search_filter.uploaded_from),
+        ("uploaded_at", "<", search_filter.uploaded_before),
+        ("closing_date", ">=", search_filter.closing_from),
+        ("closing_date", "<", search_filter.closing_before),
+    ):
+        if value:
+            clauses.append(f"chunks.{column} {operator} ?")
+            params.append(_to_text(value))
+    if search_filter.category:
+        clauses.append("chunks.category = ?")
+        params.append(search_filter.category)
+    for term in search_filter.entity_terms:
+        # \w+ terms contain no LIKE wildcards other than _
+        clauses.append("lower(chunks.procuring_entity) LIKE ? ESCAPE '\\'")
+        params.append("%" + term.replace("_", r"\_") + "%")
+    return " AND ".join(clauses) or "1", params
+
+
+def _normalise(scores):
+    """Min-max scale to [0, 1], as Weaviate's relative score fusion does"""
+    if not scores:
+        return {}
+    low, high = min(scores.values()), max(scores.values())
+    if high == low:
+        return {key: 1.0 for key in scores}
+    return {key: (score - low) / (high - low) for key, score in scores.items()}
+
+
+class EmbeddedStore(VectorStore):
+    """In-process store: SQLite (FTS5 for BM25) plus a memory-mapped float32 vector file.
+
+    Row i of the vector file is the embedding of the chunk with id i, encoded
+    with the shared sentence-transformers model. Vector search is an exact
+    scan over the rows that pass the filter. Writes take a SQLite write
+    transaction first, so several processes can share one directory.
+    """
+
+    name = 'embedded'
+
+    def __init__(self, path=None):
+        self.directory = path or getattr(settings, 'EMBEDDED_STORE_PATH')
+        self.db_path = os.path.join(self.directory, 'store.sqlite3')
+        self.vectors_path = os.path.join(self.directory, 'chunks.f32')
+        self._local = threading.local()
+        self._vectors = None
+        self._vectors_size = -1
+        self._vectors_lock = threading.Lock()
+
+    # Storage
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def _dimension(self, connection):
+        row = connection.execute("SELECT value FROM meta WHERE key = 'dimension'").fetchone()
+        return int(row['value']) if row else None
+
+    def _matrix(self, dimension):
+        """Read-only view of the vector file, remapped when another writer has grown it"""
+        with self._vectors_lock:
+            size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+            if size != self._vectors_size or self._vectors is None:
+                rows = size // (4 * dimension)
+                self._vectors = (np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, dimension))
+                                 if rows else np.zeros((0, dimension), dtype=np.float32))
+                self._vectors_size = size
+            return self._vectors
+
+    def _write_vectors(self, ids, vectors):
+        """Write vectors at rows `ids`, doubling the file when it is too short; caller holds the write transaction"""
+        dimension = vectors.shape[1]
+        needed = (max(ids) + 1) * dimension * 4
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        if size < needed:
+            with open(self.vectors_path, 'ab') as handle:
+                handle.truncate(max(needed, size * 2))
+            size = os.path.getsize(self.vectors_path)
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r+', shape=(size // (4 * dimension), dimension))
+        matrix[ids] = vectors
+        matrix.flush()
+        del matrix
+
+    def _encode(self, texts):
+        from ..utils.model_registry import registry
+        return np.asarray(registry.encode(list(texts)), dtype=np.float32)
+
+    # Documents
+
+    def find_document(self, content_hash=None, file_name=None, properties=None):
+        columns = _columns(properties or DOCUMENT_PROPERTIES, DOCUMENT_PROPERTIES)
+        column, value = ("content_hash", content_hash) if content_hash is not None else ("file_name", file_name)
+        row = self._connection().execute(
+            f"SELECT {', '.join(columns)} FROM documents WHERE {column} = ? LIMIT 1", (value,)
+        ).fetchone()
+        return {name: _from_text(name, row[name]) for name in columns} if row else None
+
+    def list_documents(self, limit=100, properties=None):
+        columns = _columns(properties or ["file_name", "time_created", "content_hash"], DOCUMENT_PROPERTIES)
+        rows = self._connection().execute(
+            f"SELECT {', '.join(columns)} FROM documents ORDER BY time_created DESC LIMIT ?", (limit,)
+        )
+        return [{name: _from_text(name, row[name]) for name in columns} for row in rows]
+
+    def upsert_document(self, document_uuid, properties):
+        columns = _columns(properties, DOCUMENT_PROPERTIES)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM documents WHERE uuid = ? OR content_hash = ?",
+                               (str(document_uuid), properties.get("content_hash")))
+            connection.execute(
+                f"INSERT INTO documents (uuid, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})",
+                (str(document_uuid), *(_to_text(properties[name]) for name in columns)),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return document_uuid
+
+    def insert_chunks(self, document_uuid, content_hash, chunks):
+        if not chunks:
+            return 0
+        vectors = self._encode(chunk["text"] for chunk in chunks)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            dimension = self._dimension(connection)
+            if dimension is None:
+                dimension = vectors.shape[1]
+                connection.execute("INSERT INTO meta (key, value) VALUES ('dimension', ?)", (str(dimension),))
+            elif dimension != vectors.shape[1]:
+                raise VectorStoreError(
+                    f"Embedding dimension {vectors.shape[1]} does not match the store's {dimension}; "
+                    f"rebuild {self.directory} after changing EMBEDDING_MODEL_NAME"
+                )
+
+            connection.execute("DELETE FROM chunks WHERE content_hash = ?", (content_hash,))
+            ids = []
+            for chunk in chunks:
+                columns = _columns(chunk, CHUNK_PROPERTIES)
+                cursor = connection.execute(
+                    f"INSERT INTO chunks (document_uuid, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})",
+                    (str(document_uuid), *(_to_text(chunk[name]) for name in columns)),
+                )
+                ids.append(cursor.lastrowid)
+            self._write_vectors(ids, vectors)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return len(chunks)
+
+    def delete_document(self, content_hash):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM chunks WHERE content_hash = ?", (content_hash,))
+            deleted = connection.execute("DELETE FROM documents WHERE content_hash = ?", (content_hash,)).rowcount
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return deleted > 0
+
+    # Search
+
+    def _fetch_chunks(self, scores, properties):
+        """Property dicts for chunk ids in `scores`, ordered best first"""
+        if not scores:
+            return []
+        columns = _columns(properties or CHUNK_PROPERTIES, CHUNK_PROPERTIES)
+        ids = list(scores)
+        rows = self._connection().execute(
+            f"SELECT id, {', '.join(columns)} FROM chunks WHERE id IN ({', '.join('?' * len(ids))})", ids
+        )
+        by_id = {row['id']: {name: _from_text(name, row[name]) for name in columns} for row in rows}
+        ranked = sorted(by_id, key=lambda chunk_id: scores[chunk_id], reverse=True)
+        return [{**by_id[chunk_id], "score": scores[chunk_id]} for chunk_id in ranked]
+
+    def _vector_scores(self, vector, depth, filters):
+        connection = self._connection()
+        dimension = self._dimension(connection)
+        if dimension is None:
+            return {}
+        where, params = _sql_filter(filters)
+        ids = np.fromiter(
+            (row[0] for row in connection.execute(f"SELECT id FROM chunks WHERE {where}", params)), dtype=np.int64
+        )
+        matrix = self._matrix(dimension)
+        ids = ids[ids < len(matrix)]
+        if not len(ids):
+            return {}
+        scores = matrix[ids] @ np.asarray(vector, dtype=np.float32)
+        if len(ids) > depth:
+            top = np.argpartition(-scores, depth - 1)[:depth]
+            ids, scores = ids[top], scores[top]
+        return {int(chunk_id): float(score) for chunk_id, score in zip(ids, scores)}
+
+    def _keyword_scores(self, query, depth, filters):
+        expression = _match_expression(query)
+        if not expression:
+            return {}
+        where, params = _sql_filter(filters)
+        rows = self._connection().execute(
+            f"SELECT chunks.id, -bm25(chunks_fts) AS score FROM chunks_fts "
+            f"JOIN chunks ON chunks.id = chunks_fts.rowid "
+            f"WHERE chunks_fts MATCH ? AND {where} ORDER BY bm25(chunks_fts) LIMIT ?",
+            [expression, *params, depth],
+        )
+        return {row['id']: row['score'] for row in rows}
+
+    def near_vector(self, vector, limit=10, filters=None, properties=None):
+        return self._fetch_chunks(self._vector_scores(vector, limit, filters), properties)
+
+    def bm25(self, query, limit=10, offset=0, filters=None, properties=None):
+        hits = self._fetch_chunks(self._keyword_scores(query, offset + limit, filters), properties)
+        return hits[offset:offset + limit]
+
+    def hybrid(self, query, alpha=0.5, limit=10, offset=0, filters=None, properties=None):
+        # Each side contributes a candidate pool deeper than the page, then scores are fused
+        depth = max((offset + limit) * 4, 50)
+        keyword = self._keyword_scores(query, depth, filters) if alpha < 1 else {}
+        vector = {}
+        if alpha > 0:
+            vector = self._vector_scores(self._encode([query])[0], depth, filters)
+        keyword, vector = _normalise(keyword), _normalise(vector)
+        fused = {
+            chunk_id: alpha * vector.get(chunk_id, 0.0) + (1 - alpha) * keyword.get(chunk_id, 0.0)
+            for chunk_id in keyword.keys() | vector.keys()
+        }
+        page = sorted(fused, key=lambda chunk_id: fused[chunk_id], reverse=True)[offset:offset + limit]
+        return self._fetch_chunks({chunk_id: fused[chunk_id] for chunk_id in page}, properties)
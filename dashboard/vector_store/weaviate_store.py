@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from weaviate.classes.query import Filter, MetadataQuery
+from weaviate.exceptions import UnexpectedStatusCodeError
+from ..weaviate_module.client import get_collection, get_chunk_collection
+from ..weaviate_module import async_client
+from ..weaviate_module.async_client import get_async_collection, get_async_chunk_collection, query_timeout
+from .base import VectorStore, VectorStoreError, DOCUMENT_PROPERTIES, CHUNK_PROPERTIES
+
+logger = logging.getLogger(__name__)
+
+
+def _require(collection):
+    if collection is None:
+        raise VectorStoreError("Weaviate is not available")
+    return collection
+
+
+def to_weaviate_filter(search_filter):
+    """Translate a SearchFilter into one Weaviate Filter on chunk properties, or None"""
+    if not search_filter:
+        return None
+    filters = []
+    if search_filter.document_ids:
+        filters.append(Filter.by_property("document_id").contains_any(list(search_filter.document_ids)))
+    if search_filter.uploaded_from:
+        filters.append(Filter.by_property("uploaded_at").greater_or_equal(search_filter.uploaded_from))
+    if search_filter.uploaded_before:
+        filters.append(Filter.by_property("uploaded_at").less_than(search_filter.uploaded_before))
+    if search_filter.category:
+        filters.append(Filter.by_property("category").equal(search_filter.category))
+    # procuring_entity is word-tokenised, so `like` matches within each word
+    for term in search_filter.entity_terms:
+        filters.append(Filter.by_property("procuring_entity").like(f"*{term}*"))
+    if search_filter.closing_from:
+        filters.append(Filter.by_property("closing_date").greater_or_equal(search_filter.closing_from))
+    if search_filter.closing_before:
+        filters.append(Filter.by_property("closing_date").less_than(search_filter.closing_before))
+    if not filters:
+        return None
+    return filters[0] if len(filters) == 1 else Filter.all_of(filters)
+
+
+def _document_filter(content_hash, file_name):
+    if content_hash is not None:
+        return Filter.by_property("content_hash").equal(content_hash)
+    return Filter.by_property("file_name").equal(file_name)
+
+
+def _hits(response):
+    return [{**obj.properties, "score": obj.metadata.score if obj.metadata.score is not None else
+             (1 - obj.metadata.distance if obj.metadata.distance is not None else None)}
+            for obj in response.objects]
+
+
+class WeaviateStore(VectorStore):
+    """The TenderDocument / TenderChunk collections in a Weaviate server"""
+
+    name = 'weaviate'
+
+    def find_document(self, content_hash=None, file_name=None, properties=None):
+        documents = _require(get_collection())
+        result = documents.query.fetch_objects(
+            filters=_document_filter(content_hash, file_name),
+            return_properties=properties or DOCUMENT_PROPERTIES,
+            limit=1
+        )
+        return dict(result.objects[0].properties) if result.objects else None
+
+    def list_documents(self, limit=100, properties=None):
+        documents = _require(get_collection())
+        result = documents.query.fetch_objects(
+            return_properties=properties or ["file_name", "time_created", "content_hash"],
+            limit=limit
+        )
+        return [dict(obj.properties) for obj in result.objects]
+
+    def upsert_document(self, document_uuid, properties):
+        documents = _require(get_collection())
+        try:
+            documents.data.insert(properties, uuid=document_uuid)
+        except UnexpectedStatusCodeError as e:
+            if e.status_code != 422:
+                raise
+            # Already there from an earlier attempt; one extra round trip only on retries
+            documents.data.replace(uuid=document_uuid, properties=properties)
+        return document_uuid
+
+    def insert_chunks(self, document_uuid, content_hash, chunks):
+        collection = _require(get_chunk_collection())
+        collection.data.delete_many(where=Filter.by_property("content_hash").equal(content_hash))
+
+        with collection.batch.dynamic() as batch:
+            for properties in chunks:
+                batch.add_object(properties=properties, references={"document": document_uuid})
+
+        failed = collection.batch.failed_objects
+        if failed:
+            raise VectorStoreError(f"{len(failed)} of {len(chunks)} chunks failed to insert: {failed[0].message}")
+        return len(chunks)
+
+    def delete_document(self, content_hash):
+        documents = _require(get_collection())
+        _require(get_chunk_collection()).data.delete_many(
+            where=Filter.by_property("content_hash").equal(content_hash)
+        )
+        result = documents.data.delete_many(where=Filter.by_property("content_hash").equal(content_hash))
+        return result.successful > 0
+
+    def near_vector(self, vector, limit=10, filters=None, properties=None):
+        response = _require(get_chunk_collection()).query.near_vector(
+            near_vector=list(vector),
+            limit=limit,
+            filters=to_weaviate_filter(filters),
+            return_properties=properties or CHUNK_PROPERTIES,
+            return_metadata=MetadataQuery(distance=True),
+        )
+        return _hits(response)
+
+    def bm25(self, query, limit=10, offset=0, filters=None, properties=None):
+        response = _require(get_chunk_collection()).query.bm25(
+            query=query,
+            limit=limit,
+            offset=offset,
+            filters=to_weaviate_filter(filters),
+            query_properties=["text", "file_name"],
+            return_properties=properties or CHUNK_PROPERTIES,
+            return_metadata=MetadataQuery(score=True),
+        )
+        return _hits(response)
+
+    def _hybrid_arguments(self, query, alpha, limit, offset, filters, properties):
+        return {
+            "query": query,
+            "alpha": alpha,
+            "limit": limit,
+            "offset": offset,
+            "filters": to_weaviate_filter(filters),
+            "query_properties": ["text", "file_name"],
+            "return_properties": properties or CHUNK_PROPERTIES,
+            "return_metadata": MetadataQuery(score=True),
+        }
+
+    def hybrid(self, query, alpha=0.5, limit=10, offset=0, filters=None, properties=None):
+        chunks = _require(get_chunk_collection())
+        return _hits(chunks.query.hybrid(**self._hybrid_arguments(query, alpha, limit, offset, filters, properties)))
+
+    async def afind_document(self, content_hash=None, file_name=None, properties=None):
+        if not async_client.is_enabled():
+            return await super().afind_document(content_hash, file_name, properties)
+        documents = _require(await get_async_collection())
+        result = await asyncio.wait_for(
+            documents.query.fetch_objects(
+                filters=_document_filter(content_hash, file_name),
+                return_properties=properties or DOCUMENT_PROPERTIES,
+                limit=1
+            ),
+            timeout=query_timeout(),
+        )
+        return dict(result.objects[0].properties) if result.objects else None
+
+    async def ahybrid(self, query, alpha=0.5, limit=10, offset=0, filters=None, properties=None):
+        if not async_client.is_enabled():
+            return await super().ahybrid(query, alpha, limit, offset, filters, properties)
+        chunks = _require(await get_async_chunk_collection())
+        response = await asyncio.wait_for(
+            chunks.query.hybrid(**self._hybrid_arguments(query, alpha, limit, offset, filters, properties)),
+            timeout=query_timeout(),
+        )
+        return _hits(response)
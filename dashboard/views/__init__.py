@@ -0,0 +1,775 @@
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.db.models import Q, F
+from django.utils import timezone
+from datetime import timedelta
+from ..models import Document, SearchLog, UserAPIKey, TenderDetails
+from ..forms import DocumentForm, BulkUploadForm
+import os
+from django.conf import settings
+import json
+from datetime import datetime
+import zipfile
+import tempfile
+import asyncio
+import logging
+import math
+import time
+from ..vector_store import get_vector_store, entity_terms
+from ..weaviate_module.utils import aget_related_text, aget_summary, build_search_filter
+from ..extraction import cached_document_text
+from ..jobs import enqueue_document, enqueue_documents
+from ..processing import indexed_content_hash, remove_unused_index_entry, stage_states
+from ..bulk_upload import ingest_uploads, save_new_document
+from ..uploadhandlers import uploaded_file_sha256
+from ..search_cache import acurrent_generation, aget_cached_results, astore_results, cache_key, invalidate_search_results
+from ..singleflight import search_flight
+
+logger = logging.getLogger(__name__)
+
+CLOSING_WINDOWS = {
+    'week': timedelta(days=7),
+    'month': timedelta(days=30),
+}
+
+def apply_tender_filters(documents, params):
+    """Filter and sort documents on their structured tender fields"""
+    category = params.get('category', '')
+    entity = params.get('entity', '').strip()
+    closing = params.get('closing', '')
+    sort = params.get('sort', '')
+    now = timezone.now()
+    
+    if category:
+        documents = documents.filter(tender__category=category)
+    
+    # Same matching as the search backends: every word, anywhere, any case
+    for term in entity_terms(entity):
+        documents = documents.filter(tender__procuring_entity__icontains=term)
+    
+    if closing in CLOSING_WINDOWS:
+        documents = documents.filter(tender__closing_date__gte=now, tender__closing_date__lt=now + CLOSING_WINDOWS[closing])
+    elif closing == 'open':
+        documents = documents.filter(tender__closing_date__gte=now)
+    elif closing == 'closed':
+        documents = documents.filter(tender__closing_date__lt=now)
+    
+    if sort == 'closing':
+        documents = documents.order_by(F('tender__closing_date').asc(nulls_last=True))
+    elif sort == 'closing_desc':
+        documents = documents.order_by(F('tender__closing_date').desc(nulls_last=True))
+    elif sort == 'entity':
+        documents = documents.order_by('tender__procuring_entity', '-uploaded_at')
+    
+    return documents.select_related('tender')
+
+
+@login_required
+def dashboard_view(request):
+    if request.user.is_staff:
+        # Admin dashboard logic
+        search = request.GET.get('search', '')
+        status_filter = request.GET.get('status', '')
+        date_filter = request.GET.get('date', '')
+        
+        documents = Document.objects.all().order_by('-uploaded_at')
+        
+        if search:
+            documents = documents.filter(
+                Q(file__icontains=search) | 
+                Q(uploaded_by__username__icontains=search)
+            )
+        
+        if status_filter:
+            documents = documents.filter(status=status_filter)
+            
+        if date_filter:
+            documents = documents.filter(uploaded_at__date=date_filter)
+        
+        documents = apply_tender_filters(documents, request.GET)
+        
+        total_uploaded = Document.objects.count()
+        total_processed = Document.objects.filter(status='processed').count()
+        total_processing = Document.objects.filter(status='processing').count()
+        processing_rate = round((total_processed / total_uploaded * 100) if total_uploaded > 0 else 0)
+        
+        context = {
+            'total_uploaded': total_uploaded,
+            'total_processed': total_processed,
+            'total_processing': total_processing,
+            'processing_rate': processing_rate,
+            'documents': documents,
+            'upload_form': DocumentForm(),
+            'categories': TenderDetails.CATEGORY_CHOICES
+        }
+        return render(request, 'dashboard/admin_dashboard.html', context)
+    else:
+        # User dashboard with search functionality
+        recent_searches = SearchLog.objects.filter(user=request.user)[:5]
+        user_api_keys = UserAPIKey.objects.filter(user=request.user)
+        
+        # Get all processed documents for filtering
+        documents = Document.objects.filter(status='processed').order_by('-uploaded_at')
+        documents = apply_tender_filters(documents, request.GET)
+        
+        context = {
+            'recent_searches': recent_searches,
+            'user_api_keys': user_api_keys,
+            'documents': documents,
+            'categories': TenderDetails.CATEGORY_CHOICES
+        }
+        return render(request, 'dashboard/user_dashboard.html', context)
+
+def search_params(data):
+    """alpha/limit/offset for hybrid search, clamped to sane ranges; ValueError if not numbers"""
+    alpha = float(data.get('alpha', getattr(settings, 'SEARCH_HYBRID_ALPHA', 0.5)))
+    if not math.isfinite(alpha):
+        raise ValueError(f"alpha must be a finite number, not {alpha}")
+    limit = int(data.get('limit', getattr(settings, 'SEARCH_RESULT_LIMIT', 10)))
+    offset = int(data.get('offset', 0))
+    return {
+        'alpha': min(max(alpha, 0.0), 1.0),
+        'limit': min(max(limit, 1), getattr(settings, 'SEARCH_MAX_LIMIT', 50)),
+        'offset': max(offset, 0),
+    }
+
+def search_filters(data):
+    """Validated search restrictions from POST data or a parsed JSON body, kept symbolic so they can be part of a cache key"""
+    if hasattr(data, 'getlist'):
+        raw_ids = data.getlist('document')
+    else:
+        raw_ids = data.get('document') or []
+        raw_ids = raw_ids if isinstance(raw_ids, list) else [raw_ids]
+    document_ids = sorted({
+        int(value)
+        for raw in raw_ids
+        for value in str(raw).split(',')
+        if value.strip()
+    })
+    filters = {
+        'document_ids': document_ids,
+        'uploaded_from': data.get('uploaded_from', ''),
+        'uploaded_to': data.get('uploaded_to', ''),
+        'category': data.get('category', ''),
+        'entity': str(data.get('entity', '')).strip(),
+        'closing': data.get('closing', ''),
+    }
+    for key in ('uploaded_from', 'uploaded_to'):
+        if filters[key]:
+            datetime.strptime(filters[key], '%Y-%m-%d')
+    if filters['category'] and filters['category'] not in dict(TenderDetails.CATEGORY_CHOICES):
+        raise ValueError(f"Unknown category {filters['category']!r}")
+    if filters['closing'] and filters['closing'] not in {*CLOSING_WINDOWS, 'open', 'closed'}:
+        raise ValueError(f"Unknown closing window {filters['closing']!r}")
+    return {key: value for key, value in filters.items() if value}
+
+def weaviate_search_filter(filters):
+    """Translate search_filters() output into a vector store SearchFilter (same semantics as apply_tender_filters)"""
+    def day_start(value, days=0):
+        return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d') + timedelta(days=days))
+
+    now = timezone.now()
+    closing = filters.get('closing')
+    closing_from = closing_before = None
+    if closing in CLOSING_WINDOWS:
+        closing_from, closing_before = now, now + CLOSING_WINDOWS[closing]
+    elif closing == 'open':
+        closing_from = now
+    elif closing == 'closed':
+        closing_before = now
+
+    return build_search_filter(
+        document_ids=filters.get('document_ids'),
+        uploaded_from=day_start(filters['uploaded_from']) if filters.get('uploaded_from') else None,
+        uploaded_before=day_start(filters['uploaded_to'], days=1) if filters.get('uploaded_to') else None,
+        category=filters.get('category'),
+        entity=filters.get('entity'),
+        closing_from=closing_from,
+        closing_before=closing_before,
+    )
+
+async def attach_documents(results):
+    """Add the Django document id and tender title to each hit.
+
+    Chunks indexed before document_id was stored are matched by file name.
+    """
+    matches = [document async for document in Document.objects.filter(
+        Q(pk__in={hit['document_id'] for hit in results if hit.get('document_id')})
+        | Q(file__in={hit.get('file_name') for hit in results if not hit.get('document_id')})
+    ).select_related('tender')]
+    by_id = {document.pk: document for document in matches}
+    by_name = {document.file.name: document for document in matches}
+    for hit in results:
+        document = by_id.get(hit.get('document_id')) or by_name.get(hit.get('file_name'))
+        tender = getattr(document, 'tender', None) if document else None
+        hit['document_id'] = document.id if document else None
+        hit['title'] = (tender.title if tender and tender.title else None) or os.path.basename(hit.get('file_name') or '')
+
+@login_required
+async def search_documents(request):
+    """Async so a worker is not parked while Weaviate answers.
+
+    A client disconnect cancels this request; the shared backend call
+    carries on for any other callers coalesced onto it.
+    """
+    if request.method == 'POST':
+        query = request.POST.get('query', '').strip()
+        if not query:
+            return JsonResponse({'error': 'Query is required'})
+        
+        try:
+            params = search_params(request.POST)
+            filters = search_filters(request.POST)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid search parameters'}, status=400)
+
+        cache_params = {**params, 'filters': filters}
+
+        async def run_search():
+            generation = await acurrent_generation()
+            # Hybrid keyword + vector search in Weaviate, filtered inside the index
+            results = await aget_related_text(query, filters=weaviate_search_filter(filters), **params)
+            if results is not None:
+                await attach_documents(results)
+                await astore_results(query, cache_params, results, generation)
+            return results
+
+        try:
+            results = await aget_cached_results(query, cache_params)
+            from_cache = results is not None
+            if not from_cache:
+                # Identical concurrent searches share a single backend call
+                results = await search_flight.do(
+                    cache_key(query, cache_params),
+                    run_search,
+                    fetch_cached=lambda: aget_cached_results(query, cache_params),
+                )
+
+                if results is None:
+                    return JsonResponse({'results': [], 'message': 'Search service temporarily unavailable'})
+        except asyncio.CancelledError:
+            logger.info(f"Search cancelled by client disconnect: {query!r}")
+            raise
+
+        await SearchLog.objects.acreate(
+            user=await request.auser(),
+            query=query,
+            results=results,
+            from_cache=from_cache,
+        )
+
+        return JsonResponse({'results': results, 'from_cache': from_cache})
+    
+    return JsonResponse({'error': 'Invalid request method'})
+
+@login_required
+def search_logs_view(request):
+    logs = SearchLog.objects.filter(user=request.user)
+    return render(request, 'dashboard/search_logs.html', {'logs': logs})
+
+@login_required
+def manage_api_keys(request):
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        
+        if action == 'add':
+            name = request.POST.get('name')
+            api_key = request.POST.get('api_key')
+            aws_secret_key = ""
+            
+            try:
+                aws_secret_key = request.POST.get("aws_secret_key")
+            except:
+                pass
+
+            
+            if name and api_key:
+                user_key = UserAPIKey(user=request.user, name=name)
+                user_key.set_api_key(api_key)
+                user_key.save()
+                messages.success(request, f'API key "{name}" added successfully')
+                
+            if aws_secret_key:
+                user_key = UserAPIKey(user=request.user, name="X-AWS-Secret-Key")
+                user_key.set_api_key(aws_secret_key)
+                user_key.save()
+                messages.success(request, f'API key "{name}" added successfully')
+        
+        elif action == 'activate':
+            key_id = request.POST.get('key_id')
+            UserAPIKey.objects.filter(user=request.user).update(is_active=False)
+            UserAPIKey.objects.filter(id=key_id, user=request.user).update(is_active=True)
+            messages.success(request, 'API key activated')
+        
+        elif action == 'delete':
+            key_id = request.POST.get('key_id')
+            UserAPIKey.objects.filter(id=key_id, user=request.user).delete()
+            messages.success(request, 'API key deleted')
+    
+    return redirect('dashboard')
+
+def get_user_api_key(user):
+    """Get active API key for user or default"""
+    user_key = UserAPIKey.objects.filter(user=user, is_active=True).first()
+    if user_key:
+        return user_key.get_api_key()
+    return os.getenv('OPENAI_API_KEY')
+
+@login_required
+def upload_file_view(request):
+    if not request.user.is_staff:
+        messages.error(request, 'You do not have permission to upload files.')
+        return redirect('dashboard')
+
+    if request.method == 'POST':
+        form = DocumentForm(request.POST, request.FILES)
+        if form.is_valid():
+            document = form.save(commit=False)
+            document.file_sha256 = uploaded_file_sha256(request.FILES['file'])
+            
+            document.uploaded_by = request.user
+            # Per owner, like the document_owner_sha256_unique constraint
+            existing = (
+                Document.objects.filter(uploaded_by=request.user, file_sha256=document.file_sha256).first()
+                or save_new_document(document)
+            )
+            if existing:
+                messages.warning(request, f'"{request.FILES["file"].name}" is identical to "{existing.file.name}", which you uploaded on {existing.uploaded_at:%b %d, %Y}. It was not uploaded again.')
+                return redirect('document_detail', document_id=existing.pk)
+            
+            messages.success(request, f'Successfully uploaded "{document.file.name}"')
+            return redirect('dashboard')
+        else:
+            messages.error(request, 'Error uploading file. Please check the file format and size.')
+
+    return redirect('dashboard')
+
+@login_required
+def bulk_upload_view(request):
+    """Upload many PDFs, or ZIP archives of PDFs, and queue them all for processing"""
+    if not request.user.is_staff:
+        messages.error(request, 'You do not have permission to upload files.')
+        return redirect('dashboard')
+
+    if request.method == 'POST':
+        form = BulkUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                created, duplicates, too_large = ingest_uploads(form.cleaned_data['files'], request.user)
+            except zipfile.BadZipFile:
+                messages.error(request, 'One of the uploaded archives is not a valid ZIP file.')
+                return redirect('dashboard')
+            
+            if created:
+                enqueue_documents(created)
+                messages.success(request, f'Uploaded and queued {len(created)} document(s) for AI processing.')
+            if duplicates:
+                names = ', '.join(name for name, _ in duplicates[:5])
+                more = f' and {len(duplicates) - 5} more' if len(duplicates) > 5 else ''
+                messages.warning(request, f'Skipped {len(duplicates)} file(s) already uploaded: {names}{more}.')
+            if too_large:
+                names = ', '.join(too_large[:5])
+                more = f' and {len(too_large) - 5} more' if len(too_large) > 5 else ''
+                messages.warning(request, f'Skipped {len(too_large)} archived file(s) too large to extract: {names}{more}.')
+            if not created and not duplicates and not too_large:
+                messages.error(request, 'No PDF files were found in the upload.')
+        else:
+            messages.error(request, 'Error uploading files. Please select PDF files or ZIP archives.')
+
+    return redirect('dashboard')
+
+@login_required
+def document_detail_view(request, document_id):
+    document = get_object_or_404(Document, pk=document_id)
+    
+    file_exists = False
+    file_size = 0
+    
+    try:
+        if document.file and os.path.exists(document.file.path):
+            file_exists = True
+            file_size = os.path.getsize(document.file.path)
+    except (ValueError, OSError):
+        pass
+    
+    context = {
+        'document': document,
+        'file_size': file_size,
+        'file_exists': file_exists,
+        'stages': stage_states(document),
+        'has_checkpoints': document.checkpoints.exists()
+    }
+    return render(request, 'dashboard/document_detail.html', context)
+
+@login_required
+def process_document_view(request, document_id):
+    document = get_object_or_404(Document, pk=document_id)
+    
+    if document.status == 'processed':
+        messages.info(request, f'Document "{document.file.name}" is already processed.')
+        return redirect('dashboard')
+    
+    if document.status == 'processing':
+        messages.warning(request, f'Document "{document.file.name}" is currently being processed.')
+        return redirect('dashboard')
+    
+    job = enqueue_document(document)
+    messages.success(request, f'Queued "{document.file.name}" for AI processing (job #{job.pk}).')
+
+    return redirect('dashboard')
+
+def _progress_payload(document_status, job):
+    if job is None:
+        return {'document_status': document_status, 'job': None}
+
+    return {
+        'document_status': document_status,
+        'job': {
+            'id': job.pk,
+            'status': job.status,
+            'stage': job.stage,
+            'stage_display': job.get_stage_display(),
+            'detail': job.progress_detail,
+            'partial_summary': job.partial_summary,
+            'attempts': job.attempts,
+            'max_attempts': job.max_attempts,
+            'run_after': job.run_after.isoformat(),
+            'last_error': job.last_error,
+        }
+    }
+
+def job_progress_payload(document):
+    return _progress_payload(document.status, document.jobs.first())
+
+async def ajob_progress_payload(document):
+    status = await Document.objects.filter(pk=document.pk).values_list('status', flat=True).aget()
+    return _progress_payload(status, await document.jobs.afirst())
+
+@login_required
+def job_status_view(request, document_id):
+    """API endpoint to poll the latest processing job for a document"""
+    document = get_object_or_404(Document, pk=document_id)
+    return JsonResponse(job_progress_payload(document))
+
+class ProgressEvents:
+    """Turns polled progress payloads into Server-Sent Events messages"""
+
+    KEEP_ALIVE_SECONDS = 15
+
+    def __init__(self, max_duration):
+        self.started = self.last_sent = time.monotonic()
+        self.max_duration = max_duration
+        self.last_payload = None
+        self.done = False
+
+    def open(self):
+        return not self.done and time.monotonic() - self.started < self.max_duration
+
+    def messages(self, payload):
+        now = time.monotonic()
+        if payload != self.last_payload:
+            yield f"data: {json.dumps(payload)}\n\n"
+            self.last_payload = payload
+            self.last_sent = now
+        elif now - self.last_sent >= self.KEEP_ALIVE_SECONDS:
+            yield ": keep-alive\n\n"
+            self.last_sent = now
+
+        job = payload['job']
+        if job is None or job['status'] in ('succeeded', 'failed'):
+            self.done = True
+            yield "event: done\ndata: {}\n\n"
+
+@login_required
+async def job_events_view(request, document_id):
+    """Server-Sent Events stream of processing progress for a document.
+
+    Under ASGI the stream is an async generator, so each open stream only
+    holds a coroutine rather than a thread for up to
+    PROGRESS_STREAM_MAX_SECONDS. Under WSGI (runserver, gunicorn) Django
+    would collect an async generator into a list before sending anything,
+    so there the stream is a sync generator.
+    """
+    document = await aget_object_or_404(Document, pk=document_id)
+    interval = getattr(settings, 'PROGRESS_POLL_INTERVAL', 0.5)
+    events = ProgressEvents(getattr(settings, 'PROGRESS_STREAM_MAX_SECONDS', 300))
+
+    # Browsers reconnect automatically once the stream ends
+    async def async_stream():
+        yield "retry: 2000\n\n"
+        while events.open():
+            for message in events.messages(await ajob_progress_payload(document)):
+                yield message
+            if not events.done:
+                await asyncio.sleep(interval)
+
+    def sync_stream():
+        yield "retry: 2000\n\n"
+        while events.open():
+            document.refresh_from_db(fields=['status'])
+            yield from events.messages(job_progress_payload(document))
+            if not events.done:
+                time.sleep(interval)
+
+    stream = async_stream() if isinstance(request, ASGIRequest) else sync_stream()
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@login_required
+def view_document_file(request, document_id):
+    document = get_object_or_404(Document, pk=document_id)
+    
+    if not os.path.exists(document.file.path):
+        raise Http404("Document file not found")
+    
+    with open(document.file.path, 'rb') as f:
+        response = HttpResponse(f.read(), content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="{document.file.name}"'
+        return response
+
+@login_required
+def view_summary_file(request, document_id):
+    document = get_object_or_404(Document, pk=document_id)
+    
+    if not document.summarized_file or not os.path.exists(document.summarized_file.path):
+        raise Http404("Summary file not found")
+    
+    with open(document.summarized_file.path, 'r', encoding='utf-8') as f:
+        content = f.read()
+        response = HttpResponse(content, content_type='application/json')
+        response['Content-Disposition'] = f'attachment; filename="{os.path.basename(document.summarized_file.name)}"'
+        return response
+
+@login_required
+def document_management_view(request):
+    """Document management page with search, filter, and bulk download"""
+    search = request.GET.get('search', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    documents = Document.objects.filter(uploaded_by=request.user).order_by('-uploaded_at')
+    
+    if search:
+        documents = documents.filter(file__icontains=search)
+    
+    if date_from:
+        documents = documents.filter(uploaded_at__date__gte=date_from)
+    
+    if date_to:
+        documents = documents.filter(uploaded_at__date__lte=date_to)
+    
+    # Add file size to each document
+    for doc in documents:
+        try:
+            if doc.file and os.path.exists(doc.file.path):
+                doc.file_size = os.path.getsize(doc.file.path)
+            else:
+                doc.file_size = 0
+        except:
+            doc.file_size = 0
+    
+    context = {
+        'documents': documents,
+        'search': search,
+        'date_from': date_from,
+        'date_to': date_to,
+    }
+    return render(request, 'dashboard/document_management.html', context)
+
+@login_required
+def bulk_download_documents(request):
+    """Handle bulk download of selected documents"""
+    if request.method == 'POST':
+        document_ids = request.POST.getlist('document_ids')
+        
+        if not document_ids:
+            messages.error(request, 'No documents selected for download.')
+            return redirect('document_management')
+        
+        documents = Document.objects.filter(id__in=document_ids, uploaded_by=request.user)
+        
+        if len(documents) == 1:
+            # Single file download
+            document = documents.first()
+            if document.file and os.path.exists(document.file.path):
+                with open(document.file.path, 'rb') as f:
+                    response = HttpResponse(f.read(), content_type='application/octet-stream')
+                    response['Content-Disposition'] = f'attachment; filename="{os.path.basename(document.file.name)}"'
+                    return response
+            else:
+                messages.error(request, 'File not found.')
+                return redirect('document_management')
+        
+        else:
+            # Multiple files - create zip
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
+                with zipfile.ZipFile(temp_zip, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                    for document in documents:
+                        if document.file and os.path.exists(document.file.path):
+                            zip_file.write(document.file.path, os.path.basename(document.file.name))
+                
+                temp_zip.seek(0)
+                with open(temp_zip.name, 'rb') as f:
+                    response = HttpResponse(f.read(), content_type='application/zip')
+                    response['Content-Disposition'] = f'attachment; filename="documents_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip"'
+                
+                os.unlink(temp_zip.name)
+                return response
+    
+    return redirect('document_management')
+
+@login_required
+def delete_document_view(request, document_id):
+    if not request.user.is_staff:
+        messages.error(request, 'You do not have permission to delete documents.')
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        document = get_object_or_404(Document, pk=document_id)
+        filename = document.file.name
+        content_hash = indexed_content_hash(document)
+        
+        # Delete physical files
+        try:
+            if document.file and os.path.exists(document.file.path):
+                os.remove(document.file.path)
+            if document.summarized_file and os.path.exists(document.summarized_file.path):
+                os.remove(document.summarized_file.path)
+        except Exception as e:
+            messages.warning(request, f'File deletion warning: {str(e)}')
+        
+        # Delete database record
+        document.delete()
+        if content_hash:
+            try:
+                remove_unused_index_entry(content_hash)
+            except Exception as e:
+                messages.warning(request, f'Search index cleanup warning: {str(e)}')
+        messages.success(request, f'Successfully deleted "{filename}"')
+    
+    return redirect('dashboard')
+async def weaviate_summary(document_name):
+    """Summary stored in Weaviate for this file, or None if it is missing or Weaviate fails"""
+    try:
+        return await aget_summary(document_name)
+    except asyncio.TimeoutError:
+        logger.warning(f"Timed out getting summary for {document_name}")
+    except Exception as e:
+        logger.warning(f"Error obtained while getting summary: {str(e)}")
+    return None
+
+@login_required
+async def get_summary_view(request, document_id):
+    """API endpoint to get document summary"""
+    document = await aget_object_or_404(Document, pk=document_id)
+    
+    summary = await weaviate_summary(document.file.name)
+    if summary:
+        return JsonResponse({"summary": summary})
+    else:
+        return JsonResponse({"summary": None, "message": "No summary available"})
+@login_required
+def admin_weaviate_view(request):
+    """Admin page to manage Weaviate data"""
+    if not request.user.is_staff:
+        messages.error(request, 'Access denied. Admin privileges required.')
+        return redirect('dashboard')
+    
+    weaviate_data = []
+    try:
+        weaviate_data = get_vector_store().list_documents(limit=100)
+    except Exception as e:
+        messages.error(request, f'Error fetching Weaviate data: {e}')
+    
+    context = {
+        'weaviate_data': weaviate_data,
+        'total_count': len(weaviate_data)
+    }
+    return render(request, 'dashboard/admin_weaviate.html', context)
+
+@login_required
+def model_metrics_view(request):
+    """Load time, memory and batching counters for the embedding models in this worker"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Admin privileges required'}, status=403)
+    
+    from ..utils.model_registry import registry
+    return JsonResponse(registry.metrics())
+
+@login_required
+def vector_store_metrics_view(request):
+    """Per-operation call counts and latencies of the search backend in this worker"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Admin privileges required'}, status=403)
+    
+    store = get_vector_store()
+    return JsonResponse({'backend': store.name, 'pid': os.getpid(), 'operations': store.metrics.snapshot()})
+
+@login_required
+def delete_weaviate_entry(request, content_hash):
+    """Delete entry from Weaviate by content hash"""
+    if not request.user.is_staff:
+        messages.error(request, 'Access denied. Admin privileges required.')
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        try:
+            if get_vector_store().delete_document(content_hash):
+                invalidate_search_results()
+                messages.success(request, 'Entry deleted successfully from Weaviate')
+            else:
+                messages.error(request, 'Entry not found in Weaviate')
+        except Exception as e:
+            messages.error(request, f'Error deleting from Weaviate: {e}')
+    
+    return redirect('admin_weaviate')
+
+@login_required
+def view_weaviate_summary(request, content_hash):
+    """View detailed summary from Weaviate"""
+    if not request.user.is_staff:
+        messages.error(request, 'Access denied. Admin privileges required.')
+        return redirect('dashboard')
+    
+    summary_data = None
+    try:
+        summary_data = get_vector_store().find_document(content_hash=content_hash)
+    except Exception as e:
+        messages.error(request, f'Error fetching summary: {e}')
+    
+    context = {
+        'summary_data': summary_data,
+        'content_hash': content_hash
+    }
+    return render(request, 'dashboard/view_weaviate_summary.html', context)
+@login_required
+def view_document_content(request, document_id):
+    """View the text content of a document.
+
+    Only text already extracted is shown; extraction (and OCR) runs in the
+    document workers once the document is sent for processing.
+    """
+    document = get_object_or_404(Document, pk=document_id)
+    
+    text_content = cached_document_text(document)
+    if text_content is None:
+        if document.status == 'uploaded':
+            text_content = "Text has not been extracted yet. Process the document to extract it."
+        elif document.status == 'processing':
+            text_content = "Text is being extracted; check back shortly."
+        else:
+            text_content = "No text was extracted from this document."
+    elif not text_content.strip():
+        text_content = "No text content could be extracted from this document."
+    
+    context = {
+        'document': document,
+        'text_content': text_content,
+        'filename': os.path.basename(document.file.name)
+    }
+    return render(request, 'dashboard/view_document_content.html', context)
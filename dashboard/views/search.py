@@ -1,65 +1,102 @@
-from django.shortcuts import render
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from django.db import close_old_connections
+from asgiref.sync import sync_to_async
+import asyncio
 import json
+import httpx
+import logging
 from ..models import QueryCache
-from ..utils.similarity import QuestionSimilarity
-from ..utils.weaviate_client import WeaviateClient
-from ..utils.ai_client import AIClient
+from ..utils.similarity import QuestionSimilarity, question_index, embedding_to_bytes
+from ..weaviate_module.utils import SEARCH_RETURN_PROPERTIES, aget_related_text
+from ..answer import answer_question
+from . import attach_documents, search_filters, weaviate_search_filter
+
+logger = logging.getLogger(__name__)
+
+def find_similar_question(similarity_checker, question):
+    """Runs in an executor thread, which Django's request cycle never cleans up after"""
+    try:
+        return similarity_checker.find_similar_question(question)
+    finally:
+        close_old_connections()
 
 @login_required
 @csrf_exempt
-def search_query(request):
-    if request.method == 'POST':
-        data = json.loads(request.body)
-        question = data.get('question', '').strip()
-        ai_provider = data.get('ai_provider', 'openai')
-        
-        if not question:
-            return JsonResponse({'error': 'Question is required'}, status=400)
-        
-        # Check for similar questions
+async def search_query(request):
+    """Answer a question from the indexed tenders, citing the documents used"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    try:
+        data = json.loads(request.body or b'{}')
+        question = str(data.get('question', '')).strip()
+        filters = search_filters(data)
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+
+    if not question:
+        return JsonResponse({'error': 'Question is required'}, status=400)
+
+    try:
+        # Check for similar questions; scoped questions are not shared through the cache
         similarity_checker = QuestionSimilarity()
-        cached_queries = QueryCache.objects.values_list('question', flat=True)
-        
-        similar_idx, similarity_score = similarity_checker.find_similar_question(
-            question, list(cached_queries)
+        question_embedding = None
+        if not filters:
+            # Off the shared sync thread, so concurrent questions are encoded (and batched) together
+            similar_pk, similarity_score, question_embedding = await sync_to_async(
+                find_similar_question, thread_sensitive=False
+            )(similarity_checker, question)
+
+            if similar_pk is not None:
+                cached_query = await QueryCache.objects.filter(pk=similar_pk).afirst()
+                if cached_query is None:
+                    # Deleted by another process since the index last saw it
+                    question_index.remove(similar_pk)
+                else:
+                    # Return cached response
+                    return JsonResponse({
+                        'response': cached_query.response,
+                        'citations': cached_query.citations,
+                        'cached': True,
+                        'similarity': similarity_score
+                    })
+
+        hits = await aget_related_text(
+            question,
+            limit=getattr(settings, 'ANSWER_RETRIEVAL_LIMIT', 20),
+            return_properties=SEARCH_RETURN_PROPERTIES + ["text"],
+            filters=weaviate_search_filter(filters),
         )
-        
-        if similar_idx is not None:
-            # Return cached response
-            cached_query = QueryCache.objects.all()[similar_idx]
-            return JsonResponse({
-                'response': cached_query.response,
-                'cached': True,
-                'similarity': similarity_score
-            })
-        
-        # Process new query with AI
-        try:
-            weaviate_client = WeaviateClient()
-            ai_client = AIClient(provider=ai_provider)
-            
-            # Search Weaviate for relevant documents
-            search_results = weaviate_client.search(question)
-            
-            # Generate AI response
-            response = ai_client.generate_response(question, search_results)
-            
-            # Cache the response
-            QueryCache.objects.create(
+        if hits is None:
+            return JsonResponse({'error': 'Search service temporarily unavailable'}, status=503)
+        await attach_documents(hits)
+
+        result = await answer_question(question, hits)
+
+        if question_embedding is not None:
+            await QueryCache.objects.acreate(
                 question=question,
-                response=response,
-                user=request.user
+                response=result['answer'],
+                citations=result['citations'],
+                embedding=embedding_to_bytes(question_embedding),
+                user=await request.auser()
             )
-            
-            return JsonResponse({
-                'response': response,
-                'cached': False
-            })
-            
-        except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
-    
-    return render(request, 'dashboard/search.html')
+
+        return JsonResponse({
+            'response': result['answer'],
+            'citations': result['citations'],
+            'context_tokens': result['context_tokens'],
+            'cached': False
+        })
+
+    except asyncio.CancelledError:
+        logger.info(f"Question cancelled by client disconnect: {question!r}")
+        raise
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        return JsonResponse({'error': 'The answer took too long to generate'}, status=504)
+    except Exception as e:
+        logger.error(f"Error answering question: {e}")
+        return JsonResponse({'error': str(e)}, status=500)
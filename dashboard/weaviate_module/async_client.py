@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import weakref
+import weaviate
+from django.conf import settings
+from .client import DOCUMENT_COLLECTION, CHUNK_COLLECTION, ConnectionHealth, connection_settings
+
+logger = logging.getLogger(__name__)
+
+# One connected client per event loop: under ASGI that is one per worker process.
+# Under WSGI (runserver, gunicorn) each async view runs in a fresh loop through
+# async_to_sync, so a per-loop client would be opened for every request and
+# never closed; there the async views use the pooled sync client instead.
+_enabled = False
+_clients = weakref.WeakKeyDictionary()
+_locks = weakref.WeakKeyDictionary()
+_health = ConnectionHealth()
+
+
+def enable():
+    """Called by the ASGI entry point (tender_project/asgi.py), whose event loop lives for the whole process"""
+    global _enabled
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def query_timeout():
+    return getattr(settings, 'WEAVIATE_QUERY_TIMEOUT', 10)
+
+
+async def _close(client):
+    try:
+        await client.close()
+    except Exception as e:
+        logger.debug(f"Error closing async Weaviate client: {e}")
+
+
+async def _healthy(client):
+    if not client.is_connected():
+        return False
+    if not _health.check_due():
+        return True
+    try:
+        live = await asyncio.wait_for(client.is_live(), timeout=query_timeout())
+    except Exception:
+        live = False
+    _health.checked()
+    return live
+
+
+async def get_async_weaviate_client():
+    """Connected WeaviateAsyncClient for the running loop, or None if Weaviate is unreachable"""
+    if not _enabled:
+        raise RuntimeError("The async Weaviate client is only available when served through tender_project/asgi.py")
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is not None and await _healthy(client):
+        return client
+
+    lock = _locks.setdefault(loop, asyncio.Lock())
+    async with lock:
+        current = _clients.get(loop)
+        if current is not None and current is not client:
+            return current  # another task reconnected
+        if current is not None:
+            logger.warning("Async Weaviate connection lost; reconnecting")
+            del _clients[loop]
+            await _close(current)
+        if _health.backing_off():
+            return None
+        client = weaviate.use_async_with_local(**connection_settings())
+        try:
+            await asyncio.wait_for(client.connect(), timeout=query_timeout())
+        except Exception as e:
+            await _close(client)
+            _health.failed(e)
+            return None
+        _health.connected()
+        _clients[loop] = client
+        return client
+
+
+async def close_async_client():
+    """Close the running loop's client; called on ASGI lifespan shutdown"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await _close(client)
+
+
+async def get_async_collection(name=DOCUMENT_COLLECTION):
+    """Handle to an existing collection; the schema is created by `manage.py migrate_weaviate`"""
+    client = await get_async_weaviate_client()
+    if client is None:
+        logger.warning("Weaviate client not available")
+        return None
+    return client.collections.get(name)
+
+
+async def get_async_chunk_collection():
+    return await get_async_collection(CHUNK_COLLECTION)
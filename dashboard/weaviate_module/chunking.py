@@ -0,0 +1,35 @@
+# filepath: dashboard/weaviate_module/chunking.py
+from functools import lru_cache
+from django.conf import settings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+import tiktoken
+
+ENCODING_NAME = "cl100k_base"
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    return tiktoken.get_encoding(ENCODING_NAME)
+
+
+def count_tokens(text):
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def get_text_splitter(chunk_tokens=None, overlap_tokens=None):
+    """Token-aware splitter sized by CHUNK_TOKENS / CHUNK_OVERLAP_TOKENS"""
+    if chunk_tokens is None:
+        chunk_tokens = getattr(settings, 'CHUNK_TOKENS', 512)
+    if overlap_tokens is None:
+        overlap_tokens = getattr(settings, 'CHUNK_OVERLAP_TOKENS', 64)
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=ENCODING_NAME,
+        chunk_size=chunk_tokens,
+        chunk_overlap=overlap_tokens,
+    )
+
+
+def chunk_text(text_content, chunk_tokens=None, overlap_tokens=None):
+    """Split text into overlapping chunks of at most chunk_tokens tokens"""
+    splitter = get_text_splitter(chunk_tokens, overlap_tokens)
+    return [chunk for chunk in splitter.split_text(text_content) if chunk.strip()]
@@ -1,76 +1,167 @@
 # filepath: dashboard/weaviate_module/client.py
+import atexit
+import os
+import threading
+import time
 import weaviate
 import logging
-from weaviate.classes.config import Configure,Property,DataType,Tokenization
+from django.conf import settings
+from weaviate.classes.init import AdditionalConfig, Timeout
 
 logger = logging.getLogger(__name__)
 
-# Initialize client as None
-client = None
+DOCUMENT_COLLECTION = "TenderDocument"
+CHUNK_COLLECTION = "TenderChunk"
 
-def get_weaviate_client():
-    global client
-    if client is None:
+class ConnectionHealth:
+    """Liveness-check scheduling and reconnect backoff, shared by the sync and async clients.
+
+    Liveness is checked at most every WEAVIATE_HEALTH_CHECK_INTERVAL
+    seconds. After a failed connection, attempts are spaced out with
+    exponential backoff up to WEAVIATE_RECONNECT_BACKOFF_MAX seconds.
+    """
+
+    def __init__(self):
+        self.checked_at = 0.0
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def check_due(self):
+        return time.monotonic() - self.checked_at >= getattr(settings, 'WEAVIATE_HEALTH_CHECK_INTERVAL', 30)
+
+    def checked(self):
+        self.checked_at = time.monotonic()
+
+    def backing_off(self):
+        return time.monotonic() < self.retry_at
+
+    def connected(self):
+        self.failures = 0
+        self.checked()
+        logger.info("Connected to Weaviate successfully")
+
+    def failed(self, error):
+        self.failures += 1
+        delay = min(
+            getattr(settings, 'WEAVIATE_RECONNECT_BACKOFF', 1) * 2 ** (self.failures - 1),
+            getattr(settings, 'WEAVIATE_RECONNECT_BACKOFF_MAX', 60),
+        )
+        self.retry_at = time.monotonic() + delay
+        logger.warning(f"Could not connect to Weaviate: {error}; retrying in {delay:g}s")
+
+
+def connection_settings():
+    """Keyword arguments shared by connect_to_local and use_async_with_local"""
+    return dict(
+        host=getattr(settings, 'WEAVIATE_HOST', 'localhost'),
+        port=getattr(settings, 'WEAVIATE_PORT', 8080),
+        grpc_port=getattr(settings, 'WEAVIATE_GRPC_PORT', 50051),
+        additional_config=AdditionalConfig(timeout=Timeout(
+            init=getattr(settings, 'WEAVIATE_CONNECT_TIMEOUT', 5),
+            query=getattr(settings, 'WEAVIATE_QUERY_TIMEOUT', 10),
+        )),
+    )
+
+
+class WeaviateClientManager:
+    """One lazily connected Weaviate client per process, with cached collection handles.
+
+    See ConnectionHealth for liveness checks and backoff; while backing off
+    callers get None instead of waiting on a connect timeout. A forked child
+    (gunicorn --preload) drops the parent's client without closing it and
+    connects on first use.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._client = None
+        self._collections = {}
+        self._health = ConnectionHealth()
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            # The inherited connections belong to the parent; leave them alone
+            self._reset()
+
+    def _connect(self):
+        return weaviate.connect_to_local(**connection_settings())
+
+    def _healthy(self, client):
+        if not client.is_connected():
+            return False
+        if not self._health.check_due():
+            return True
         try:
-            client = weaviate.connect_to_local() or weaviate.connect_to_local(port=8081)
-            logger.info("Connected to Weaviate successfully")
-        except Exception as e:
-            logger.warning(f"Could not connect to Weaviate: {e}")
-            client = None
-    return client
-
-def get_collection(client=None):
-    if client is None:
-        client = get_weaviate_client()
-    
-    if client is None:
-        logger.warning("Weaviate client not available")
-        return None
-    
-    try: 
-        if not client.collections.exists("TenderDocument"):
-            documents = client.collections.create(
-                name="TenderDocument",
-                vector_config=Configure.Vectors.text2vec_transformers(
-                    vector_index_config=Configure.VectorIndex.hnsw(),
-                    source_properties=[
-                        "text_content",
-                        "summary"
-                    ]
-                ),
-                properties=[
-                    Property(
-                        name="file_name",
-                        index_filterable=True,
-                        index_searchable=True,
-                        data_type=DataType.TEXT
-                    ),
-                    Property(
-                        name="time_created",
-                        data_type=DataType.DATE,
-                    ),
-                    Property(
-                        name="text_content",
-                        data_type=DataType.TEXT
-                    ),
-                    Property(
-                        name="content_hash",
-                        index_filterable=True,
-                        index_searchable=True,
-                        data_type=DataType.TEXT
-                    ),
-                    Property(
-                        name="summary",
-                        data_type=DataType.TEXT
-                    )
-    
-                ]
-            )
-            return documents
-        
-        else:
-            documents = client.collections.get("TenderDocument")
-            
-            return documents
-    except Exception as e:
-        logger.warning(f"Error obtained while getting collection: {str(e)}")
\ No newline at end of file
+            live = client.is_live()
+        except Exception:
+            live = False
+        self._health.checked()
+        return live
+
+    def client(self):
+        """Connected client, or None while Weaviate is unreachable"""
+        self._check_fork()
+        client = self._client
+        if client is not None and self._healthy(client):
+            return client
+
+        with self._lock:
+            if self._client is not None and self._client is not client:
+                return self._client  # another thread reconnected
+            if self._client is not None:
+                logger.warning("Weaviate connection lost; reconnecting")
+                self._discard()
+            if self._health.backing_off():
+                return None
+            try:
+                self._client = self._connect()
+            except Exception as e:
+                self._health.failed(e)
+                return None
+            self._health.connected()
+            return self._client
+
+    def collection(self, name):
+        """Handle to collection (or alias) `name`; the schema is created by `manage.py migrate_weaviate`"""
+        client = self.client()
+        if client is None:
+            return None
+        handle = self._collections.get(name)
+        if handle is None:
+            handle = self._collections[name] = client.collections.get(name)
+        return handle
+
+    def _discard(self):
+        client, self._client = self._client, None
+        self._collections = {}
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Error closing Weaviate client: {e}")
+
+    def close(self):
+        """Close this process's connection (registered with atexit)"""
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            self._discard()
+
+
+manager = WeaviateClientManager()
+atexit.register(manager.close)
+
+def get_weaviate_client():
+    return manager.client()
+
+def get_collection():
+    """Cached handle to the TenderDocument collection, or None if Weaviate is unavailable"""
+    return manager.collection(DOCUMENT_COLLECTION)
+
+def get_chunk_collection():
+    """Cached handle to the TenderChunk collection, or None if Weaviate is unavailable"""
+    return manager.collection(CHUNK_COLLECTION)
@@ -0,0 +1,464 @@
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from weaviate.classes.config import Configure, Property, DataType, Tokenization, ReferenceProperty
+from weaviate.classes.query import QueryReference
+from .client import DOCUMENT_COLLECTION, CHUNK_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_COLLECTION = "SchemaMigration"
+
+
+# Declared schema: what each collection should look like now. Migrations
+# below bring an existing instance up to it; a fresh instance gets it in one go.
+
+def _document_config():
+    return dict(
+        vector_config=Configure.Vectors.text2vec_transformers(
+            vector_index_config=Configure.VectorIndex.hnsw(),
+            source_properties=[
+                "text_content",
+                "summary"
+            ]
+        ),
+        properties=[
+            Property(
+                name="file_name",
+                index_filterable=True,
+                index_searchable=True,
+                data_type=DataType.TEXT
+            ),
+            Property(
+                name="time_created",
+                data_type=DataType.DATE,
+            ),
+            Property(
+                name="text_content",
+                data_type=DataType.TEXT
+            ),
+            Property(
+                name="content_hash",
+                index_filterable=True,
+                index_searchable=True,
+                data_type=DataType.TEXT
+            ),
+            Property(
+                name="summary",
+                data_type=DataType.TEXT
+            )
+        ]
+    )
+
+def _chunk_config():
+    return dict(
+        vector_config=Configure.Vectors.text2vec_transformers(
+            vector_index_config=Configure.VectorIndex.hnsw(),
+            source_properties=["text"]
+        ),
+        properties=[
+            Property(
+                name="text",
+                data_type=DataType.TEXT
+            ),
+            Property(
+                name="chunk_index",
+                index_filterable=True,
+                data_type=DataType.INT
+            ),
+            Property(
+                name="file_name",
+                index_filterable=True,
+                index_searchable=True,
+                data_type=DataType.TEXT
+            ),
+            Property(
+                name="content_hash",
+                index_filterable=True,
+                data_type=DataType.TEXT
+            ),
+            # Denormalised from the Django Document/TenderDetails so
+            # searches can be filtered inside Weaviate
+            Property(
+                name="document_id",
+                index_filterable=True,
+                data_type=DataType.INT
+            ),
+            Property(
+                name="uploaded_at",
+                index_filterable=True,
+                index_range_filters=True,
+                data_type=DataType.DATE
+            ),
+            Property(
+                name="category",
+                index_filterable=True,
+                index_searchable=False,
+                tokenization=Tokenization.FIELD,
+                data_type=DataType.TEXT
+            ),
+            Property(
+                name="procuring_entity",
+                index_filterable=True,
+                index_searchable=False,
+                data_type=DataType.TEXT
+            ),
+            Property(
+                name="closing_date",
+                index_filterable=True,
+                index_range_filters=True,
+                data_type=DataType.DATE
+            ),
+        ],
+        references=[
+            ReferenceProperty(
+                name="document",
+                target_collection=DOCUMENT_COLLECTION
+            )
+        ]
+    )
+
+def _migration_config():
+    return dict(
+        vector_config=Configure.Vectors.self_provided(),
+        properties=[
+            Property(name="version", index_filterable=True, data_type=DataType.INT),
+            Property(name="name", data_type=DataType.TEXT),
+            Property(name="applied_at", data_type=DataType.DATE),
+        ]
+    )
+
+COLLECTIONS = {
+    DOCUMENT_COLLECTION: _document_config,
+    CHUNK_COLLECTION: _chunk_config,
+}
+
+# Properties that refer to another collection and must be carried over on reindex
+REFERENCES = {CHUNK_COLLECTION: ["document"]}
+
+
+def collection_config(name, client=None, targets=None):
+    """Keyword arguments for collections.create.
+
+    Reference targets must name a physical collection: they come from
+    `targets` (collection -> physical name) when given, else are resolved
+    through the aliases with a client.
+    """
+    config = COLLECTIONS[name]()
+    if client is not None or targets:
+        config["references"] = [
+            ReferenceProperty(
+                name=ref.name,
+                target_collection=(targets or {}).get(ref.target_collection)
+                or (resolve(client, ref.target_collection) if client is not None else None)
+                or ref.target_collection,
+            )
+            for ref in config.get("references", [])
+        ]
+    return config
+
+def dependents(name):
+    """Collections whose references point at `name`, and so must be rebuilt with it"""
+    return [
+        other for other in COLLECTIONS
+        if any(ref.target_collection == name for ref in COLLECTIONS[other]().get("references", []))
+    ]
+
+def declared_property(collection, name):
+    for prop in collection_config(collection)["properties"]:
+        if prop.name == name:
+            return prop
+    raise KeyError(f"{collection} declares no property {name!r}")
+
+
+# Aliases (Weaviate 1.32+) let a collection be rebuilt under a new physical
+# name and switched over in one step; on older servers collections are plain.
+
+def supports_aliases(client):
+    major, minor = (int(part) for part in client.get_meta()["version"].split(".")[:2])
+    return (major, minor) >= (1, 32)
+
+def resolve(client, name):
+    """The physical collection behind `name`, or None if there is neither an alias nor a collection"""
+    if supports_aliases(client):
+        alias = client.alias.get(alias_name=name)
+        if alias is not None:
+            return alias.collection
+    return name if client.collections.exists(name) else None
+
+def physical_name(name, version):
+    return f"{name}_v{version}"
+
+
+class Operation:
+    def describe(self):
+        raise NotImplementedError
+
+    def apply(self, client, migration, options):
+        raise NotImplementedError
+
+
+class CreateCollection(Operation):
+    """Create a collection from its declared config, if it does not exist yet"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def describe(self):
+        return f"create {self.name}"
+
+    def apply(self, client, migration, options):
+        if resolve(client, self.name) is not None:
+            logger.info(f"{self.name} already exists")
+            return
+        if supports_aliases(client):
+            # Created behind an alias so a later Reindex can switch without a gap
+            target = physical_name(self.name, migration.version)
+            client.collections.create(name=target, **collection_config(self.name, client))
+            client.alias.create(alias_name=self.name, target_collection=target)
+        else:
+            client.collections.create(name=self.name, **collection_config(self.name, client))
+
+
+class AddProperty(Operation):
+    """Add a declared property to an existing collection"""
+
+    def __init__(self, collection, name):
+        self.collection = collection
+        self.name = name
+
+    def describe(self):
+        return f"add {self.collection}.{self.name}"
+
+    def apply(self, client, migration, options):
+        collection = client.collections.get(self.collection)
+        existing = {prop.name: prop for prop in collection.config.get().properties}
+        declared = declared_property(self.collection, self.name)
+        if self.name not in existing:
+            collection.config.add_property(declared)
+            return
+        prop = existing[self.name]
+        # Auto-schema may have created it on insert with default index settings
+        if (prop.index_range_filters != bool(declared.indexRangeFilters)
+                or (declared.tokenization and prop.tokenization != declared.tokenization)):
+            logger.warning(
+                f"{self.collection}.{self.name} exists with different index settings; "
+                f"run `manage.py migrate_weaviate --reindex {self.collection}` to rebuild it"
+            )
+
+
+class UpdateConfig(Operation):
+    """Change mutable settings in place, e.g. UpdateConfig(CHUNK_COLLECTION, vector_index_config=Reconfigure.VectorIndex.hnsw(ef=128))"""
+
+    def __init__(self, collection, **changes):
+        self.collection = collection
+        self.changes = changes
+
+    def describe(self):
+        return f"reconfigure {self.collection} ({', '.join(self.changes)})"
+
+    def apply(self, client, migration, options):
+        client.collections.get(self.collection).config.update(**self.changes)
+
+
+class Reindex(Operation):
+    """Rebuild a collection from its declared config, for changes Weaviate cannot make in place.
+
+    Objects are copied with their uuids, references and vectors (pass
+    revectorise=True when the vectorizer changed) into a new physical
+    collection. References name a physical collection, so collections that
+    refer to this one are rebuilt alongside it to point at the new copy.
+    Objects created during the copy are copied again before the old
+    collections go. Deletes made during the copy are not carried over, so
+    pause deletions for the duration.
+    """
+
+    def __init__(self, collection, revectorise=False):
+        self.collection = collection
+        self.revectorise = revectorise
+
+    def describe(self):
+        return f"reindex {self.collection}"
+
+    def apply(self, client, migration, options):
+        if not supports_aliases(client):
+            raise RuntimeError(f"Reindexing {self.collection} needs Weaviate 1.32+ for collection aliases")
+        names = [self.collection] + dependents(self.collection)
+        sources, targets = {}, {}
+        for name in names:
+            sources[name] = resolve(client, name)
+            targets[name] = physical_name(name, migration.version)
+            if sources[name] is None:
+                raise RuntimeError(f"{name} does not exist")
+            if targets[name] == sources[name]:
+                raise RuntimeError(f"{name} already points at {targets[name]}")
+
+        for name in names:
+            if client.collections.exists(targets[name]):
+                # Left over from an interrupted run
+                client.collections.delete(targets[name])
+            client.collections.create(name=targets[name], **collection_config(name, client, targets))
+
+        started = datetime.now(timezone.utc)
+        copied = {name: self._copy(client, name, sources[name], targets[name]) for name in names}
+
+        for name in names:
+            source, target = sources[name], targets[name]
+            if source == name:
+                # First reindex of a plain collection: the alias can only take
+                # its name once it is gone, so catch up on writes first and
+                # keep the gap to the delete and create below
+                copied[name] += self._copy(client, name, source, target, since=started)
+                logger.warning(f"Replacing plain collection {source} with an alias; expect a brief gap")
+                client.collections.delete(source)
+                client.alias.create(alias_name=name, target_collection=target)
+            else:
+                client.alias.update(alias_name=name, new_target_collection=target)
+                copied[name] += self._copy(client, name, source, target, since=started)
+
+        for name in names:
+            if sources[name] != name and not options.get("keep_old"):
+                client.collections.delete(sources[name])
+            logger.info(f"Reindexed {copied[name]} objects of {name} into {targets[name]}")
+
+    def _copy(self, client, name, source, target, since=None):
+        references = REFERENCES.get(name, [])
+        revectorise = self.revectorise and name == self.collection
+        source_collection = client.collections.get(source)
+        target_collection = client.collections.get(target)
+        copied = 0
+        with target_collection.batch.dynamic() as batch:
+            for obj in source_collection.iterator(
+                include_vector=not revectorise,
+                return_metadata=["creation_time"],
+                return_references=[QueryReference(link_on=ref) for ref in references] or None,
+            ):
+                if since is not None and obj.metadata.creation_time < since:
+                    continue
+                batch.add_object(
+                    properties=obj.properties,
+                    uuid=obj.uuid,
+                    vector=None if revectorise else (obj.vector or None),
+                    references={
+                        ref: [linked.uuid for linked in obj.references[ref].objects]
+                        for ref in references if obj.references and ref in obj.references
+                    } or None,
+                )
+                copied += 1
+        failed = target_collection.batch.failed_objects
+        if failed:
+            raise RuntimeError(f"{len(failed)} objects failed to copy into {target}: {failed[0].message}")
+        return copied
+
+
+class Migration:
+    def __init__(self, version, name, operations):
+        self.version = version
+        self.name = name
+        self.operations = operations
+
+
+MIGRATIONS = [
+    Migration(1, "initial", [
+        CreateCollection(DOCUMENT_COLLECTION),
+        CreateCollection(CHUNK_COLLECTION),
+    ]),
+    # Chunk collections created before search filters were pushed down lack these
+    Migration(2, "chunk_filter_properties", [
+        AddProperty(CHUNK_COLLECTION, name)
+        for name in ("document_id", "uploaded_at", "category", "procuring_entity", "closing_date")
+    ]),
+]
+
+
+def _ledger(client):
+    if not client.collections.exists(MIGRATION_COLLECTION):
+        client.collections.create(name=MIGRATION_COLLECTION, **_migration_config())
+    return client.collections.get(MIGRATION_COLLECTION)
+
+def applied_versions(client):
+    return {obj.properties["version"] for obj in _ledger(client).iterator(return_properties=["version"])}
+
+def migrate(client, reindex=(), keep_old=False, report=logger.info):
+    """Apply pending migrations, then reindex the named collections; returns the versions applied"""
+    ledger = _ledger(client)
+    done = applied_versions(client)
+    options = {"keep_old": keep_old}
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version in done:
+            continue
+        for operation in migration.operations:
+            report(f"{migration.version:04d}_{migration.name}: {operation.describe()}")
+            operation.apply(client, migration, options)
+        ledger.data.insert({
+            "version": migration.version,
+            "name": migration.name,
+            "applied_at": datetime.now(timezone.utc),
+        })
+        applied.append(migration.version)
+
+    for name in reindex:
+        if name not in COLLECTIONS:
+            raise ValueError(f"Unknown collection {name!r}; expected one of {sorted(COLLECTIONS)}")
+        # Ad hoc rebuilds are numbered past the declared migrations and every current target
+        current = [resolve(client, other) or "" for other in [name] + dependents(name)]
+        version = max([MIGRATIONS[-1].version] + [
+            int(physical.rsplit("_v", 1)[-1]) for physical in current if "_v" in physical
+        ]) + 1
+        report(f"reindex {name} into {physical_name(name, version)}")
+        Reindex(name).apply(client, Migration(version, "reindex", []), options)
+    return applied
+
+# Arbitrary key for pg_try_advisory_lock, shared by every process migrating this schema
+MIGRATION_LOCK_KEY = 0x57454156
+
+@contextmanager
+def migration_lock():
+    """Yields whether this process holds the cluster-wide migration lock.
+
+    A Postgres session advisory lock is seen by every worker on every host;
+    other databases (SQLite in development) have a single process and always
+    get it.
+    """
+    from django.db import connection
+
+    if connection.vendor != "postgresql":
+        yield True
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [MIGRATION_LOCK_KEY])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [MIGRATION_LOCK_KEY])
+
+def migrate_on_startup():
+    """Apply pending migrations when WEAVIATE_MIGRATE_ON_STARTUP is set.
+
+    Called as a server (tender_project/asgi.py) or the document workers
+    start; one process migrates while the others skip.
+    """
+    from django.conf import settings
+    from .client import get_weaviate_client
+
+    if not (getattr(settings, "WEAVIATE_MIGRATE_ON_STARTUP", False)
+            and getattr(settings, "VECTOR_STORE_BACKEND", "weaviate") == "weaviate"):
+        return
+    try:
+        with migration_lock() as acquired:
+            if not acquired:
+                logger.info("Another process is applying Weaviate schema migrations")
+                return
+            client = get_weaviate_client()
+            if client is None:
+                logger.warning("Weaviate not reachable at startup; schema migrations not applied")
+                return
+            applied = migrate(client)
+            if applied:
+                logger.info(f"Applied Weaviate schema migrations {applied}")
+    except Exception as e:
+        logger.error(f"Weaviate schema migration failed: {e}")
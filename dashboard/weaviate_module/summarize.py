@@ -0,0 +1,124 @@
+# filepath: dashboard/weaviate_module/summarize.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from django.conf import settings
+from ollama import Client, ChatResponse
+import logging
+from .chunking import chunk_text, count_tokens
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = 'You are an assistant capable of analysing tender documents. You role is to: Extract tender information, Identifies key dates and deadlines, Lists requirements and eligibility and Provides opportunity assessment.'
+
+MAP_PROMPT = 'Summarize this section of a tender document. Keep every tender number, date, amount, requirement and contact detail: {text}'
+
+REDUCE_PROMPT = 'These are summaries of consecutive sections of one tender document. Combine them into a single summary of the whole tender, without repeating yourself: {text}'
+
+
+@lru_cache(maxsize=None)
+def _client(timeout):
+    return Client(timeout=timeout)
+
+
+def ollama_client():
+    """Sync Ollama client bounded by OLLAMA_TIMEOUT, so a hung model call fails the job instead of stalling it"""
+    return _client(getattr(settings, 'OLLAMA_TIMEOUT', 120))
+
+
+def _summary_model():
+    return getattr(settings, 'SUMMARY_MODEL', 'dolphin-phi')
+
+
+def _context_tokens():
+    """Tokens of document text that fit in one call, leaving room for the prompt and answer"""
+    return getattr(settings, 'SUMMARY_CONTEXT_TOKENS', 1500)
+
+
+def _chat(prompt, text, on_token=None):
+    """Ask the summary model; with on_token, stream and report the text generated so far"""
+    messages = [
+        {
+            'role': 'system',
+            'content': SYSTEM_PROMPT
+        },
+        {
+            'role': 'user',
+            'content': prompt.format(text=text),
+        },
+    ]
+    if on_token is None:
+        response: ChatResponse = ollama_client().chat(model=_summary_model(), messages=messages)
+        return response.message.content
+
+    content = ""
+    for part in ollama_client().chat(model=_summary_model(), messages=messages, stream=True):
+        content += part.message.content or ""
+        on_token(content)
+    return content
+
+
+def _map(prompt, texts, progress=None):
+    """Run one chat call per text with at most SUMMARY_CONCURRENCY in flight"""
+    workers = max(1, min(getattr(settings, 'SUMMARY_CONCURRENCY', 4), len(texts)))
+    results = [None] * len(texts)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_chat, prompt, text): index for index, text in enumerate(texts)}
+        # Progress is reported from this thread only, never from the pool threads
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress:
+                progress(detail=f"Summarised {done} of {len(texts)} sections")
+    return results
+
+
+def _group_to_fit(summaries, limit):
+    """Pack consecutive summaries into groups of at most `limit` tokens (at least two per group)"""
+    groups = []
+    current, current_tokens = [], 0
+    for summary in summaries:
+        tokens = count_tokens(summary)
+        if current and current_tokens + tokens > limit and len(current) >= 2:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+    return groups
+
+
+def _reduce(summaries, progress=None):
+    combined = "\n\n".join(summaries)
+    if len(summaries) == 1 or count_tokens(combined) <= _context_tokens():
+        if progress:
+            progress(detail="Combining section summaries")
+        return _chat(REDUCE_PROMPT, combined, on_token=_partial_reporter(progress))
+
+    groups = _group_to_fit(summaries, _context_tokens())
+    partials = _map(REDUCE_PROMPT, ["\n\n".join(group) for group in groups], progress)
+    return _reduce(partials, progress)
+
+
+def _partial_reporter(progress):
+    if progress is None:
+        return None
+    return lambda content: progress(partial=content)
+
+
+def summarize_text(text_content, progress=None):
+    """Summarise a tender, splitting it into context-sized chunks when it is too long for one call.
+
+    `progress`, if given, is called with keyword arguments `detail` (a short
+    status line) and/or `partial` (the final summary as it streams in).
+    """
+    limit = _context_tokens()
+    if count_tokens(text_content) <= limit:
+        return _chat('Summarize this content: {text}', text_content, on_token=_partial_reporter(progress))
+
+    chunks = chunk_text(text_content, limit, getattr(settings, 'SUMMARY_CHUNK_OVERLAP_TOKENS', 100))
+    logger.info(f"Summarising {len(chunks)} chunks")
+    partials = _map(MAP_PROMPT, chunks, progress)
+    return _reduce(partials, progress)
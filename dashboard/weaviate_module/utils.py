@@ -1,73 +1,165 @@
 # filepath: dashboard/weaviate_module/utils.py
-from .client import get_weaviate_client, get_collection
+from .async_client import query_timeout
+from ..vector_store import get_vector_store, SearchFilter, VectorStoreError
+import asyncio
 from datetime import datetime
 import hashlib
+import html
 import os
 import json
+import re
 from django.conf import settings
-from ollama import chat,ChatResponse
 import logging
-from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
 
 logger = logging.getLogger(__name__)
 
     
-def send_to_weaviate(document_name,text_content) -> tuple[bool,str]:
-    try:
-        documents = get_collection()
-        
-        content_hash = hashlib.sha256(text_content.encode('utf-8')).hexdigest()
-        existing = documents.query.fetch_objects(
-            filters=Filter.by_property("content_hash").equal(content_hash),
-            limit=1
-        )
-        
-        if existing and getattr(existing, "objects", None) and len(existing.objects) > 0:
-            return False,""
-        
-        response: ChatResponse = chat(model='dolphin-phi', messages=[
-            {
-                'role':'system',
-                'content':'You are an assistant capable of analysing tender documents. You role is to: Extract tender information, Identifies key dates and deadlines, Lists requirements and eligibility and Provides opportunity assessment.'
-            },
-            {
-                'role': 'user',
-                'content': f'Summarize this content: {text_content}',
-            },
-        ])    
-        summary_filename = f"{document_name}_ai_summarized.json"
-        summary_path = os.path.join(settings.MEDIA_ROOT, 'summaries', summary_filename)
-        
-        # Ensure summaries directory exists
-        os.makedirs(os.path.dirname(document_name), exist_ok=True)
-        
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(response.message.content, f, indent=2, ensure_ascii=False)
-        
-        document = documents.data.insert({
-            "file_name":document_name,
-            "time_created": datetime.now(),
-            "text_content":text_content,
-            "content_hash":content_hash,
-            "summary":response.message.content
-        }) 
-        
-        return True,summary_filename
-    except Exception as e:
-        logger.warning(f"Error obtained while getting collection: {str(e)}")
-        return False,str(e)
+def content_hash_for(text_content):
+    return hashlib.sha256(text_content.encode('utf-8')).hexdigest()
 
-def get_related_text(query):
-    client = get_collection()
+def find_by_content_hash(content_hash):
+    """Return the indexed document with this text hash, if any"""
+    return get_vector_store().find_document(content_hash=content_hash, properties=["file_name", "content_hash"])
+
+def write_summary_file(document_name, summary):
+    """Write the summary JSON under MEDIA_ROOT/summaries and return its name relative to that folder"""
+    summary_filename = f"{document_name}_ai_summarized.json"
+    summary_path = os.path.join(settings.MEDIA_ROOT, 'summaries', summary_filename)
     
-    if client is None:
-        logger.warning("Weaviate not available, returning empty results")
-        return None
-        
+    # Ensure summaries directory exists
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    
+    return summary_filename
+
+def upsert_document(document_name, text_content, content_hash, summary):
+    """Insert (or overwrite, when retrying) the parent document and return its uuid.
+
+    The uuid is derived from the content hash so a retry after a partial
+    failure replaces the earlier object instead of creating a second one.
+    """
+    document_uuid = generate_uuid5(content_hash)
+    properties = {
+        "file_name":document_name,
+        "time_created": datetime.now(),
+        "text_content":text_content,
+        "content_hash":content_hash,
+        "summary":summary
+    }
+    return get_vector_store().upsert_document(document_uuid, properties)
+
+def insert_chunks(document_uuid, document_name, content_hash, pieces, metadata=None):
+    """Batch-insert a document's chunks with a reference to the parent, replacing any earlier attempt.
+
+    `metadata` (document_id, uploaded_at, tender fields) is copied onto every
+    chunk so searches can filter on it.
+    """
+    metadata = {key: value for key, value in (metadata or {}).items() if value not in (None, '')}
+    chunks = [
+        {
+            "text": piece,
+            "chunk_index": index,
+            "file_name": document_name,
+            "content_hash": content_hash,
+            **metadata,
+        }
+        for index, piece in enumerate(pieces)
+    ]
+    count = get_vector_store().insert_chunks(document_uuid, content_hash, chunks)
+    
+    logger.info(f"Inserted {count} chunks for {document_name}")
+    return count
+
+SEARCH_RETURN_PROPERTIES = ["file_name", "chunk_index", "content_hash", "document_id"]
+
+def build_search_filter(document_ids=None, uploaded_from=None, uploaded_before=None,
+                        category=None, entity=None, closing_from=None, closing_before=None):
+    """Combine the given restrictions into one SearchFilter on chunk properties, or None"""
+    search_filter = SearchFilter(
+        document_ids=tuple(document_ids or ()),
+        uploaded_from=uploaded_from,
+        uploaded_before=uploaded_before,
+        category=category or '',
+        entity=entity or '',
+        closing_from=closing_from,
+        closing_before=closing_before,
+    )
+    return search_filter or None
+
+def highlight_snippet(text, query, width=240):
+    """HTML-escaped window of text around the first query term, with every term wrapped in <mark>"""
+    terms = sorted({term for term in re.findall(r"\w[\w/.-]*\w|\w", query.lower()) if len(term) > 1}, key=len, reverse=True)
+    if not text:
+        return ""
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE) if terms else None
+    match = pattern.search(text) if pattern else None
+    start = max(0, match.start() - width // 3) if match else 0
+    window = text[start:start + width]
+    
+    parts, last = [], 0
+    for hit in (pattern.finditer(window) if pattern else ()):
+        parts.append(html.escape(window[last:hit.start()]))
+        parts.append(f"<mark>{html.escape(hit.group())}</mark>")
+        last = hit.end()
+    parts.append(html.escape(window[last:]))
+    
+    snippet = " ".join("".join(parts).split())
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if start + width < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+def _hybrid_arguments(query, alpha, limit, offset, properties, filters):
+    if alpha is None:
+        alpha = getattr(settings, 'SEARCH_HYBRID_ALPHA', 0.5)
+    if limit is None:
+        limit = getattr(settings, 'SEARCH_RESULT_LIMIT', 10)
+    return {
+        "query": query,
+        "alpha": alpha,
+        "limit": limit,
+        "offset": offset,
+        "filters": filters,
+        "properties": list(dict.fromkeys(properties + ["text"])),
+    }
+
+def _hybrid_results(hits, query, properties):
+    results = []
+    for obj in hits:
+        hit = {name: obj.get(name) for name in properties}
+        hit["snippet"] = highlight_snippet(obj.get("text") or "", query)
+        hit["score"] = obj["score"]
+        results.append(hit)
+    return results
+
+async def aget_related_text(query, alpha=None, limit=None, offset=0, return_properties=None, filters=None):
+    """Hybrid (BM25 + vector) search over document chunks, restricted by `filters` if given.
+
+    Only the projected properties (SEARCH_RETURN_PROPERTIES by default) and a
+    highlighted snippet are returned per hit; chunk text is fetched to build
+    the snippet but is not included in the results. A Weaviate query is
+    bounded by WEAVIATE_QUERY_TIMEOUT. Returns None when the vector store is
+    unavailable or times out.
+    """
+    properties = list(return_properties or SEARCH_RETURN_PROPERTIES)
     try:
-        response = client.query.get("TenderDocument", ["file_name", "summary", "text_content"]).with_near_text({"concepts": [query]}).with_limit(2).do()
-        return response
+        hits = await get_vector_store().ahybrid(**_hybrid_arguments(query, alpha, limit, offset, properties, filters))
+    except asyncio.TimeoutError:
+        logger.error(f"Hybrid search timed out after {query_timeout()}s")
+        return None
     except Exception as e:
-        logger.error(f"Error in get_related_text: {e}")
+        logger.error(f"Error in aget_related_text: {e}")
+        return None
+    
+    return _hybrid_results(hits, query, properties)
+
+async def aget_summary(document_name):
+    """Async summary lookup; raises asyncio.TimeoutError past WEAVIATE_QUERY_TIMEOUT"""
+    try:
+        document = await get_vector_store().afind_document(file_name=document_name, properties=["summary"])
+    except VectorStoreError as e:
+        logger.warning(f"Vector store not available: {e}")
         return None
-    
\ No newline at end of file
+    return document.get("summary") if document else None
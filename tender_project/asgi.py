@@ -13,4 +13,30 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tender_project.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from dashboard.weaviate_module import async_client  # noqa: E402  (needs settings configured)
+from dashboard.utils.model_registry import warm_up_on_startup  # noqa: E402
+from dashboard.weaviate_module.schema import migrate_on_startup  # noqa: E402
+
+migrate_on_startup()
+warm_up_on_startup()
+
+# The server's event loop lives as long as the worker, so the async views can
+# keep one async Weaviate client on it
+async_client.enable()
+
+
+async def application(scope, receive, send):
+    """Django, plus lifespan handling so the async Weaviate client is closed at shutdown"""
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_client.close_async_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
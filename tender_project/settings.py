@@ -155,6 +155,117 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 # Login Redirect
 LOGIN_REDIRECT_URL = '/dashboard/'
 
+# Uploads are hashed (SHA-256) as they are received so duplicates can be rejected early
+FILE_UPLOAD_HANDLERS = [
+    'dashboard.uploadhandlers.HashingMemoryFileUploadHandler',
+    'dashboard.uploadhandlers.HashingTemporaryFileUploadHandler',
+]
+
+BULK_UPLOAD_MAX_FILES = int(os.getenv('BULK_UPLOAD_MAX_FILES', '200'))
+# Uncompressed size limits for ZIP members, per file and per upload, so an archive cannot fill the disk
+BULK_UPLOAD_MAX_MEMBER_SIZE = int(os.getenv('BULK_UPLOAD_MAX_MEMBER_SIZE', str(100 * 1024 * 1024)))
+BULK_UPLOAD_MAX_EXTRACTED_SIZE = int(os.getenv('BULK_UPLOAD_MAX_EXTRACTED_SIZE', str(1024 * 1024 * 1024)))
+
 # Media files
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Background document processing (python manage.py process_documents)
+DOCUMENT_WORKER_PROCESSES = int(os.getenv('DOCUMENT_WORKER_PROCESSES', '2'))
+DOCUMENT_WORKER_POLL_INTERVAL = float(os.getenv('DOCUMENT_WORKER_POLL_INTERVAL', '2'))
+DOCUMENT_JOB_MAX_ATTEMPTS = int(os.getenv('DOCUMENT_JOB_MAX_ATTEMPTS', '3'))
+DOCUMENT_JOB_RETRY_BACKOFF = int(os.getenv('DOCUMENT_JOB_RETRY_BACKOFF', '30'))
+DOCUMENT_JOB_RETRY_BACKOFF_MAX = int(os.getenv('DOCUMENT_JOB_RETRY_BACKOFF_MAX', '3600'))
+DOCUMENT_JOB_LEASE_TIMEOUT = int(os.getenv('DOCUMENT_JOB_LEASE_TIMEOUT', '1800'))
+DOCUMENT_JOB_HEARTBEAT_INTERVAL = int(os.getenv('DOCUMENT_JOB_HEARTBEAT_INTERVAL', '60'))  # well under the lease timeout
+DOCUMENT_JOB_MAX_RUNTIME = int(os.getenv('DOCUMENT_JOB_MAX_RUNTIME', '7200'))  # leases stop being renewed after this
+
+# PDF text extraction
+PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', '0')) or None  # None = one per CPU
+PDF_EXTRACTION_MIN_PAGES_PER_WORKER = int(os.getenv('PDF_EXTRACTION_MIN_PAGES_PER_WORKER', '8'))
+
+# OCR fallback for scanned pages
+OCR_DPI = int(os.getenv('OCR_DPI', '200'))
+OCR_THREAD_COUNT = int(os.getenv('OCR_THREAD_COUNT', '1'))
+OCR_PAGE_WINDOW = int(os.getenv('OCR_PAGE_WINDOW', '4'))
+OCR_MIN_PAGE_CHARS = int(os.getenv('OCR_MIN_PAGE_CHARS', '20'))
+
+# Chunking for Weaviate ingestion (token counts use tiktoken cl100k_base)
+CHUNK_TOKENS = int(os.getenv('CHUNK_TOKENS', '512'))
+CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', '64'))
+
+# Summarisation with Ollama (long documents are summarised chunk by chunk, then combined)
+SUMMARY_MODEL = os.getenv('SUMMARY_MODEL', 'dolphin-phi')
+SUMMARY_CONTEXT_TOKENS = int(os.getenv('SUMMARY_CONTEXT_TOKENS', '1500'))
+SUMMARY_CHUNK_OVERLAP_TOKENS = int(os.getenv('SUMMARY_CHUNK_OVERLAP_TOKENS', '100'))
+SUMMARY_CONCURRENCY = int(os.getenv('SUMMARY_CONCURRENCY', '4'))
+
+# Processing progress (document detail page subscribes via Server-Sent Events)
+PROGRESS_SAVE_INTERVAL = float(os.getenv('PROGRESS_SAVE_INTERVAL', '0.5'))
+PROGRESS_POLL_INTERVAL = float(os.getenv('PROGRESS_POLL_INTERVAL', '0.5'))
+PROGRESS_STREAM_MAX_SECONDS = int(os.getenv('PROGRESS_STREAM_MAX_SECONDS', '300'))
+
+# Near-duplicate detection (MinHash + LSH); PERMUTATIONS must be divisible by BANDS
+MINHASH_PERMUTATIONS = int(os.getenv('MINHASH_PERMUTATIONS', '128'))
+MINHASH_BANDS = int(os.getenv('MINHASH_BANDS', '16'))
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.85'))
+
+# Structured tender field extraction (tender number, entity, category, closing date)
+TENDER_FIELDS_MODEL = os.getenv('TENDER_FIELDS_MODEL', SUMMARY_MODEL)
+TENDER_FIELDS_CONTEXT_TOKENS = int(os.getenv('TENDER_FIELDS_CONTEXT_TOKENS', '1500'))
+
+# Embedding models for the semantic query cache (loaded once per process; EAGER_LOAD
+# loads them when the ASGI server or the document workers start)
+EMBEDDING_MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+EMBEDDING_MODELS_EAGER_LOAD = os.getenv('EMBEDDING_MODELS_EAGER_LOAD', 'False').lower() == 'true'
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv('EMBEDDING_BATCH_MAX_SIZE', '32'))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv('EMBEDDING_BATCH_MAX_WAIT_MS', '5'))
+
+# Semantic cache lookup index ('auto' switches from exact scan to IVF past the min size)
+QUERY_INDEX_BACKEND = os.getenv('QUERY_INDEX_BACKEND', 'auto')
+QUERY_INDEX_PATH = os.getenv('QUERY_INDEX_PATH', str(BASE_DIR / 'var' / 'query_index.npz'))
+QUERY_INDEX_ANN_MIN_SIZE = int(os.getenv('QUERY_INDEX_ANN_MIN_SIZE', '5000'))
+QUERY_INDEX_IVF_NLIST = int(os.getenv('QUERY_INDEX_IVF_NLIST', '0')) or None
+QUERY_INDEX_IVF_NPROBE = int(os.getenv('QUERY_INDEX_IVF_NPROBE', '8'))
+QUERY_INDEX_SAVE_EVERY = int(os.getenv('QUERY_INDEX_SAVE_EVERY', '200'))
+
+# Shared search result cache; entries also expire whenever the corpus generation changes
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '3600'))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '1000'))
+SEARCH_CACHE_EVICT_INTERVAL = int(os.getenv('SEARCH_CACHE_EVICT_INTERVAL', '60'))  # seconds between eviction sweeps per process
+
+# Identical concurrent searches share one backend call per process; with the lock
+# enabled (needs a shared CACHES backend such as Redis) also across processes
+SEARCH_SINGLE_FLIGHT_LOCK = os.getenv('SEARCH_SINGLE_FLIGHT_LOCK', 'False').lower() == 'true'
+SEARCH_SINGLE_FLIGHT_LOCK_TIMEOUT = int(os.getenv('SEARCH_SINGLE_FLIGHT_LOCK_TIMEOUT', '30'))
+SEARCH_SINGLE_FLIGHT_POLL_INTERVAL = float(os.getenv('SEARCH_SINGLE_FLIGHT_POLL_INTERVAL', '0.1'))
+
+# Hybrid search: alpha 0 is pure BM25, 1 is pure vector search
+SEARCH_HYBRID_ALPHA = float(os.getenv('SEARCH_HYBRID_ALPHA', '0.5'))
+SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', '10'))
+SEARCH_MAX_LIMIT = int(os.getenv('SEARCH_MAX_LIMIT', '50'))
+
+# Question answering: chunks retrieved, then packed into a tiktoken-counted context budget
+ANSWER_MODEL = os.getenv('ANSWER_MODEL', SUMMARY_MODEL)
+ANSWER_RETRIEVAL_LIMIT = int(os.getenv('ANSWER_RETRIEVAL_LIMIT', '20'))
+ANSWER_CONTEXT_TOKENS = int(os.getenv('ANSWER_CONTEXT_TOKENS', '3000'))
+ANSWER_PASSAGE_TOKENS = int(os.getenv('ANSWER_PASSAGE_TOKENS', '1000'))  # cap on adjacent chunks merged into one passage
+
+# Weaviate connection, shared by the pooled sync client and the async views (tender_project/asgi.py)
+WEAVIATE_HOST = os.getenv('WEAVIATE_HOST', 'localhost')
+WEAVIATE_PORT = int(os.getenv('WEAVIATE_PORT', '8080'))
+WEAVIATE_GRPC_PORT = int(os.getenv('WEAVIATE_GRPC_PORT', '50051'))
+WEAVIATE_QUERY_TIMEOUT = float(os.getenv('WEAVIATE_QUERY_TIMEOUT', '10'))
+WEAVIATE_CONNECT_TIMEOUT = float(os.getenv('WEAVIATE_CONNECT_TIMEOUT', '5'))
+# Liveness is re-checked at most this often; failed connects back off exponentially up to the max
+WEAVIATE_HEALTH_CHECK_INTERVAL = float(os.getenv('WEAVIATE_HEALTH_CHECK_INTERVAL', '30'))
+WEAVIATE_RECONNECT_BACKOFF = float(os.getenv('WEAVIATE_RECONNECT_BACKOFF', '1'))
+WEAVIATE_RECONNECT_BACKOFF_MAX = float(os.getenv('WEAVIATE_RECONNECT_BACKOFF_MAX', '60'))
+# Schema is applied by `manage.py migrate_weaviate`; set this to also apply it when the ASGI server or workers start
+WEAVIATE_MIGRATE_ON_STARTUP = os.getenv('WEAVIATE_MIGRATE_ON_STARTUP', 'False').lower() == 'true'
+OLLAMA_TIMEOUT = float(os.getenv('OLLAMA_TIMEOUT', '120'))
+
+# Search backend: 'weaviate' (server) or 'embedded' (SQLite FTS5 + memory-mapped
+# vectors under EMBEDDED_STORE_PATH, for offline work and small deployments)
+VECTOR_STORE_BACKEND = os.getenv('VECTOR_STORE_BACKEND', 'weaviate')
+EMBEDDED_STORE_PATH = os.getenv('EMBEDDED_STORE_PATH', str(BASE_DIR / 'var' / 'vector_store'))